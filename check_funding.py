@@ -20,6 +20,7 @@ async def main():
     print("\n[1/2] Checking GRVT API...")
     try:
         grvt = GrvtExchange()
+        await grvt.initialize()
         symbol = "BTC_USDT_Perp" # Hardcoded for test
         print(f"   Fetching {symbol}...")
         rate = await grvt.get_funding_rate(symbol)
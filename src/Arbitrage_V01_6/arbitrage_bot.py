@@ -27,6 +27,15 @@ try:
     )
     from portfolio_manager import PortfolioManager
     from utils.market_sync import MarketSynchronizer
+    from utils.venue_scorer import VenueScorer
+    from utils.residual_balancer import ResidualBalancer
+    from utils.legging_recovery import LeggingRecovery
+    from utils.pnl_engine import PnLEngine
+    from utils.position_journal import PositionJournal, reconcile
+    from utils.opportunity_book import OpportunityBook, CapitalAllocator
+    from utils.symbol_registry import get_registry
+    from utils.config_service import get_config
+    from utils.rate_limiter import get_limiter, rate_limit_summary, ORDER, METADATA
 except ImportError as e:
     log.error(f"❌ 필수 모듈 임포트 실패: {e}")
     sys.exit(1)
@@ -36,11 +45,26 @@ class ArbitrageBot:
         self.exchanges = {}
         self.pm = None
         self.market_sync = None
+        self.venue_scorer = VenueScorer()
+        self.residual_balancer = None
+        self.pnl = PnLEngine()
+        self.journal = PositionJournal()
+        self.config = get_config()
+        self.symbols = get_registry()
         self.is_running = False
         
         self.bbo_cache = {} 
+        self.legging_recovery = LeggingRecovery(self.exchanges, self.bbo_cache, self.venue_scorer,
+                                               check_balance=self._check_balance)
         self.opportunity_cache = {}
         self.active_positions = {} 
+
+        # 전역 기회 순위 (호가가 바뀐 티커만 갱신) + 거래소별 증거금 할당
+        self.ranking_cfg = getattr(settings, 'OPPORTUNITY_RANKING_CONFIG', {})
+        self.book = OpportunityBook(self.venue_scorer)
+        self.allocator = CapitalAllocator()
+        self._entering = set()
+        self._allocate_event = None
         
         self.ex_name_map = {
             'HYPERLIQUID': 'HL', 'GRVT': 'GRVT', 
@@ -52,6 +76,7 @@ class ArbitrageBot:
         log.info("🚀 [V01_5] Arbitrage Bot 가동 (Time Logic On)")
         log.info("==========================================")
         
+        t0 = time.perf_counter()
         self._init_exchanges()
         if not self.exchanges:
             log.error("❌ 연결된 거래소가 없습니다.")
@@ -59,11 +84,17 @@ class ArbitrageBot:
 
         self.market_sync = MarketSynchronizer(self.exchanges)
         await self.market_sync.warm_up()
+        self.residual_balancer = ResidualBalancer(self.exchanges, self.market_sync)
         
-        self.pm = PortfolioManager(self.exchanges, filename="arbitrage_log_real.xlsx")
+        self.pm = PortfolioManager(self.exchanges, filename="arbitrage_log_real.db")
+        self.pm.subscribe(self._accrue_funding)
         await self.pm.update_balances()
+        self._restore_positions()
+        # 스냅샷 빠른 시작: 재검증(클라이언트 초기화)이 끝나면 바로 다시 잔고를 찍어 기준 자산을 확정
+        self.market_sync.after_revalidation(lambda: self.pm.request_snapshot())
         
-        log.info("✅ 시스템 초기화 완료.\n")
+        self.market_sync.phase_timings['initialize_ms'] = (time.perf_counter() - t0) * 1000
+        log.info(f"✅ 시스템 초기화 완료. ({self.market_sync.phase_timings['initialize_ms']:.0f}ms)\n")
 
     def _init_exchanges(self):
         if os.getenv('HYPERLIQUID_PRIVATE_KEY'):
@@ -73,7 +104,11 @@ class ArbitrageBot:
         if os.getenv('PACIFICA_MAIN_ADDRESS'):
             self.exchanges['PAC'] = PacificaExchange(os.getenv('PACIFICA_MAIN_ADDRESS'), os.getenv('PACIFICA_AGENT_PRIVATE_KEY'))
         if os.getenv('LIGHTER_PRIVATE_KEY'):
-            self.exchanges['LTR'] = LighterExchange(os.getenv('LIGHTER_PRIVATE_KEY'), os.getenv('LIGHTER_WALLET_ADDRESS'))
+            # 계정 인덱스가 없으면 LTR 만 제외 (다른 거래소는 그대로 기동)
+            try:
+                self.exchanges['LTR'] = LighterExchange(os.getenv('LIGHTER_PRIVATE_KEY'), os.getenv('LIGHTER_WALLET_ADDRESS'))
+            except ValueError as e:
+                log.error(f"❌ [LTR] 초기화 제외: {e}")
         if os.getenv('EXTENDED_API_KEY'):
             self.exchanges['EXT'] = ExtendedExchange(
                 os.getenv('EXTENDED_PRIVATE_KEY'), os.getenv('EXTENDED_PUBLIC_KEY'),
@@ -88,6 +123,13 @@ class ArbitrageBot:
         ws_tasks = []
         for name, ex in self.exchanges.items():
             ws_tasks.append(asyncio.create_task(ex.start_ws(self.on_price_update)))
+
+        # 설정 핫 리로드 (GUI 수정 / 오버라이드 파일 변경 → 재시작 없이 반영)
+        self.config.subscribe(self._on_config_change)
+        self.config.attach(asyncio.get_running_loop())
+        ws_tasks.append(asyncio.create_task(self.config.watch()))
+        self._allocate_event = asyncio.Event()
+        ws_tasks.append(asyncio.create_task(self._allocation_loop()))
             
         log.info("📡 WebSocket 데이터 수신 시작...")
         await self._wait_for_prices()
@@ -102,9 +144,9 @@ class ArbitrageBot:
                 # 1초 대기 (CPU 과부하 방지)
                 await asyncio.sleep(1)
                 
-                # 1분마다 잔고 업데이트
+                # 1분마다 잔고 업데이트 (백그라운드, 매매 루프를 막지 않음)
                 if int(time.time()) % 60 == 0:
-                    await self.pm.update_balances()
+                    self.pm.request_snapshot()
                 
         except Exception as e:
             log.error(f"❌ 봇 런타임 에러: {e}")
@@ -112,25 +154,31 @@ class ArbitrageBot:
         finally:
             self.is_running = False
             for t in ws_tasks: t.cancel()
+            self.config.unsubscribe(self._on_config_change)
+            await self.journal.close()
             for ex in self.exchanges.values():
                 await ex.close()
+            if self.pm: await self.pm.close()
             log.info("👋 봇이 안전하게 종료되었습니다.")
 
     async def _wait_for_prices(self):
-        targets = list(settings.TARGET_PAIRS_CONFIG.keys())
+        targets = self.symbols.tickers
         log.info(f"⏳ 가격 데이터 수신 대기 중... (Targets: {len(targets)})")
         
         start = time.time()
-        while time.time() - start < 30: 
-            ready_count = 0
-            for t in targets:
-                if t in self.bbo_cache and len(self.bbo_cache[t]) >= 2:
-                    ready_count += 1
-            if ready_count >= len(targets) * 0.8:
-                log.info("✅ 주요 마켓 데이터 수신 완료!")
-                return
-            await asyncio.sleep(1)
-        log.warning("⚠️ 일부 가격 데이터 미수신 상태로 시작합니다.")
+        try:
+            while time.time() - start < 30: 
+                ready_count = 0
+                for t in targets:
+                    if t in self.bbo_cache and len(self.bbo_cache[t]) >= 2:
+                        ready_count += 1
+                if ready_count >= len(targets) * 0.8:
+                    log.info("✅ 주요 마켓 데이터 수신 완료!")
+                    return
+                await asyncio.sleep(1)
+            log.warning("⚠️ 일부 가격 데이터 미수신 상태로 시작합니다.")
+        finally:
+            self.market_sync.phase_timings['wait_prices_ms'] = (time.time() - start) * 1000
 
     async def on_price_update(self, bbo):
         if not bbo: return
@@ -143,13 +191,16 @@ class ArbitrageBot:
         
         await self.find_arbitrage_opportunity(symbol)
 
-    async def get_price_robust(self, ex_name, ticker):
+    async def get_price_robust(self, ex_name, ticker, lane=METADATA):
+        """lane: REST 폴백 조회의 Rate Limit 우선순위 (주문 직전 조회는 ORDER)"""
         if ticker in self.bbo_cache and ex_name in self.bbo_cache[ticker]:
             bbo = self.bbo_cache[ticker][ex_name]
             return (bbo['bid'] + bbo['ask']) / 2
         ex = self.exchanges.get(ex_name)
         if not ex: return 0.0
         try:
+            if ex_name in ("GRVT", "EXT", "LTR"):
+                 await get_limiter(ex_name).acquire(lane)
             if ex_name == "GRVT":
                  t = await ex.grvt.fetch_ticker(f"{ticker}_USDT_Perp")
                  return float(t.get('last') or 0)
@@ -168,6 +219,7 @@ class ArbitrageBot:
         except: pass
         if 'HL' in self.exchanges:
             try:
+                await get_limiter('HL').acquire(lane, 2)
                 hl_mids = self.exchanges['HL'].info.all_mids()
                 price = float(hl_mids.get(ticker) or hl_mids.get(f"k{ticker}", 0))
                 if price > 0: return price
@@ -175,47 +227,87 @@ class ArbitrageBot:
         return 0.0
 
     async def find_arbitrage_opportunity(self, symbol):
-        if symbol in self.active_positions: return
+        """호가가 바뀐 티커의 최선 쌍만 다시 계산하여 전역 순위에 반영 (진입 결정은 할당 루프에서)"""
+        if symbol in self.active_positions or symbol in self._entering:
+            self.book.remove(symbol)
+            return
 
         data = self.bbo_cache.get(symbol, {})
-        if len(data) < 2: return 
-        if symbol not in settings.TARGET_PAIRS_CONFIG: return
-        
-        config = settings.TARGET_PAIRS_CONFIG[symbol]
-        preset_name = config.get('strategy_preset', 'major')
-        strategy = settings.STRATEGY_PRESETS.get(preset_name, {})
+        cfg = self.config.current
+        config = cfg.pairs.get(symbol)
+        if config is None or len(data) < 2:
+            self.book.remove(symbol)
+            return
+
+        strategy = cfg.presets.get(config.get('strategy_preset', 'major'), {})
         entry_threshold = strategy.get('entry_threshold_pct', 0.2)
         
-        valid_exchanges = list(data.keys())
-        best_spread = -999
-        best_pair = (None, None)
-        
-        for long_ex in valid_exchanges:
-            for short_ex in valid_exchanges:
-                if long_ex == short_ex: continue
-                long_p = (data[long_ex]['bid'] + data[long_ex]['ask']) / 2
-                short_p = (data[short_ex]['bid'] + data[short_ex]['ask']) / 2
-                if long_p <= 0: continue
-                spread = (short_p - long_p) / long_p * 100
-                if spread > best_spread:
-                    best_spread = spread
-                    best_pair = (long_ex, short_ex)
-
-        if best_spread > entry_threshold:
-            if self._is_in_cooldown(symbol): return
-            long_ex, short_ex = best_pair
-            log.info(f"✨ [기회] {symbol} Spread:{best_spread:.3f}% (Target > {entry_threshold}%) | Buy:{long_ex} Sell:{short_ex}")
-            await self.execute_dual_order(symbol, long_ex, short_ex, best_spread)
+        # 스프레드가 임계값을 넘는 쌍 중, 수수료/지연/레깅 위험을 반영한 기대 순수익 최선 쌍
+        if self.book.update(symbol, data, entry_threshold) is not None and self._allocate_event is not None:
+            self._allocate_event.set()
+
+    async def _allocation_loop(self):
+        """순위가 바뀔 때마다 (짧게 모아서) 상위 기회에 증거금을 배정하고 진입을 시작합니다."""
+        debounce = self.ranking_cfg.get('DEBOUNCE_SEC', 0.05)
+        while True:
+            await self._allocate_event.wait()
+            await asyncio.sleep(debounce)
+            self._allocate_event.clear()
+            try:
+                self._allocate_round()
+            except Exception as e:
+                log.error(f"❌ [할당] 에러: {e}")
+
+    def _allocate_round(self):
+        slots = self.ranking_cfg.get('MAX_CONCURRENT_ENTRIES', 2) - len(self._entering)
+        if slots <= 0 or not self.pm: return
+        # 오래 갱신되지 않은 기회는 호가가 끊긴 것으로 보고 순위에서 제거 (다음 호가 갱신 때 다시 등록됨)
+        max_age = self.ranking_cfg.get('MAX_QUOTE_AGE_SEC', 2.0)
+        now = time.time()
+        top = []
+        for c in self.book.top(self.ranking_cfg.get('TOP_K', 10)):
+            if now - c[5] > max_age: self.book.remove(c[1])
+            else: top.append(c)
+        candidates = [
+            c for c in top
+            if c[1] not in self.active_positions and c[1] not in self._entering and not self._is_in_cooldown(c[1])
+            and c[3] in self.exchanges and c[4] in self.exchanges
+            and self.exchanges[c[3]].markets_ready and self.exchanges[c[4]].markets_ready
+        ]
+        if not candidates: return
+
+        # 가용 증거금 = 최근 잔고 스냅샷 - 아직 스냅샷에 반영되지 않은 배정분
+        balance_times = {n: t.get('last_ok', 0.0) for n, t in self.pm.balance_timings.items()}
+        reserved = self.allocator.reserved(balance_times)
+        available = {n: (self.pm.last_balances.get(n) or {}).get('available', 0.0) - reserved.get(n, 0.0) for n in self.exchanges}
+        picks = self.allocator.allocate(candidates, available, self.market_sync.required_margin, slots)
+
+        for symbol, long_ex, short_ex, spread, net_edge, margin in picks:
+            log.info(f"✨ [기회] {symbol} Spread:{spread:.3f}% | Edge:{net_edge:.3f}% | Buy:{long_ex} Sell:{short_ex} (증거금 ${margin:.2f} 배정)")
+            self._entering.add(symbol)
+            self.book.remove(symbol)
+            self.allocator.reserve(symbol, long_ex, short_ex, margin)
+            asyncio.create_task(self._enter(symbol, long_ex, short_ex, spread))
+
+    async def _enter(self, symbol, long_ex, short_ex, spread):
+        try:
+            await self.execute_dual_order(symbol, long_ex, short_ex, spread)
+        except Exception as e:
+            log.error(f"❌ [진입] {symbol} 에러: {e}")
+        finally:
+            self._entering.discard(symbol)
+            self.allocator.release(symbol)
+            # 남은 슬롯으로 다음 순위 기회 검토
+            if self._allocate_event is not None: self._allocate_event.set()
 
     # [핵심] 활성 포지션 모니터링 (시간 & 스프레드 로직 적용)
     async def monitor_active_positions(self):
         if not self.active_positions: return
         
+        cfg = self.config.current
         for symbol, pos in list(self.active_positions.items()):
-            # 1. 설정값 로드
-            config = settings.TARGET_PAIRS_CONFIG.get(symbol, {})
-            preset_name = config.get('strategy_preset', 'major')
-            strategy = settings.STRATEGY_PRESETS.get(preset_name, {})
+            # 1. 설정값 로드 (설정에서 삭제된 티커도 기본 프리셋으로 청산 감시 유지)
+            strategy = cfg.strategy(symbol)
             
             min_hold = strategy.get('min_hold_time_sec', 0)
             max_hold = strategy.get('max_hold_time_sec', 3600) # 기본 1시간
@@ -227,7 +319,7 @@ class ArbitrageBot:
             # 3. [강제 청산] 최대 보유 시간 초과
             if elapsed > max_hold:
                 log.info(f"⏰ [시간 초과] {symbol} {elapsed:.0f}s > {max_hold}s. 강제 청산.")
-                await self.close_position(symbol, pos)
+                await self.close_position(symbol, pos, reason='max_hold')
                 continue
 
             # 4. 현재가 조회 및 스프레드 계산
@@ -237,6 +329,9 @@ class ArbitrageBot:
 
             curr_spread = (curr_short_p - curr_long_p) / curr_long_p * 100
             pos['current_spread'] = curr_spread
+            if pos.get('pnl_id'):
+                self.pnl.mark(pos['pnl_id'], pos['long'], curr_long_p)
+                self.pnl.mark(pos['pnl_id'], pos['short'], curr_short_p)
             
             # 5. [청산 보류] 최소 보유 시간 미달이면, 이익이어도 대기
             if elapsed < min_hold:
@@ -247,25 +342,48 @@ class ArbitrageBot:
             # 6. [정상 익절] 목표 스프레드 도달
             if curr_spread < exit_target:
                 log.info(f"📉 [익절 신호] {symbol} Spread:{curr_spread:.3f}% < {exit_target}%")
-                await self.close_position(symbol, pos)
+                await self.close_position(symbol, pos, reason='target')
 
-    async def close_position(self, symbol, pos):
+    async def close_position(self, symbol, pos, reason='exit'):
         log.info(f"🧹 [청산 시작] {symbol} {pos['qty']}개 정리")
         long_ex = self.exchanges[pos['long']]
         short_ex = self.exchanges[pos['short']]
         qty = pos['qty']
         
-        p_long = await self.get_price_robust(pos['long'], symbol)
-        p_short = await self.get_price_robust(pos['short'], symbol)
+        p_long = await self.get_price_robust(pos['long'], symbol, ORDER)
+        p_short = await self.get_price_robust(pos['short'], symbol, ORDER)
         
-        task1 = long_ex.place_market_order(symbol, 'SELL', qty, p_long, reduce_only=True)
-        task2 = short_ex.place_market_order(symbol, 'BUY', qty, p_short, reduce_only=True)
+        # 레그별 실제 보유 수량으로 청산 (잔여 델타 정리 실패 시 양쪽 수량이 다를 수 있음)
+        # (재시작 대조 결과 한쪽 레그만 남은 경우 수량 0 인 레그는 주문하지 않음)
+        long_qty, short_qty = pos.get('long_qty', qty), pos.get('short_qty', qty)
+        task1 = long_ex.place_market_order(symbol, 'SELL', long_qty, p_long, reduce_only=True) if long_qty > 0 else asyncio.sleep(0)
+        task2 = short_ex.place_market_order(symbol, 'BUY', short_qty, p_short, reduce_only=True) if short_qty > 0 else asyncio.sleep(0)
         
-        await asyncio.gather(task1, task2, return_exceptions=True)
+        res1, res2 = await asyncio.gather(task1, task2, return_exceptions=True)
+        (l_filled, l_avg), (s_filled, s_avg) = await asyncio.gather(
+            long_ex.confirm_fill(res1, long_qty, p_long) if isinstance(res1, dict) else self._no_fill(),
+            short_ex.confirm_fill(res2, short_qty, p_short) if isinstance(res2, dict) else self._no_fill()
+        )
+        l_avg, s_avg = l_avg or p_long, s_avg or p_short
+        self.journal.record_fill(symbol, pos['long'], 'SELL', l_filled, l_avg, phase='exit')
+        self.journal.record_fill(symbol, pos['short'], 'BUY', s_filled, s_avg, phase='exit')
+
+        result = None
+        if pos.get('pnl_id'):
+            self.pnl.on_fill(pos['pnl_id'], pos['long'], 'SELL', l_filled, l_avg)
+            self.pnl.on_fill(pos['pnl_id'], pos['short'], 'BUY', s_filled, s_avg)
+            result = self.pnl.close(pos['pnl_id'])
         
-        log.info(f"✅ [청산 완료] {symbol} 포지션 종료")
-        self.pm.log_trade({'Symbol': symbol, 'Type': 'Exit', 'Qty': qty, 'Exchange': f"{pos['long']}/{pos['short']}"})
+        pnl_str = f" | PnL ${result['net']:+.4f} (실현 {result['realized']:+.4f}, 수수료 {result['fees']:.4f})" if result else ""
+        log.info(f"✅ [청산 완료] {symbol} 포지션 종료 (Long {pos['long']} @ {l_avg} / Short {pos['short']} @ {s_avg}){pnl_str}")
+        self.pm.log_trade({
+            'Symbol': symbol, 'Type': 'Exit', 'Side': 'SELL/BUY', 'Qty': qty,
+            'Price': l_avg, 'Short_Price': s_avg, 'Exchange': f"{pos['long']}/{pos['short']}",
+            'PnL': result['net'] if result else None,
+            'Realized': result['realized'] if result else None, 'Fees': result['fees'] if result else None
+        })
         
+        self.journal.record_close(symbol, reason, result['net'] if result else None)
         if symbol in self.active_positions:
             del self.active_positions[symbol]
 
@@ -285,8 +403,10 @@ class ArbitrageBot:
         return True
 
     async def execute_dual_order(self, symbol, long_ex_name, short_ex_name, spread):
+        # 스냅샷으로 시작한 경우, 실시간 마켓 로드(클라이언트 초기화)가 끝난 거래소끼리만 주문
+        if not (self.exchanges[long_ex_name].markets_ready and self.exchanges[short_ex_name].markets_ready): return
         self.opportunity_cache[symbol] = time.time()
-        long_price = await self.get_price_robust(long_ex_name, symbol)
+        long_price = await self.get_price_robust(long_ex_name, symbol, ORDER)
         if long_price <= 0: return
 
         target_lev, qty, pos_usd = self.market_sync.calculate_smart_order_params(symbol, long_price)
@@ -305,40 +425,242 @@ class ArbitrageBot:
             short_ex.set_leverage(symbol, target_lev)
         )
         
-        short_price = await self.get_price_robust(short_ex_name, symbol)
+        short_price = await self.get_price_robust(short_ex_name, symbol, ORDER)
         
-        task1 = long_ex.place_market_order(symbol, 'BUY', qty, long_price)
-        task2 = short_ex.place_market_order(symbol, 'SELL', qty, short_price)
+        # 측정된 거래소 품질에 따라 동시 주문 또는 불안한 쪽 먼저 주문
+        mode, first_ex = self.venue_scorer.plan_legs(long_ex_name, short_ex_name)
+        long_leg = lambda q: self._timed_order(long_ex_name, long_ex.place_market_order(symbol, 'BUY', q, long_price))
+        short_leg = lambda q: self._timed_order(short_ex_name, short_ex.place_market_order(symbol, 'SELL', q, short_price))
+        long_req = short_req = qty
         
-        results = await asyncio.gather(task1, task2, return_exceptions=True)
-        res1, res2 = results
-        
-        # [추가됨] 주문 후 잔고 동기화를 위해 잠시 대기 (Extended 잔고 랙 방지)
-        await asyncio.sleep(2)  # 2초 대기
+        if mode == 'sequential':
+            long_first = first_ex == long_ex_name
+            first, second = (long_leg, short_leg) if long_first else (short_leg, long_leg)
+            first_obj, first_px = (long_ex, long_price) if long_first else (short_ex, short_price)
+            log.info(f"🔀 [순차 주문] {first_ex} 먼저 주문 (신뢰도 낮음)")
+            first_res = await first(qty)
+            if not isinstance(first_res, dict):
+                log.warning(f"⚠️ [순차 주문] {first_ex} 미체결 → 반대편 주문 생략")
+                return
+            # 반대 레그는 요청 수량이 아니라 첫 레그의 실제 체결 수량으로 주문 (IOC 부분 체결 대비)
+            first_fill = await first_obj.confirm_fill(first_res, qty, first_px)
+            second_qty = first_fill[0]
+            second_res = await second(second_qty) if second_qty > 0 else None
+            if second_qty <= 0:
+                log.warning(f"⚠️ [순차 주문] {first_ex} 체결 수량 0 → 반대편 주문 생략")
+            elif second_qty < qty:
+                log.info(f"🔀 [순차 주문] {first_ex} 부분 체결 {second_qty}/{qty} → 반대편 {second_qty}개 주문")
+            if long_first:
+                res1, res2, short_req = first_res, second_res, second_qty
+            else:
+                res1, res2, long_req = second_res, first_res, second_qty
+        else:
+            first_fill = None
+            res1, res2 = await asyncio.gather(long_leg(qty), short_leg(qty), return_exceptions=True)
         
-        # 잔고 강제 업데이트 요청 (다음 주문을 위해)
-        await self.pm.update_balances()
+        # 주문 후 잔고 동기화 요청 (Extended 잔고 랙 대비 2초 후, 백그라운드)
+        self.pm.request_snapshot(delay=2.0)
 
-        success1 = isinstance(res1, dict)
-        success2 = isinstance(res2, dict)
+        # 레그별 실제 체결 수량 확정 (IOC 부분 체결 대비, 순차 주문의 첫 레그는 이미 확정됨)
+        async def _fill(ex, res, req, px, is_first):
+            if is_first: return first_fill
+            return await ex.confirm_fill(res, req, px) if isinstance(res, dict) else (0.0, 0.0)
+        (long_filled, long_avg), (short_filled, short_avg) = await asyncio.gather(
+            _fill(long_ex, res1, long_req, long_price, first_fill is not None and first_ex == long_ex_name),
+            _fill(short_ex, res2, short_req, short_price, first_fill is not None and first_ex == short_ex_name)
+        )
+        self.journal.record_fill(symbol, long_ex_name, 'BUY', long_filled, long_avg or long_price)
+        self.journal.record_fill(symbol, short_ex_name, 'SELL', short_filled, short_avg or short_price)
+        if isinstance(res1, dict): self.venue_scorer.record_fill_ratio(long_ex_name, long_filled / long_req)
+        if isinstance(res2, dict): self.venue_scorer.record_fill_ratio(short_ex_name, short_filled / short_req)
+
+        success1 = long_filled > 0
+        success2 = short_filled > 0
         
         if success1 and success2:
-            log.info(f"✅ [체결완료] {symbol} Arbitrage 진입 성공!")
-            self.active_positions[symbol] = {
-                'qty': qty, 'long': long_ex_name, 'short': short_ex_name, 'time': time.time(),
-                'entry_spread': spread, 'current_spread': spread
-            }
+            hedged_qty, long_qty, short_qty = long_filled, long_filled, short_filled
+            if long_filled != short_filled:
+                hedged_qty, long_qty, short_qty = await self.residual_balancer.reconcile(
+                    symbol, long_ex_name, long_filled, short_ex_name, short_filled, long_price, short_price
+                )
+            log.info(f"✅ [체결완료] {symbol} Arbitrage 진입 성공! (헤지 수량 {hedged_qty})")
+            long_px, short_px = long_avg or long_price, short_avg or short_price
+            self._open_position(symbol, {
+                'qty': hedged_qty, 'long_qty': long_qty, 'short_qty': short_qty,
+                'long': long_ex_name, 'short': short_ex_name, 'time': time.time(),
+                'entry_spread': spread, 'current_spread': spread,
+                'long_px': long_px, 'short_px': short_px,
+                'pnl_id': self._record_entry(symbol, long_ex_name, long_qty, long_px, short_ex_name, short_qty, short_px)
+            })
         elif success1 or success2:
-            log.critical(f"🚨 [LEGGING] 한쪽만 체결됨! 즉시 청산 실행")
-            try:
-                if success1: await long_ex.place_market_order(symbol, 'SELL', qty, long_price, reduce_only=True)
-                else: await short_ex.place_market_order(symbol, 'BUY', qty, short_price, reduce_only=True)
-            except: pass
+            log.critical(f"🚨 [LEGGING] 한쪽만 체결됨! 차선 거래소로 재주문 시도")
+            if success1:
+                inc = await self.legging_recovery.recover(
+                    symbol, long_ex_name, 'BUY', long_filled, long_avg or long_price, short_ex_name, target_lev)
+            else:
+                inc = await self.legging_recovery.recover(
+                    symbol, short_ex_name, 'SELL', short_filled, short_avg or short_price, long_ex_name, target_lev)
+            if inc['outcome'] != 'rerouted': return
+
+            # 재주문 성공 → 대체 거래소를 반대 레그로 하여 포지션 등록
+            if success1:
+                short_ex_name, short_filled, short_price = inc['route_ex'], inc['route_qty'], inc['route_price']
+            else:
+                long_ex_name, long_filled, long_price = inc['route_ex'], inc['route_qty'], inc['route_price']
+            hedged_qty, long_qty, short_qty = await self.residual_balancer.reconcile(
+                symbol, long_ex_name, long_filled, short_ex_name, short_filled, long_price, short_price
+            )
+            route_spread = (short_price - long_price) / long_price * 100 if long_price > 0 else spread
+            log.info(f"✅ [레깅 복구] {symbol} {long_ex_name}/{short_ex_name} 로 포지션 유지 (Spread {route_spread:.3f}%)")
+            long_px = long_price if success2 else (long_avg or long_price)
+            short_px = short_price if success1 else (short_avg or short_price)
+            self._open_position(symbol, {
+                'qty': hedged_qty, 'long_qty': long_qty, 'short_qty': short_qty,
+                'long': long_ex_name, 'short': short_ex_name, 'time': time.time(),
+                'entry_spread': route_spread, 'current_spread': route_spread,
+                'long_px': long_px, 'short_px': short_px,
+                'pnl_id': self._record_entry(symbol, long_ex_name, long_qty, long_px, short_ex_name, short_qty, short_px)
+            })
+
+    def _open_position(self, symbol, pos):
+        """포지션 등록 + 저널 기록 (크래시 후 재시작 시 복원 대상)"""
+        self.active_positions[symbol] = pos
+        self.journal.record_open(symbol, pos)
+
+    def _restore_positions(self):
+        """
+        [크래시 복구] 저널을 재생하여 열린 포지션을 복원하고, 기동 시 동시 조회한 잔고 스냅샷의 실제 포지션과 대조합니다.
+        - 양쪽 확인 / 조회 실패(미확인) → 청산 감시 재개 (수량은 거래소 기준으로 축소)
+        - 한쪽만 남음 → 남은 레그만 청산 대상으로 감시
+        - 양쪽 모두 없음 → 외부 청산으로 기록
+        """
+        t0 = time.perf_counter()
+        positions, pending = self.journal.replay()
+        for symbol, fills in pending.items():
+            legs = ", ".join(f"{f['ex']} {f['side']} {f['qty']}@{f['price']}" for f in fills)
+            log.critical(f"🚨 [복구] {symbol} 진입 체결 후 포지션 미등록 ({legs}) → 거래소에서 직접 확인 필요")
+
+        kept = {}
+        if positions:
+            tol = getattr(settings, 'POSITION_JOURNAL_CONFIG', {}).get('QTY_TOLERANCE', 0.05)
+            balances = {name: self.pm.last_balances.get(name) for name in self.exchanges}
+            for symbol, (status, long_qty, short_qty) in reconcile(positions, balances, self.symbols, tol).items():
+                pos = positions[symbol]
+                if pos['long'] not in self.exchanges or pos['short'] not in self.exchanges:
+                    log.critical(f"🚨 [복구] {symbol} {pos['long']}/{pos['short']} 거래소 미연결 → 감시 불가 (저널 유지)")
+                    kept[symbol] = pos
+                    continue
+                if status == 'gone':
+                    log.warning(f"⚠️ [복구] {symbol} 거래소에 포지션 없음 → 외부 청산으로 기록")
+                    self.journal.record_close(symbol, 'external')
+                    continue
+                if status == 'one_leg':
+                    log.critical(f"🚨 [복구] {symbol} 한쪽 레그만 남음 (Long {long_qty} / Short {short_qty}) → 남은 레그 청산 감시")
+                pos.update(long_qty=long_qty, short_qty=short_qty, qty=min(long_qty, short_qty) or max(long_qty, short_qty),
+                           current_spread=pos.get('entry_spread', 0.0))
+                self._rehydrate_pnl(symbol, pos)
+                self.active_positions[symbol] = kept[symbol] = pos
+                log.info(f"♻️ [복구] {symbol} {pos['long']}/{pos['short']} L:{long_qty} S:{short_qty} ({status}) 감시 재개")
+        self.journal.compact(kept, pending)
+        self.market_sync.phase_timings['restore_ms'] = (time.perf_counter() - t0) * 1000
+        if positions or pending:
+            log.info(f"📓 [복구] 포지션 {len(self.active_positions)}개 감시 재개 ({self.market_sync.phase_timings['restore_ms']:.0f}ms)")
+
+    def _rehydrate_pnl(self, symbol, pos):
+        """복원된 포지션의 손익 추적 재개 (진입 수수료는 이미 기록되었으므로 0 으로 반영)"""
+        pnl_id = pos.get('pnl_id') or f"{symbol}-{int(pos.get('time', time.time()) * 1000)}"
+        pos['pnl_id'] = pnl_id
+        preset = (self.config.current.pairs.get(symbol) or {}).get('strategy_preset', 'major')
+        self.pnl.open(pnl_id, symbol, pos['long'], pos['short'], preset)
+        self.pnl.on_fill(pnl_id, pos['long'], 'BUY', pos['long_qty'], pos.get('long_px', 0.0), fee_rate=0.0)
+        self.pnl.on_fill(pnl_id, pos['short'], 'SELL', pos['short_qty'], pos.get('short_px', 0.0), fee_rate=0.0)
+
+    def _record_entry(self, symbol, long_ex_name, long_qty, long_px, short_ex_name, short_qty, short_px):
+        """진입 체결을 손익 엔진/매매 기록에 반영하고 손익 추적 ID 를 반환합니다."""
+        preset = (self.config.current.pairs.get(symbol) or {}).get('strategy_preset', 'major')
+        pnl_id = f"{symbol}-{int(time.time() * 1000)}"
+        self.pnl.open(pnl_id, symbol, long_ex_name, short_ex_name, preset)
+        _, fee1 = self.pnl.on_fill(pnl_id, long_ex_name, 'BUY', long_qty, long_px)
+        _, fee2 = self.pnl.on_fill(pnl_id, short_ex_name, 'SELL', short_qty, short_px)
+        self.pm.log_trade({
+            'Symbol': symbol, 'Type': 'Entry', 'Side': 'BUY/SELL', 'Qty': min(long_qty, short_qty),
+            'Price': long_px, 'Short_Price': short_px, 'Exchange': f"{long_ex_name}/{short_ex_name}",
+            'PnL': -(fee1 + fee2), 'Fees': fee1 + fee2
+        })
+        return pnl_id
+
+    def _accrue_funding(self, snapshot):
+        """잔고 스냅샷의 포지션별 누적 펀딩 → 손익 엔진 (보유 포지션 레그별 변동분만 반영, 지연/실패 거래소 제외)"""
+        if not self.active_positions: return
+        funding = {}
+        for name, bal in self.pm.last_balances.items():
+            if name in snapshot['Stale'] or not bal or not bal.get('positions_ok', True): continue
+            for p in bal.get('positions', []):
+                if p.get('funding') is None: continue
+                sym = str(p.get('symbol', ''))
+                ticker = self.symbols.ticker(name, sym) or self.symbols.ticker(name, sym.upper()) or sym
+                side = 'LONG' if str(p.get('side', '')).upper() in ('LONG', 'BUY', 'BID') else 'SHORT'
+                funding[(name, ticker, side)] = p['funding']
+        for symbol, pos in self.active_positions.items():
+            if not pos.get('pnl_id'): continue
+            for ex_name, side in ((pos['long'], 'LONG'), (pos['short'], 'SHORT')):
+                total = funding.get((ex_name, symbol, side))
+                if total is not None: self.pnl.on_funding_total(pos['pnl_id'], ex_name, total)
+
+    def get_pnl_summary(self):
+        """GUI 용 손익 집계 (전체 / 심볼 / 거래소 쌍 / 전략 프리셋 / 보유 포지션)"""
+        return self.pnl.summary()
+
+    @staticmethod
+    async def _no_fill():
+        return 0.0, 0.0
+
+    async def _timed_order(self, ex_name, order_coro):
+        """주문 왕복 시간과 결과를 측정하여 VenueScorer 에 반영합니다."""
+        start = time.perf_counter()
+        try:
+            res = await order_coro
+        except Exception as e:
+            self.venue_scorer.record_order(ex_name, time.perf_counter() - start, accepted=False)
+            return e
+        self.venue_scorer.record_order(ex_name, time.perf_counter() - start, accepted=isinstance(res, dict))
+        return res
+
+    def get_execution_metrics(self):
+        """GUI 용 실행 품질 지표 (거래소 품질 + 잔여 델타 + 레깅 복구 + Rate Limit 대기열 + 잔고 조회 시간 + 기동 단계 + 설정 + 저널 + 기회 순위)"""
+        return {
+            'venues': self.venue_scorer.summary(),
+            'residuals': self.residual_balancer.summary() if self.residual_balancer else {},
+            'legging': self.legging_recovery.summary(),
+            'rate_limits': rate_limit_summary(),
+            'balances': self.pm.balance_timings if self.pm else {},
+            'startup': {
+                'phases_ms': self.market_sync.phase_timings if self.market_sync else {},
+                'markets_ready': {name: ex.markets_ready for name, ex in self.exchanges.items()}
+            },
+            'config': {'service': {'version': self.config.current.version, **self.config.stats}},
+            'journal': {'positions': {'open': len(self.active_positions), **self.journal.stats}},
+            'ranking': {**self.book.summary(5), 'allocator': {'ranked': len(self.book.heap), 'entering': len(self._entering), **self.allocator.stats}}
+        }
+
+    async def _on_config_change(self, old, new, diff):
+        """설정 교체 알림: 추가된 티커만 레지스트리 등록 + 해당 거래소 증분 구독 (기존 WS/매매는 그대로)"""
+        if not diff['added']: return
+        per_exchange = {}
+        for ticker in diff['added']:
+            for ex_name, native in self.symbols.add_ticker(ticker, new.pairs[ticker]).items():
+                per_exchange.setdefault(ex_name, {})[ticker] = native
+        await asyncio.gather(*(
+            self.exchanges[name].add_symbols(natives)
+            for name, natives in per_exchange.items() if name in self.exchanges
+        ), return_exceptions=True)
+        if self.market_sync: self.market_sync.build_common_info()
+        log.info(f"➕ [설정] 신규 티커 {diff['added']} 구독 완료 ({', '.join(per_exchange) or '-'})")
 
     def get_market_summary(self):
         if not self.market_sync: return []
         data = []
-        for t, c in settings.TARGET_PAIRS_CONFIG.items():
+        for t, c in self.config.current.pairs.items():
             i = self.market_sync.common_info.get(t, {})
             data.append({
                 'Ticker': t, 'Min_Qty': i.get('min_qty'), 
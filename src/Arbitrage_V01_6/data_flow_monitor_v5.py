@@ -53,10 +53,13 @@ class DataFlowMonitor:
             
         # 5. Lighter
         if os.getenv('LIGHTER_PRIVATE_KEY'):
-            self.exchanges['LTR'] = LighterExchange(
-                os.getenv('LIGHTER_PRIVATE_KEY'), 
-                os.getenv('LIGHTER_WALLET_ADDRESS')
-            )
+            try:
+                self.exchanges['LTR'] = LighterExchange(
+                    os.getenv('LIGHTER_PRIVATE_KEY'), 
+                    os.getenv('LIGHTER_WALLET_ADDRESS')
+                )
+            except ValueError as e:
+                logging.error(f"[LTR] 제외: {e}")
 
     # [핵심] 빈 비동기 콜백 함수 (데이터는 내부 캐시에 쌓임)
     async def _dummy_callback(self, data):
@@ -39,9 +39,16 @@ try:
     if "GET_ALL_INITIAL_LEVERAGE" not in GRVT_ENDPOINTS[GrvtEndpointType.TRADE_DATA]:
         GRVT_ENDPOINTS[GrvtEndpointType.TRADE_DATA]["GET_ALL_INITIAL_LEVERAGE"] = f"full/{END_POINT_VERSION}/get_all_initial_leverage"
         GRVT_ENDPOINTS[GrvtEndpointType.TRADE_DATA]["SET_INITIAL_LEVERAGE"] = f"full/{END_POINT_VERSION}/set_initial_leverage"
+    if "GET_FUNDING_PAYMENT_HISTORY" not in GRVT_ENDPOINTS[GrvtEndpointType.TRADE_DATA]:
+        GRVT_ENDPOINTS[GrvtEndpointType.TRADE_DATA]["GET_FUNDING_PAYMENT_HISTORY"] = f"full/{END_POINT_VERSION}/funding_payment_history"
 except ImportError:
     GrvtCcxtWS = None; GrvtEnv = None
 
+from utils.lighter_nonce import LighterNonceManager
+from utils.rate_limiter import get_limiter, ORDER, ACCOUNT, METADATA
+from utils.symbol_registry import get_registry
+from utils.lot_math import lot_from_step
+
 # --- Settings & Constants ---
 try:
     import settings
@@ -63,17 +70,35 @@ log.setLevel(logging.INFO)
 BASED_BUILDER_ADDRESS = "0x1924b8561eeF20e70Ede628A296175D358BE80e5"
 BASED_CLOID_STR = "0xba5ed11067f2cc08ba5ed10000ba5ed1"
 
+def _funding_received(paid):
+    """거래소가 주는 '지불한 펀딩' 누적값 → 받은 펀딩 (+: 수령, -: 지불). 값이 없으면 None"""
+    if paid in (None, ''): return None
+    try: return -float(paid)
+    except (TypeError, ValueError): return None
+
 class Exchange(ABC):
+    name = None  # 봇 거래소 약칭 (HL, GRVT, PAC, EXT, LTR)
+
     def __init__(self):
+        self.registry = get_registry()
         self.ws_running = False
         self.bbo_cache = {} 
         self.last_log_time = 0
         self.last_prices = {} 
         self.market_info = {} 
+        # 실시간 load_markets 성공 여부 (스냅샷으로만 채워진 상태에서는 False → 주문 보류)
+        self.markets_ready = False
 
     @abstractmethod
     async def start_ws(self, callback: Callable): pass
 
+    async def add_symbols(self, natives: Dict):
+        """
+        [증분 구독] 설정 핫 리로드로 추가된 티커 { 티커: 네이티브 심볼 } 를 기존 연결에 추가합니다 (재연결 없음).
+        전체 시세 채널을 받는 거래소 (HL allMids, PAC prices) 는 레지스트리 등록만으로 바로 수신됩니다.
+        """
+        log.info(f"➕ [{self.name}] 티커 추가: {list(natives)}")
+
     def get_bbo(self, ticker: str) -> Optional[Dict]:
         return self.bbo_cache.get(ticker)
 
@@ -107,33 +132,48 @@ class Exchange(ABC):
     async def place_market_order(self, symbol: str, side: str, amount: float, price: float = None, reduce_only: bool = False): pass
 
     @abstractmethod
-    async def get_balance(self) -> Dict: pass
+    async def get_balance(self) -> Dict:
+        """
+        {'equity', 'available', 'positions': [{'symbol', 'size', 'amount', 'side', 'entry_price', 'funding'}], 'positions_ok'}
+        funding: 포지션 오픈 이후 누적 펀딩 (+: 수령, -: 지불, USD). 거래소가 제공하지 않으면 None
+        """
+
+    def get_market(self, symbol: str) -> Optional[Dict]:
+        """봇 티커 / 네이티브 심볼 -> market_info (심볼 레지스트리로 O(1) 조회)"""
+        return self.market_info.get(self.registry.market_key(self.name, symbol))
 
     def validate_amount(self, symbol: str, amount: float) -> float:
-        base = symbol.split('_')[0].split('-')[0]
-        if base.startswith('k'): base = base[1:]
-        if base.startswith('1000'): base = base[4:]
-        
-        info = self.market_info.get(base)
-        if not info: return round(amount, 4)
+        lot = self.registry.lot(self.name, symbol)
+        if not lot: return round(amount, 4)
+        # 정수 로트 단위 내림 (최소 수량 미만이면 0.0)
+        return lot.validate(amount)
 
-        prec = info.get('qty_prec', 3)
-        min_sz = info.get('min_size', 0.0)
+    def export_metadata(self) -> Dict:
+        """디스크 스냅샷에 저장할 마켓 메타데이터 (정밀도, 최소 수량, 최대 레버리지, 틱, 마켓 ID)"""
+        return {'market_info': self.market_info}
 
-        if amount < min_sz:
-            return 0.0
+    def restore_metadata(self, data: Dict):
+        """스냅샷 복원 (실시간 load_markets 전에 사이징/구독에 사용)"""
+        self.market_info.update(data.get('market_info', {}))
 
-        if prec <= 0:
-             step = 10 ** abs(prec)
-             return math.floor(amount / step) * step
-        else:
-            factor = 10 ** prec
-            return math.floor(amount * factor) / factor
+    def parse_fill(self, res, amount: float, price: float = None) -> Tuple[float, float]:
+        """
+        [체결 수량 파싱] 주문 응답에서 (체결 수량, 평균 체결가)를 추출합니다.
+        응답에 체결 정보가 없는 거래소는 주문 성공 = 요청 수량 전량 체결로 간주합니다.
+        """
+        if not isinstance(res, dict): return 0.0, 0.0
+        return amount, (price or 0.0)
+
+    async def confirm_fill(self, res, amount: float, price: float = None) -> Tuple[float, float]:
+        """주문 후 실제 체결 수량을 확정합니다. (필요 시 거래소별로 주문 조회)"""
+        return self.parse_fill(res, amount, price)
 
 # ==========================================
 # 2. Hyperliquid Implementation
 # ==========================================
 class HyperliquidExchange(Exchange):
+    name = 'HL'
+
     def __init__(self, private_key: str):
         super().__init__()
         self.private_key = private_key
@@ -141,18 +181,10 @@ class HyperliquidExchange(Exchange):
         self.main_address = os.getenv("HYPERLIQUID_MAIN_ADDRESS")
         self.exchange = None
         self.info = None
+        self.limiter = get_limiter('HL')
         
         self.ws_url = "wss://api.hyperliquid.xyz/ws"
-        self.target_symbols = []
-        self.reverse_map = {} 
-        if settings:
-            for ticker, cfg in settings.TARGET_PAIRS_CONFIG.items():
-                if 'hyperliquid' in cfg['symbols']:
-                    hl_sym = cfg['symbols']['hyperliquid']
-                    if hl_sym:
-                        self.target_symbols.append(hl_sym)
-                        self.reverse_map[hl_sym] = ticker 
-                        if hl_sym.startswith('k'): self.reverse_map[hl_sym[1:]] = ticker
+        self.target_symbols = list(self.registry.natives('HL'))
         
         if Info and self.private_key:
             try:
@@ -166,7 +198,7 @@ class HyperliquidExchange(Exchange):
 
     async def load_markets(self):
         try:
-            meta = self.info.meta()
+            meta = await self.limiter.call(METADATA, self.info.meta, cost=20)
             for asset in meta['universe']:
                 name = asset['name']
                 self.market_info[name] = {
@@ -174,12 +206,13 @@ class HyperliquidExchange(Exchange):
                     'min_size': 10 ** (-asset['szDecimals']),
                     'max_lev': int(asset['maxLeverage'])
                 }
+            self.markets_ready = True
             log.info(f"✅ [HL] {len(self.market_info)}개 심볼 로드 완료")
         except Exception as e: log.error(f"❌ [HL] 로드 실패: {e}")
 
     async def get_balance(self):
         try:
-            state = self.info.user_state(self.main_address)
+            state = await self.limiter.call(ACCOUNT, self.info.user_state, self.main_address, cost=2)
             margin = state.get('marginSummary', {})
             equity = float(margin.get('accountValue', 0))
             withdrawable = float(margin.get('withdrawable', 0))
@@ -196,9 +229,11 @@ class HyperliquidExchange(Exchange):
                     positions.append({
                         'symbol': coin, 'size': abs(size), 'amount': abs(size),
                         'side': 'LONG' if size > 0 else 'SHORT',
-                        'entry_price': float(pos_data.get('entryPx', 0))
+                        'entry_price': float(pos_data.get('entryPx', 0)),
+                        # cumFunding.sinceOpen: 오픈 이후 지불한 펀딩 (+: 지불)
+                        'funding': _funding_received((pos_data.get('cumFunding') or {}).get('sinceOpen'))
                     })
-            return {'equity': equity, 'available': available, 'positions': positions}
+            return {'equity': equity, 'available': available, 'positions': positions, 'positions_ok': True}
         except Exception as e:
             log.error(f"❌ [HL] 잔고 조회 실패: {e}")
             return None
@@ -206,16 +241,18 @@ class HyperliquidExchange(Exchange):
     async def place_market_order(self, symbol, side, amount, price=None, reduce_only=False):
         val_amt = self.validate_amount(symbol, amount)
         if val_amt <= 0: return None
+        coin = self.registry.native('HL', symbol, symbol)
         is_buy = (side.upper() == 'BUY')
-        if price is None: price = float(self.info.all_mids().get(symbol, 0))
+        if price is None: price = float((await self.limiter.call(ORDER, self.info.all_mids, cost=2)).get(coin, 0))
         limit_px = float(f"{price * 1.05:.5g}") if is_buy else float(f"{price * 0.95:.5g}")
 
         order = {
-            "coin": symbol, "is_buy": is_buy, "sz": val_amt, "limit_px": limit_px,
+            "coin": coin, "is_buy": is_buy, "sz": val_amt, "limit_px": limit_px,
             "order_type": {"limit": {"tif": "Ioc"}}, "reduce_only": reduce_only,
             "cloid": Cloid.from_str(BASED_CLOID_STR)
         }
         try:
+            await self.limiter.acquire(ORDER)
             res = self.exchange.bulk_orders([order], builder={"b": BASED_BUILDER_ADDRESS.lower(), "f": 25})
             if res['status'] == 'ok':
                 log.info(f"✅ [HL] 주문 성공: {symbol} {side} (Reduce: {reduce_only})")
@@ -227,9 +264,21 @@ class HyperliquidExchange(Exchange):
             log.error(f"❌ [HL] 예외: {e}")
             return None
 
+    def parse_fill(self, res, amount, price=None):
+        # {'status':'ok','response':{'data':{'statuses':[{'filled':{'totalSz','avgPx'}}]}}}
+        if not isinstance(res, dict): return 0.0, 0.0
+        try:
+            statuses = res['response']['data']['statuses']
+            filled = statuses[0].get('filled') if statuses else None
+            if not filled: return 0.0, 0.0
+            return float(filled.get('totalSz', 0)), float(filled.get('avgPx', 0))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return amount, (price or 0.0)
+
     async def set_leverage(self, symbol, leverage):
         try:
-            self.exchange.update_leverage(leverage, symbol, is_cross=True)
+            coin = self.registry.native('HL', symbol, symbol)
+            await self.limiter.call(ORDER, self.exchange.update_leverage, leverage, coin, is_cross=True)
             return True, leverage
         except: return False, leverage
 
@@ -245,7 +294,7 @@ class HyperliquidExchange(Exchange):
                         if data.get("channel") == "allMids":
                             mids = data.get("data", {}).get("mids", {})
                             for coin, price_str in mids.items():
-                                bot_symbol = self.reverse_map.get(coin) or self.reverse_map.get("k" + coin)
+                                bot_symbol = self.registry.ticker('HL', coin)
                                 if bot_symbol:
                                     try:
                                         price = float(price_str)
@@ -263,12 +312,18 @@ class HyperliquidExchange(Exchange):
 # 3. GRVT Implementation
 # ==========================================
 class GrvtExchange(Exchange):
+    name = 'GRVT'
+
     def __init__(self):
         super().__init__()
         self.grvt = None
+        self.ws = None; self._callback = None
+        self.limiter = get_limiter('GRVT')
         self.api_key = os.getenv('GRVT_API_KEY')
         self.private_key = os.getenv('GRVT_PRIVATE_KEY') or os.getenv('GRVT_SECRET_KEY')
         self.sub_account_id = os.getenv('GRVT_TRADING_ACCOUNT_ID')
+        self._funding_cum = {}   # 인스트루먼트 -> 보유 중 누적 펀딩 (+: 수령)
+        self._funding_after = 0  # 마지막으로 반영한 펀딩 지급 시각 (ns)
 
         if GrvtCcxtWS:
             try:
@@ -286,18 +341,12 @@ class GrvtExchange(Exchange):
             except Exception as e:
                 log.error(f"❌ [GRVT] SDK 초기화 실패: {e}")
                 
-        self.target_instruments = []
-        self.reverse_map = {} 
-        if settings:
-            for ticker, cfg in settings.TARGET_PAIRS_CONFIG.items():
-                if 'grvt' in cfg['symbols']:
-                    sym = cfg['symbols']['grvt']
-                    if sym: self.target_instruments.append(sym); self.reverse_map[sym] = ticker 
+        self.target_instruments = list(self.registry.natives('GRVT'))
 
     async def load_markets(self):
         if not self.grvt: return
         try:
-            await self.grvt.initialize()
+            await self.limiter.call(METADATA, self.grvt.initialize, cost=3)
             if hasattr(self.grvt, 'markets'):
                 for sym, m in self.grvt.markets.items():
                     base = sym.split('_')[0]
@@ -314,7 +363,7 @@ class GrvtExchange(Exchange):
             try:
                 path = get_grvt_endpoint(GrvtEnv.PROD, "GET_ALL_INITIAL_LEVERAGE")
                 payload = {"sub_account_id": str(self.sub_account_id)}
-                res = await self.grvt._auth_and_post(path, payload)
+                res = await self.limiter.call(METADATA, self.grvt._auth_and_post, path, payload)
                 if res and "results" in res:
                     for item in res["results"]:
                         instr = item.get("instrument")
@@ -325,17 +374,20 @@ class GrvtExchange(Exchange):
                                 self.market_info[base]['max_lev'] = real_max_lev
                     log.info("✅ [GRVT] 레버리지 정보 동기화 완료")
             except: pass
+            self.markets_ready = True
             log.info(f"✅ [GRVT] {len(self.market_info)}개 심볼 로드 완료")
         except Exception as e: log.error(f"❌ [GRVT] 로드 중 에러: {e}")
 
     async def get_balance(self):
         if not self.grvt: return None
         try:
-            bal = await self.grvt.fetch_balance()
+            bal = await self.limiter.call(ACCOUNT, self.grvt.fetch_balance)
             equity = float(bal.get('USDT', {}).get('total', 0))
             available = float(bal.get('USDT', {}).get('free', 0))
             
-            raw_pos = await self.grvt.fetch_positions()
+            raw_pos = await self.limiter.call(ACCOUNT, self.grvt.fetch_positions)
+            held = [p.get('instrument', 'Unknown') for p in raw_pos if float(p.get('size') or p.get('contracts') or 0) != 0]
+            funding = await self._funding_since_open(held)
             positions = []
             for p in raw_pos:
                 sz = float(p.get('size') or p.get('contracts') or 0)
@@ -344,27 +396,53 @@ class GrvtExchange(Exchange):
                     sym = instr.split('_')[0] if '_' in instr else instr
                     positions.append({
                         'symbol': sym, 'size': abs(sz), 'amount': abs(sz),
-                        'side': 'LONG' if sz > 0 else 'SHORT', 'entry_price': float(p.get('entry_price', 0))
+                        'side': 'LONG' if sz > 0 else 'SHORT', 'entry_price': float(p.get('entry_price', 0)),
+                        'funding': funding.get(instr) if funding is not None else None
                     })
-            return {'equity': equity, 'available': available, 'positions': positions}
+            return {'equity': equity, 'available': available, 'positions': positions, 'positions_ok': True}
         except: return None
 
+    async def _funding_since_open(self, held):
+        """
+        GRVT 포지션 응답에는 펀딩 누적값이 없어 펀딩 지급 내역 (funding_payment_history) 을 증분 조회해 인스트루먼트별로 누적합니다.
+        보유하지 않게 된 인스트루먼트는 0 부터 다시 누적 (봇 시작 전 지급분은 포함되지 않음). 조회 실패 시 None
+        """
+        try:
+            start = self._funding_after + 1 if self._funding_after else time.time_ns()
+            payload = {'sub_account_id': str(self.sub_account_id), 'start_time': str(start), 'limit': 1000}
+            path = get_grvt_endpoint(GrvtEnv.PROD, "GET_FUNDING_PAYMENT_HISTORY")
+            resp = await self.limiter.call(ACCOUNT, self.grvt._auth_and_post, path, payload)
+            latest = self._funding_after
+            for f in (resp or {}).get('result') or []:  # 최신순
+                ts = int(f.get('event_time') or 0)
+                if ts <= self._funding_after: continue
+                instr = f.get('instrument')
+                # amount: 지불이면 +, 수령이면 -
+                self._funding_cum[instr] = self._funding_cum.get(instr, 0.0) + (_funding_received(f.get('amount')) or 0.0)
+                latest = max(latest, ts)
+            self._funding_after = latest or start
+        except Exception as e:
+            log.warning(f"⚠️ [GRVT] 펀딩 내역 조회 실패: {e}")
+            return None
+        for instr in [i for i in self._funding_cum if i not in held]:
+            del self._funding_cum[instr]
+        return {instr: self._funding_cum.get(instr, 0.0) for instr in held}
+
     async def place_market_order(self, symbol, side, amount, price=None, reduce_only=False):
         val_amt = self.validate_amount(symbol, amount)
         if val_amt <= 0: return None
-        full_symbol = f"{symbol}_USDT_Perp"
-        info = self.market_info.get(symbol, {})
-        tick_size = info.get('tick_size', 0.01)
+        full_symbol = self.registry.native('GRVT', symbol) or f"{symbol}_USDT_Perp"
+        tick = self.registry.tick('GRVT', symbol) or lot_from_step(0.01)
         
         current_price = 0.0
         try:
             try:
-                ticker = await self.grvt.fetch_ticker(full_symbol)
+                ticker = await self.limiter.call(ORDER, self.grvt.fetch_ticker, full_symbol)
                 current_price = float(ticker.get('last') or ticker.get('close') or 0)
             except: pass
             if current_price == 0:
                 try:
-                    ob = await self.grvt.fetch_order_book(full_symbol, limit=1)
+                    ob = await self.limiter.call(ORDER, self.grvt.fetch_order_book, full_symbol, limit=1)
                     if side.upper() == 'BUY' and ob.get('asks'): current_price = float(ob['asks'][0][0])
                     elif side.upper() == 'SELL' and ob.get('bids'): current_price = float(ob['bids'][0][0])
                 except: pass
@@ -377,9 +455,10 @@ class GrvtExchange(Exchange):
                 log.error(f"❌ [GRVT] 가격 정보 없음. 주문 취소.")
                 return None
             
-            limit_px = float(Decimal(str(raw_limit)).quantize(Decimal(str(tick_size)), rounding=ROUND_HALF_UP))
-            order_type = 'limit'; log_msg = f"Limit IOC @ {limit_px} (Tick: {tick_size})"
+            limit_px = tick.round(raw_limit)
+            order_type = 'limit'; log_msg = f"Limit IOC @ {limit_px} (Tick: {tick.step})"
 
+            await self.limiter.acquire(ORDER)
             res = await self.grvt.create_order(
                 full_symbol, order_type, side.lower(), val_amt, limit_px,
                 {'reduce_only': reduce_only, 'time_in_force': 'IMMEDIATE_OR_CANCEL'}
@@ -393,13 +472,52 @@ class GrvtExchange(Exchange):
             log.error(f"❌ [GRVT] 주문 에러: {e}")
             return None
 
+    @staticmethod
+    def _order_fill_state(order):
+        """GRVT 주문 객체 -> (상태, 체결 수량, 평균 체결가)"""
+        state = order.get('state', {}) if isinstance(order, dict) else {}
+        status = str(state.get('status', '')).upper()
+        traded = state.get('traded_size') or [0]
+        avg_px = state.get('avg_fill_price') or [0]
+        try: qty = sum(float(x) for x in traded)
+        except (TypeError, ValueError): qty = 0.0
+        try: px = float(avg_px[0])
+        except (TypeError, ValueError, IndexError): px = 0.0
+        return status, qty, px
+
+    def parse_fill(self, res, amount, price=None):
+        if not isinstance(res, dict): return 0.0, 0.0
+        status, qty, px = self._order_fill_state(res)
+        if status in ('FILLED', 'CANCELLED', 'REJECTED'): return qty, (px or price or 0.0)
+        return amount, (price or 0.0)
+
+    async def confirm_fill(self, res, amount, price=None):
+        """IOC 주문은 응답 시점에 PENDING 인 경우가 많아, 최종 상태가 될 때까지 짧게 조회합니다."""
+        if not isinstance(res, dict): return 0.0, 0.0
+        status, qty, px = self._order_fill_state(res)
+        if status in ('FILLED', 'CANCELLED', 'REJECTED'): return qty, (px or price or 0.0)
+        client_oid = res.get('metadata', {}).get('client_order_id')
+        order_id = res.get('order_id') or res.get('id')
+        for _ in range(5):
+            await asyncio.sleep(0.2)
+            try:
+                params = {'client_order_id': client_oid} if client_oid else {}
+                await self.limiter.acquire(ORDER)
+                order = await self.grvt.fetch_order(id=order_id if not client_oid else None, params=params)
+            except Exception:
+                continue
+            status, qty, px = self._order_fill_state(order)
+            if status in ('FILLED', 'CANCELLED', 'REJECTED'): return qty, (px or price or 0.0)
+        log.warning(f"⚠️ [GRVT] 체결 확인 실패 → 요청 수량 전량 체결로 간주 ({amount})")
+        return amount, (price or 0.0)
+
     async def set_leverage(self, symbol, leverage):
         if not self.grvt: return False, leverage
-        full_symbol = f"{symbol}_USDT_Perp"
+        full_symbol = self.registry.native('GRVT', symbol) or f"{symbol}_USDT_Perp"
         try:
             path = get_grvt_endpoint(GrvtEnv.PROD, "SET_INITIAL_LEVERAGE")
             payload = {"sub_account_id": str(self.sub_account_id), "instrument": full_symbol, "leverage": str(leverage)}
-            res = await self.grvt._auth_and_post(path, payload)
+            res = await self.limiter.call(ORDER, self.grvt._auth_and_post, path, payload)
             if res and str(res.get("success", "")).lower() == "true":
                 log.info(f"✅ [GRVT] {symbol} 레버리지 x{leverage} 설정 성공")
                 return True, leverage
@@ -419,35 +537,42 @@ class GrvtExchange(Exchange):
                 quiet.setLevel(logging.CRITICAL)
                 self.ws = GrvtCcxtWS(env=GrvtEnv.PROD, loop=loop, logger=quiet, parameters=params)
                 await self.ws.initialize() 
-                def make_cb(instr):
-                    async def wrapped(msg):
-                        try:
-                            feed = msg.get("feed")
-                            if feed:
-                                b, a = feed.get('bids', []), feed.get('asks', [])
-                                if b and a:
-                                    bot_sym = self.reverse_map.get(instr, instr.split('_')[0])
-                                    bid_p, ask_p = float(b[0]['price']), float(a[0]['price'])
-                                    if bot_sym == 'RESOLV' and bid_p > 10: return
-                                    bbo = self._validate_and_format('GRVT', bot_sym, bid_p, ask_p)
-                                    if bbo: 
-                                        self.bbo_cache[bot_sym] = bbo
-                                        self._log_heartbeat('GRVT', bot_sym, bid_p)
-                                        await callback(bbo)
-                        except: pass
-                    return wrapped
-                
-                subs = self.target_instruments
-                if not subs and settings:
-                    for ticker, cfg in settings.TARGET_PAIRS_CONFIG.items():
-                         if 'grvt' in cfg['symbols']:
-                             sym = cfg['symbols']['grvt']
-                             if sym: subs.append(sym); self.reverse_map[sym] = ticker
-
-                for instr in subs:
-                    if instr: await self.ws.subscribe(stream='book.s', callback=make_cb(instr), params={'instrument': instr, 'depth': 10})
+                self._callback = callback
+                for instr in self.target_instruments:
+                    if instr: await self._subscribe_book(instr)
                 while self.ws_running: await asyncio.sleep(1)
             except: await asyncio.sleep(5)
+
+    def _make_book_cb(self, instr):
+        async def wrapped(msg):
+            try:
+                feed = msg.get("feed")
+                if feed:
+                    b, a = feed.get('bids', []), feed.get('asks', [])
+                    if b and a:
+                        bot_sym = self.registry.ticker('GRVT', instr) or instr.split('_')[0]
+                        bid_p, ask_p = float(b[0]['price']), float(a[0]['price'])
+                        if bot_sym == 'RESOLV' and bid_p > 10: return
+                        bbo = self._validate_and_format('GRVT', bot_sym, bid_p, ask_p)
+                        if bbo: 
+                            self.bbo_cache[bot_sym] = bbo
+                            self._log_heartbeat('GRVT', bot_sym, bid_p)
+                            await self._callback(bbo)
+            except: pass
+        return wrapped
+
+    async def _subscribe_book(self, instr):
+        await self.ws.subscribe(stream='book.s', callback=self._make_book_cb(instr), params={'instrument': instr, 'depth': 10})
+
+    async def add_symbols(self, natives):
+        new = [instr for instr in natives.values() if instr not in self.target_instruments]
+        self.target_instruments.extend(new)
+        # 연결 중이면 같은 WS 에 구독만 추가 (끊겨 있으면 재연결 시 target_instruments 로 구독됨)
+        if self.ws_running and self.ws is not None and self._callback:
+            for instr in new:
+                try: await self._subscribe_book(instr)
+                except Exception as e: log.error(f"❌ [GRVT] {instr} 구독 추가 실패: {e}")
+        log.info(f"➕ [GRVT] 구독 추가: {new}")
     
     async def close(self):
         try:
@@ -460,12 +585,15 @@ class GrvtExchange(Exchange):
 # 4. Pacifica Implementation
 # ==========================================
 class PacificaExchange(Exchange):
+    name = 'PAC'
+
     def __init__(self, main_address: str, agent_private_key: str):
         super().__init__()
         self.url = "https://api.pacifica.fi/api/v1"
         self.ws_url = "wss://ws.pacifica.fi/ws"
         self.main_addr = main_address
         self.agent_pk = agent_private_key
+        self.limiter = get_limiter('PAC')
         
         if base58 and Keypair:
             try:
@@ -473,16 +601,7 @@ class PacificaExchange(Exchange):
                 self.agent_pub = str(self.kp.pubkey())
             except Exception as e: log.error(f"❌ [PAC] 키 에러: {e}")
 
-        self.target_mapping = {}
         self.virtual_spread = PAC_SPREAD
-        if settings:
-            for t, cfg in settings.TARGET_PAIRS_CONFIG.items():
-                if 'pacifica' in cfg['symbols']:
-                    sym = cfg['symbols']['pacifica']
-                    if sym:
-                        self.target_mapping[sym.upper()] = t
-                        if sym.startswith('k'): self.target_mapping[sym[1:].upper()] = t
-                        if sym.startswith('1000'): self.target_mapping[sym.replace('1000', '').upper()] = t
 
     def _sign_and_build_body(self, type_str, payload):
         ts = int(time.time() * 1000)
@@ -501,6 +620,7 @@ class PacificaExchange(Exchange):
     async def load_markets(self):
         try:
             loop = asyncio.get_running_loop()
+            await self.limiter.acquire(METADATA)
             res = await loop.run_in_executor(None, lambda: requests.get(f"{self.url}/info"))
             if res.status_code == 200:
                 for d in res.json().get('data', []):
@@ -508,13 +628,15 @@ class PacificaExchange(Exchange):
                     lot = float(d.get('lot_size', 0.001))
                     prec = int(round(-math.log10(lot), 0)) if lot > 0 else 3
                     max_lev = float(d.get('max_leverage', 20))
-                    self.market_info[sym] = {'qty_prec': prec, 'min_size': lot, 'max_lev': max_lev}
+                    self.market_info[sym] = {'qty_prec': prec, 'min_size': lot, 'lot_size': lot, 'max_lev': max_lev}
+                self.markets_ready = True
             log.info(f"✅ [PAC] {len(self.market_info)}개 심볼 로드 완료")
         except Exception as e: log.error(f"❌ [PAC] 로드 실패: {e}")
 
     async def get_balance(self):
         try:
             loop = asyncio.get_running_loop()
+            await self.limiter.acquire(ACCOUNT)
             r_acc = await loop.run_in_executor(None, lambda: requests.get(f"{self.url}/account", params={"account": self.main_addr}))
             equity = 0.0
             available = 0.0
@@ -523,6 +645,7 @@ class PacificaExchange(Exchange):
                 equity = float(d.get('account_equity') or d.get('available_to_spend') or 0)
                 available = float(d.get('available_to_spend') or 0)
 
+            await self.limiter.acquire(ACCOUNT)
             r_pos = await loop.run_in_executor(None, lambda: requests.get(f"{self.url}/positions", params={"account": self.main_addr}))
             pos_list = []
             if r_pos.status_code == 200:
@@ -536,18 +659,19 @@ class PacificaExchange(Exchange):
                             'size': abs(sz), 
                             'amount': abs(sz), 
                             'side': side,
-                            'entry_price': float(p.get('entry_price', 0))
+                            'entry_price': float(p.get('entry_price', 0)),
+                            'funding': _funding_received(p.get('funding'))  # 오픈 이후 지불한 펀딩
                         })
-            return {'equity': equity, 'available': available, 'positions': pos_list}
+            return {'equity': equity, 'available': available, 'positions': pos_list, 'positions_ok': r_pos.status_code == 200}
         except: return None
 
     async def place_market_order(self, symbol, side, amount, price=None, reduce_only=False):
         val_amt = self.validate_amount(symbol, amount)
         if val_amt <= 0: return None
-        prec = self.market_info.get(symbol, {}).get('qty_prec', 3)
-        fmt_amount = f"{val_amt:.{prec}f}"
+        lot = self.registry.lot('PAC', symbol)
+        fmt_amount = f"{val_amt:.{lot.decimals if lot else 3}f}"
         payload = {
-            "symbol": symbol, "side": "bid" if side.upper() == 'BUY' else "ask",
+            "symbol": self.registry.native('PAC', symbol, symbol), "side": "bid" if side.upper() == 'BUY' else "ask",
             "amount": fmt_amount, "reduce_only": reduce_only,
             "slippage_percent": "0.5", "client_order_id": str(uuid.uuid4())
         }
@@ -555,6 +679,7 @@ class PacificaExchange(Exchange):
         try:
             loop = asyncio.get_running_loop()
             headers = {"Content-Type": "application/json"}
+            await self.limiter.acquire(ORDER)
             res = await loop.run_in_executor(None, lambda: requests.post(f"{self.url}/orders/create_market", data=body_str, headers=headers))
             try: rj = res.json()
             except: rj = res.text
@@ -570,10 +695,11 @@ class PacificaExchange(Exchange):
 
     async def set_leverage(self, symbol, leverage):
         try:
-            payload = {"symbol": symbol, "leverage": leverage, "margin_mode": "cross"}
+            payload = {"symbol": self.registry.native('PAC', symbol, symbol), "leverage": leverage, "margin_mode": "cross"}
             body_str = self._sign_and_build_body("update_leverage", payload)
             loop = asyncio.get_running_loop()
             headers = {"Content-Type": "application/json"}
+            await self.limiter.acquire(ORDER)
             await loop.run_in_executor(None, lambda: requests.post(f"{self.url}/account/leverage", data=body_str, headers=headers))
             return True, leverage
         except: return False, leverage
@@ -593,7 +719,7 @@ class PacificaExchange(Exchange):
                             items = payload if isinstance(payload, list) else []
                             if isinstance(payload, dict): items = [payload]
                             for item in items:
-                                ticker = self.target_mapping.get(item.get("symbol", "").upper())
+                                ticker = self.registry.ticker('PAC', item.get("symbol", ""))
                                 if ticker:
                                     price = float(item.get("mark") or item.get("oracle") or 0)
                                     if price > 0:
@@ -609,10 +735,14 @@ class PacificaExchange(Exchange):
 # 5. Extended Implementation (Final Fix)
 # ==========================================
 class ExtendedExchange(Exchange):
+    name = 'EXT'
+
     def __init__(self, private_key, public_key, api_key, vault):
         super().__init__()
         self.keys = {'pk': private_key, 'pub': public_key, 'api': api_key, 'vault': int(vault or 100001)}
         self.client = None; self.info_client = None; self.ready = False
+        self._callback = None; self._book_tasks = None
+        self.limiter = get_limiter('EXT')
         try:
             import x10.perpetual.configuration as c
             from x10.perpetual.accounts import StarkPerpetualAccount
@@ -625,33 +755,30 @@ class ExtendedExchange(Exchange):
             self.ready = True
         except: pass
         self.base_url = "wss://api.starknet.extended.exchange/stream.extended.exchange/v1"
-        self.targets = {}
-        if settings:
-            for t, cfg in settings.TARGET_PAIRS_CONFIG.items():
-                if 'extended' in cfg['symbols']:
-                    sym = cfg['symbols']['extended']
-                    if sym and sym != "None": self.targets[sym] = t
+        self.targets = self.registry.natives('EXT')
 
     async def load_markets(self):
         if not self.ready: return
         try:
             acc = self.SPA(vault=self.keys['vault'], private_key=self.keys['pk'], public_key=self.keys['pub'], api_key=self.keys['api'])
+            await self.limiter.acquire(METADATA)
             self.client = await self.BTC.create(endpoint_config=self.C.MAINNET_CONFIG, account=acc)
             self.orders_module = getattr(self.client, '_BlockingTradingClient__orders_module', None)
             self.info_client = self.AM(endpoint_config=self.C.MAINNET_CONFIG, api_key=self.keys['api'])
-            mkts = await self.client.get_markets()
+            mkts = await self.limiter.call(METADATA, self.client.get_markets)
             for n, m in mkts.items():
                 step = float(m.trading_config.min_order_size) 
                 prec = int(round(-math.log10(step), 0)) if step < 1 else 0
                 self.market_info[n.split('-')[0]] = {'min_size': step, 'qty_prec': prec, 'max_lev': 20, 'full_name': n}
+            self.markets_ready = True
             log.info(f"✅ [EXT] {len(self.market_info)}개 심볼 로드 완료")
         except: log.error("❌ [EXT] 로드 실패")
 
     async def get_balance(self):
         if not self.info_client: return None
         try:
-            b = await self.info_client.get_balance()
-            p = await self.info_client.get_positions()
+            b = await self.limiter.call(ACCOUNT, self.info_client.get_balance)
+            p = await self.limiter.call(ACCOUNT, self.info_client.get_positions)
             eq = float(b.data.equity) if (b and b.data) else 0.0
             
             available = 0.0
@@ -669,22 +796,24 @@ class ExtendedExchange(Exchange):
                     sz = float(x.size)
                     if sz != 0: 
                         side_str = x.side.name if hasattr(x.side, 'name') else str(x.side)
-                        pos_list.append({'symbol': x.market.split('-')[0], 'size': abs(sz), 'amount': abs(sz), 'side': side_str, 'entry_price': float(x.open_price)})
-            return {'equity': eq, 'available': available, 'positions': pos_list}
+                        # 포지션 응답에 펀딩 누적값이 없음 → funding None (손익 엔진에 반영되지 않음)
+                        pos_list.append({'symbol': x.market.split('-')[0], 'size': abs(sz), 'amount': abs(sz), 'side': side_str,
+                                         'entry_price': float(x.open_price), 'funding': None})
+            return {'equity': eq, 'available': available, 'positions': pos_list, 'positions_ok': p is not None and p.data is not None}
         except Exception as e: 
             log.error(f"❌ [EXT] 잔고 조회 실패: {e}")
             return None
 
     async def place_market_order(self, symbol, side, amount, price=None, reduce_only=False):
         if not self.client or not self.orders_module: return None
-        info = self.market_info.get(symbol)
-        m_name = info['full_name'] if info else f"{symbol}-USD"
+        info = self.get_market(symbol)
+        m_name = info['full_name'] if info and 'full_name' in info else self.registry.native('EXT', symbol) or f"{symbol}-USD"
         
         val_amt = self.validate_amount(symbol, amount)
         if val_amt <= 0: return None
         
         try:
-            mkts = await self.client.get_markets()
+            mkts = await self.limiter.call(ORDER, self.client.get_markets)
             market = mkts.get(m_name)
             if not market: return None
             side_enum = self.OS.BUY if side.upper() == 'BUY' else self.OS.SELL
@@ -702,7 +831,7 @@ class ExtendedExchange(Exchange):
                 post_only=False, reduce_only=reduce_only, time_in_force=self.TIF.IOC,
                 starknet_domain=self.C.MAINNET_CONFIG.starknet_domain
             )
-            await self.orders_module.place_order(order_obj)
+            await self.limiter.call(ORDER, self.orders_module.place_order, order_obj)
             log.info(f"✅ [EXT] 주문 성공: {symbol} {side} {val_amt}")
             return {'id': order_obj.id, 'status': 'filled'}
         except Exception as e:
@@ -710,56 +839,70 @@ class ExtendedExchange(Exchange):
             return None
 
     async def set_leverage(self, symbol, leverage):
-        try: await self.info_client.update_leverage(f"{symbol}-USD", Decimal(str(leverage))); return True, leverage
+        m_name = self.registry.native('EXT', symbol) or f"{symbol}-USD"
+        try: await self.limiter.call(ORDER, self.info_client.update_leverage, m_name, Decimal(str(leverage))); return True, leverage
         except: return False, leverage
     
+    async def _run_book(self, symbol, ticker, callback):
+        url = f"{self.base_url}/orderbooks/{symbol}"
+        ssl_ctx = ssl.create_default_context(); ssl_ctx.check_hostname = False; ssl_ctx.verify_mode = ssl.CERT_NONE
+        while self.ws_running:
+            try:
+                async with websockets.connect(url, ssl=ssl_ctx) as ws:
+                    async for msg in ws:
+                        if not self.ws_running: break
+                        payload = json.loads(msg)
+                        inner = payload.get('data', {})
+                        bids = inner.get('b', []) or inner.get('bids', [])
+                        asks = inner.get('a', []) or inner.get('asks', [])
+                        if bids and asks:
+                            bid_p = float(bids[0]['p'] if isinstance(bids[0], dict) else bids[0][0])
+                            ask_p = float(asks[0]['p'] if isinstance(asks[0], dict) else asks[0][0])
+                            bbo = self._validate_and_format('EXT', ticker, bid_p, ask_p)
+                            if bbo:
+                                self.bbo_cache[ticker] = bbo
+                                self._log_heartbeat('EXT', ticker, bid_p)
+                                await callback(bbo)
+            except: await asyncio.sleep(5)
+
     async def start_ws(self, callback: Callable):
         self.ws_running = True
-        subs = self.targets
-        if not subs and settings:
-             for t, cfg in settings.TARGET_PAIRS_CONFIG.items():
-                if 'extended' in cfg['symbols']:
-                    sym = cfg['symbols']['extended']
-                    if sym and sym != "None": subs[sym] = t
-
-        async def _run(symbol, ticker):
-            url = f"{self.base_url}/orderbooks/{symbol}"
-            ssl_ctx = ssl.create_default_context(); ssl_ctx.check_hostname = False; ssl_ctx.verify_mode = ssl.CERT_NONE
-            while self.ws_running:
-                try:
-                    async with websockets.connect(url, ssl=ssl_ctx) as ws:
-                        async for msg in ws:
-                            if not self.ws_running: break
-                            payload = json.loads(msg)
-                            inner = payload.get('data', {})
-                            bids = inner.get('b', []) or inner.get('bids', [])
-                            asks = inner.get('a', []) or inner.get('asks', [])
-                            if bids and asks:
-                                bid_p = float(bids[0]['p'] if isinstance(bids[0], dict) else bids[0][0])
-                                ask_p = float(asks[0]['p'] if isinstance(asks[0], dict) else asks[0][0])
-                                bbo = self._validate_and_format('EXT', ticker, bid_p, ask_p)
-                                if bbo:
-                                    self.bbo_cache[ticker] = bbo
-                                    self._log_heartbeat('EXT', ticker, bid_p)
-                                    await callback(bbo)
-                except: await asyncio.sleep(5)
-        tasks = [asyncio.create_task(_run(s, t)) for s, t in subs.items()]
-        if tasks: await asyncio.gather(*tasks)
-        else:
-             while self.ws_running: await asyncio.sleep(1)
+        self._callback = callback
+        # 마켓마다 별도 WS (티커 추가 시 해당 마켓 태스크만 새로 생성)
+        self._book_tasks = {s: asyncio.create_task(self._run_book(s, t, callback)) for s, t in self.targets.items()}
+        while self.ws_running: await asyncio.sleep(1)
+        for task in self._book_tasks.values(): task.cancel()
+
+    async def add_symbols(self, natives):
+        for ticker, symbol in natives.items():
+            self.targets[symbol] = ticker
+            tasks = self._book_tasks
+            if self.ws_running and tasks is not None and symbol not in tasks:
+                tasks[symbol] = asyncio.create_task(self._run_book(symbol, ticker, self._callback))
+        log.info(f"➕ [EXT] 구독 추가: {list(natives.values())}")
 
 # ==========================================
 # 6. Lighter Exchange (V01_2 Style: API-First Discovery)
 # ==========================================
 class LighterExchange(Exchange):
-    def __init__(self, api_key: str, public_key: str):
+    name = 'LTR'
+
+    def __init__(self, api_key: str, public_key: str, account_index: Optional[int] = None):
         super().__init__()
         self.api_key = api_key; self.public_key = public_key
+        # 계정 인덱스는 반드시 설정에서 (다른 계정으로 조용히 주문이 나가지 않도록 기본값 없음)
+        raw_idx = account_index if account_index is not None else os.getenv('LIGHTER_ACCOUNT_INDEX')
+        if raw_idx in (None, ''):
+            raise ValueError("LIGHTER_ACCOUNT_INDEX 가 설정되지 않았습니다 (.env 또는 account_index 인자)")
+        self.account_index = int(raw_idx)
         self.client = None; self.is_ready = False
+        self.nonce_manager = None
+        self._ws = None; self._subscribed = set()
+        self.limiter = get_limiter('LTR')
         
         self.ws_url = "wss://mainnet.zklighter.elliot.ai/stream"
-        self.id_map = {} # ID -> Ticker
-        self.ticker_map = {} # Ticker -> ID
+        self.id_map = dict(self.registry.by_market_id) # ID -> Ticker
+        self.ticker_map = dict(self.registry.market_ids) # Ticker -> ID
         
         try:
             import lighter
@@ -768,20 +911,13 @@ class LighterExchange(Exchange):
             self.is_ready = True
         except: log.error("❌ [Lighter] SDK 미설치")
 
-        if settings:
-            for t, cfg in settings.TARGET_PAIRS_CONFIG.items():
-                if 'lighter' in cfg['symbols']:
-                    val = cfg['symbols']['lighter']
-                    try:
-                        if val is not None and isinstance(val, int): self.id_map[val] = t
-                    except: pass
-
     async def load_markets(self):
         if not self.is_ready: return
         
         # [수정] V01_2 스타일: API에서 모든 마켓 정보를 가져와서 매핑 구축
         try:
             loop = asyncio.get_running_loop()
+            await self.limiter.acquire(METADATA)
             res = await loop.run_in_executor(None, lambda: requests.get("https://mainnet.zklighter.elliot.ai/api/v1/orderBooks", timeout=5))
             
             if res.status_code == 200:
@@ -792,7 +928,8 @@ class LighterExchange(Exchange):
                 for item in res.json().get('order_books', []):
                     mid = int(item.get('market_id', 0))
                     full_sym = item.get('symbol', '')
-                    ticker = full_sym.split('-')[0] # "ETH-USDC" -> "ETH"
+                    # 설정에 등록된 마켓 ID 는 봇 티커로, 나머지는 API 심볼로 ("ETH-USDC" -> "ETH")
+                    ticker = self.registry.ticker_for_market_id(mid) or full_sym.split('-')[0]
                     
                     self.id_map[mid] = ticker
                     self.ticker_map[ticker] = mid
@@ -804,13 +941,14 @@ class LighterExchange(Exchange):
                         'market_id': mid,
                         'max_lev': 20
                     }
+                self.registry.bind_lighter_markets(self.ticker_map)
                 log.info(f"✅ [LTR] API 자동 매핑 완료 ({len(self.id_map)}개 마켓)")
         except Exception as e:
             log.error(f"❌ [Lighter] 마켓 로드 실패: {e}")
 
         # 2. 클라이언트 초기화
         try:
-            acc_idx = 288085
+            acc_idx = self.account_index
             pk = self.api_key[2:] if self.api_key.startswith("0x") else self.api_key
             sig = inspect.signature(self.lighter.SignerClient)
             init_kwargs = {
@@ -822,14 +960,46 @@ class LighterExchange(Exchange):
             self.client = self.lighter.SignerClient(**valid_kwargs)
             if not hasattr(self.client, 'api_key_index'): self.client.api_key_index = 2
             log.info(f"✅ [Lighter] 클라이언트 초기화 (Acc:{acc_idx})")
+            self.markets_ready = bool(self.ticker_map)
+            # 로컬 논스 관리 (연속 헤지/일괄 청산 시 SDK 의 매 주문 논스 조회 병목 제거)
+            self.nonce_manager = LighterNonceManager(self._fetch_next_nonce, self.client.api_key_index)
+            try: await self.nonce_manager.sync()
+            except Exception as e: log.warning(f"⚠️ [LTR] 초기 논스 동기화 실패 (첫 주문 시 재시도): {e}")
         except Exception as e: log.error(f"❌ [Lighter] 초기화 에러: {e}")
 
+    def export_metadata(self):
+        return {'market_info': self.market_info, 'ticker_map': self.ticker_map}
+
+    def restore_metadata(self, data):
+        super().restore_metadata(data)
+        ticker_map = {t: int(mid) for t, mid in data.get('ticker_map', {}).items()}
+        if ticker_map:
+            self.ticker_map.update(ticker_map)
+            self.id_map.update({mid: t for t, mid in ticker_map.items()})
+
+    async def _fetch_next_nonce(self):
+        idx = self.account_index
+        url = f"https://mainnet.zklighter.elliot.ai/api/v1/nextNonce?account_index={idx}&api_key_index={self.client.api_key_index}"
+        loop = asyncio.get_running_loop()
+        await self.limiter.acquire(ORDER)
+        res = await loop.run_in_executor(None, lambda: requests.get(url, timeout=3))
+        res.raise_for_status()
+        return int(res.json()['nonce'])
+
+    async def _signed_call(self, method, **kwargs):
+        """논스를 받는 SDK 트랜잭션 함수는 로컬 논스 관리자를 거쳐 실행합니다."""
+        if not self.nonce_manager or 'nonce' not in inspect.signature(method).parameters:
+            return await self.limiter.call(ORDER, method, **kwargs)
+        # 토큰을 먼저 받고 논스를 발급 (논스를 쥔 채 대기하면 뒤 논스가 먼저 나가 거부됨)
+        return await self.nonce_manager.submit(lambda n, k: method(**kwargs, nonce=n, api_key_index=k),
+                                               before=lambda: self.limiter.acquire(ORDER))
+
     async def get_balance(self):
         if not self.client: return None
         try:
             acc_api = self.lighter.AccountApi(self.client.api_client)
-            idx = getattr(self.client, 'account_index', 288085)
-            resp = await acc_api.account(by="index", value=str(idx))
+            idx = self.account_index
+            resp = await self.limiter.call(ACCOUNT, acc_api.account, by="index", value=str(idx))
             if isinstance(resp, list) and resp: data = resp[0]
             elif hasattr(resp, 'accounts') and resp.accounts: data = resp.accounts[0]
             else: data = resp
@@ -842,8 +1012,10 @@ class LighterExchange(Exchange):
                     sz = float(getattr(p, 'position', 0))
                     if sz != 0:
                         side = "LONG" if getattr(p, 'sign', 0) == 1 else "SHORT"
-                        pos_list.append({'symbol': getattr(p, 'symbol', ''), 'size': abs(sz), 'amount': abs(sz), 'side': side, 'entry_price': float(getattr(p, 'avg_entry_price', 0))})
-            return {'equity': equity, 'available': available, 'positions': pos_list}
+                        pos_list.append({'symbol': getattr(p, 'symbol', ''), 'size': abs(sz), 'amount': abs(sz), 'side': side,
+                                         'entry_price': float(getattr(p, 'avg_entry_price', 0)),
+                                         'funding': _funding_received(getattr(p, 'total_funding_paid_out', None))})
+            return {'equity': equity, 'available': available, 'positions': pos_list, 'positions_ok': hasattr(data, 'positions')}
         except: return None
 
     async def set_leverage(self, symbol, leverage):
@@ -856,7 +1028,7 @@ class LighterExchange(Exchange):
             try:
                 log.info(f"⚙️ [Lighter] {symbol} 레버리지 x{lev} 시도...")
                 from decimal import Decimal
-                _, _, err = await self.client.update_leverage(market_index=mid, margin_mode=0, leverage=Decimal(lev))
+                _, _, err = await self._signed_call(self.client.update_leverage, market_index=mid, margin_mode=0, leverage=Decimal(lev))
                 if not err:
                     log.info(f"✅ [Lighter] {symbol} 레버리지 x{lev} 설정 성공")
                     return True, lev
@@ -866,15 +1038,20 @@ class LighterExchange(Exchange):
     async def place_market_order(self, symbol, side, amount, price=None, reduce_only=False):
         if not self.client: return None
         mid = self.ticker_map.get(symbol)
-        if not mid: return None
-        info = self.market_info.get(symbol)
-        if not info: return None
-        base_amt = int(amount * (10 ** info['qty_prec']))
+        if mid is None: return None
+        lot = self.registry.lot('LTR', symbol)
+        tick = self.registry.tick('LTR', symbol)
+        if not lot or not tick: return None
+        # 정수 단위 변환 (int(amount * 10**prec) 는 0.29 -> 28 처럼 한 로트 적게 잘릴 수 있음)
+        base_amt = lot.units(amount)
+        if base_amt <= 0: return None
         target_price = 100000000 if side.upper() == 'BUY' else 0.01 
-        exec_price = int(target_price * (10 ** info['price_prec'])) or 1
+        exec_price = tick.units(target_price) or 1
         try:
-            _, hash, err = await self.client.create_market_order(
-                market_index=mid, client_order_index=int(time.time()), 
+            coi = self.nonce_manager.next_client_order_index() if self.nonce_manager else int(time.time() * 1000)
+            _, hash, err = await self._signed_call(
+                self.client.create_market_order,
+                market_index=mid, client_order_index=coi, 
                 base_amount=base_amt, avg_execution_price=exec_price, is_ask=(side.upper()=='SELL'), reduce_only=reduce_only
             )
             if not err:
@@ -891,7 +1068,9 @@ class LighterExchange(Exchange):
         while self.ws_running:
             try:
                 async with websockets.connect(self.ws_url, extra_headers=headers) as ws:
-                    for mid in self.id_map.keys():
+                    self._ws = ws
+                    self._subscribed = set(self.id_map.keys())
+                    for mid in self._subscribed:
                         await ws.send(json.dumps({"type": "subscribe", "channel": f"order_book/{mid}"}))
                     async for msg in ws:
                         if not self.ws_running: break
@@ -918,6 +1097,23 @@ class LighterExchange(Exchange):
                                             await callback(bbo)
                             except: pass
             except: await asyncio.sleep(5)
+            finally: self._ws = None
+
+    async def add_symbols(self, natives):
+        """natives: { 티커: 마켓 ID } → 매핑 갱신 후, 아직 구독하지 않은 마켓만 같은 WS 에 구독 추가"""
+        for ticker, mid in natives.items():
+            old = self.id_map.get(mid)
+            if old and old != ticker and old in self.market_info:
+                self.market_info.setdefault(ticker, self.market_info[old])
+            self.id_map[mid] = ticker
+            self.ticker_map[ticker] = mid
+            ws = self._ws
+            if ws is not None and mid not in self._subscribed:
+                try:
+                    await ws.send(json.dumps({"type": "subscribe", "channel": f"order_book/{mid}"}))
+                    self._subscribed.add(mid)
+                except Exception as e: log.error(f"❌ [LTR] 마켓 {mid} 구독 추가 실패: {e}")
+        log.info(f"➕ [LTR] 구독 추가: {natives}")
 
     # # [수정] V01_2 방식: start_ws 내에서 API 재호출하여 ID 매핑 확실히 함
     # async def start_ws(self, callback: Callable):
@@ -58,6 +58,9 @@ async def test_lighter_leverage():
     if not private_key:
         log.error("❌ .env에 'LIGHTER_PRIVATE_KEY'가 없습니다!")
         return
+    if not os.getenv('LIGHTER_ACCOUNT_INDEX'):
+        log.error("❌ .env에 'LIGHTER_ACCOUNT_INDEX'가 없습니다!")
+        return
 
     try:
         # 1. 거래소 인스턴스 생성
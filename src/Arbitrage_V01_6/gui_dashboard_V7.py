@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, Menu, PanedWindow
+from tkinter import ttk, scrolledtext, messagebox, filedialog, Menu, PanedWindow
 import asyncio
 import logging
 import queue
@@ -10,6 +10,7 @@ from datetime import datetime
 
 try:
     from arbitrage_bot import ArbitrageBot
+    from utils.config_service import get_config
     import settings
 except ImportError:
     messagebox.showerror("Error", "arbitrage_bot.py를 찾을 수 없습니다.")
@@ -77,6 +78,9 @@ class ArbitrageDashboard:
         menubar.add_cascade(label="🛠️ Tools", menu=tools)
         tools.add_command(label="📊 Market Info (티커 정보)", command=self.open_market_info)
         tools.add_command(label="⚙️ Settings (설정 편집)", command=self.open_settings)
+        tools.add_command(label="⏱️ Execution Metrics (실행 품질)", command=self.open_execution_metrics)
+        tools.add_command(label="💹 PnL Attribution (손익 분석)", command=self.open_pnl)
+        tools.add_command(label="📤 Export Log (엑셀/CSV 내보내기)", command=self.export_log)
 
     def _init_layout(self):
         self.root.columnconfigure(0, weight=1)
@@ -166,43 +170,147 @@ class ArbitrageDashboard:
         for r in self.bot_instance.get_market_summary():
             tree.insert("", "end", values=(r['Ticker'], r.get('Min_Qty'), r.get('Precision'), r.get('Max_Lev'), r.get('Size($)')))
 
+    def open_execution_metrics(self):
+        if not self.bot_instance:
+            return messagebox.showwarning("Info", "봇 실행 후 확인 가능")
+        top = tk.Toplevel(self.root)
+        top.title("Execution Metrics"); top.geometry("900x500"); top.configure(bg="#1e1e1e")
+        cols = ("Key", "Metric", "Value")
+        tree = ttk.Treeview(top, columns=cols, show="headings")
+        for c in cols: tree.heading(c, text=c); tree.column(c, width=250, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def refresh():
+            if not top.winfo_exists(): return
+            for i in tree.get_children(): tree.delete(i)
+            for group, rows in self.bot_instance.get_execution_metrics().items():
+                for key, metrics in rows.items():
+                    for name, val in metrics.items():
+                        if isinstance(val, float): val = f"{val:.4f}"
+                        tree.insert("", "end", values=(f"{group}:{key}", name, val))
+            top.after(2000, refresh)
+        refresh()
+
+    def open_pnl(self):
+        if not self.bot_instance:
+            return messagebox.showwarning("Info", "봇 실행 후 확인 가능")
+        top = tk.Toplevel(self.root)
+        top.title("PnL Attribution"); top.geometry("1100x500"); top.configure(bg="#1e1e1e")
+        cols = ("Key", "Net($)", "Realized", "Unrealized", "Funding", "Fees", "Volume($)", "Fills")
+        tree = ttk.Treeview(top, columns=cols, show="headings")
+        for c in cols: tree.heading(c, text=c); tree.column(c, width=130, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def refresh():
+            if not top.winfo_exists(): return
+            for i in tree.get_children(): tree.delete(i)
+            for key, a in sorted(self.bot_instance.get_pnl_summary().items()):
+                tree.insert("", "end", values=(
+                    key, f"{a['net']:+.4f}", f"{a['realized']:+.4f}", f"{a['unrealized']:+.4f}",
+                    f"{a['funding']:+.4f}", f"{a['fees']:.4f}", f"{a['volume']:,.2f}", a['fills']
+                ))
+            top.after(2000, refresh)
+        refresh()
+
+    def export_log(self):
+        if not self.bot_instance or not self.bot_instance.pm:
+            return messagebox.showwarning("Info", "봇 실행 후 내보내기 가능")
+        path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx", initialfile="arbitrage_log_export.xlsx",
+            filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")]
+        )
+        if not path: return
+        pm = self.bot_instance.pm
+        def work():
+            try:
+                files = pm.export(path)
+                self.root.after(0, lambda: messagebox.showinfo("Export", "\n".join(files)))
+            except Exception as e:
+                self.root.after(0, lambda: messagebox.showerror("Export", str(e)))
+        threading.Thread(target=work, daemon=True).start()
+
     def open_settings(self):
+        """설정 편집기: 변경은 설정 서비스로 검증 후 즉시 적용 + 오버라이드 파일에 저장 (재시작 불필요)"""
+        config = get_config()
         top = tk.Toplevel(self.root)
-        top.title("Settings Editor"); top.geometry("1000x600"); top.configure(bg="#1e1e1e")
+        top.title("Settings Editor"); top.geometry("1000x700"); top.configure(bg="#1e1e1e")
         cols = ("Ticker", "Size($)", "Max Margin($)", "Leverage", "Strategy")
         tree = ttk.Treeview(top, columns=cols, show="headings")
         for c in cols: tree.heading(c, text=c); tree.column(c, width=150, anchor="center")
         tree.pack(fill="both", expand=True, padx=10, pady=10)
 
-        for t, c in settings.TARGET_PAIRS_CONFIG.items():
-            tree.insert("", "end", iid=t, values=(t, c.get('trade_size_fixed_usd'), c.get('max_margin_usd', 15.0), c.get('target_leverage', 15), c.get('strategy_preset')))
-
-        def on_double_click(event):
-            item = tree.selection()[0]
-            col = tree.identify_column(event.x)
-            col_idx = int(col.replace('#', '')) - 1
-            if col_idx < 0: return 
-            x, y, w, h = tree.bbox(item, col)
-            val = tree.item(item, 'values')[col_idx]
-            entry = tk.Entry(tree); entry.place(x=x, y=y, width=w, height=h); entry.insert(0, val); entry.focus()
-
-            def save(e):
-                new_val = entry.get()
-                current_vals = list(tree.item(item, 'values'))
-                current_vals[col_idx] = new_val
-                tree.item(item, values=current_vals)
-                entry.destroy()
-                try:
-                    ticker = item
-                    if col_idx == 1: settings.TARGET_PAIRS_CONFIG[ticker]['trade_size_fixed_usd'] = float(new_val)
-                    elif col_idx == 2: settings.TARGET_PAIRS_CONFIG[ticker]['max_margin_usd'] = float(new_val)
-                    elif col_idx == 3: settings.TARGET_PAIRS_CONFIG[ticker]['target_leverage'] = int(new_val)
-                    elif col_idx == 4: settings.TARGET_PAIRS_CONFIG[ticker]['strategy_preset'] = new_val
-                    print(f"✅ Setting Updated: {ticker} -> {new_val}")
-                except Exception as ex: print(f"❌ Update Failed: {ex}")
-
-            entry.bind('<Return>', save); entry.bind('<FocusOut>', lambda e: entry.destroy())
-        tree.bind('<Double-1>', on_double_click)
+        p_cols = ("Preset", "Entry(%)", "Exit(%)", "Min Hold(s)", "Max Hold(s)")
+        p_tree = ttk.Treeview(top, columns=p_cols, show="headings", height=5)
+        for c in p_cols: p_tree.heading(c, text=c); p_tree.column(c, width=150, anchor="center")
+        p_tree.pack(fill="x", padx=10, pady=(0, 10))
+
+        def load():
+            cfg = config.current
+            for i in tree.get_children(): tree.delete(i)
+            for i in p_tree.get_children(): p_tree.delete(i)
+            for t, c in cfg.pairs.items():
+                tree.insert("", "end", iid=t, values=(t, c.get('trade_size_fixed_usd'), c.get('max_margin_usd', 15.0), c.get('target_leverage', 15), c.get('strategy_preset')))
+            for name, p in cfg.presets.items():
+                p_tree.insert("", "end", iid=name, values=(name, p.get('entry_threshold_pct'), p.get('exit_threshold_pct'), p.get('min_hold_time_sec'), p.get('max_hold_time_sec')))
+        load()
+
+        pair_fields = {1: ('trade_size_fixed_usd', float), 2: ('max_margin_usd', float), 3: ('target_leverage', int), 4: ('strategy_preset', str)}
+        preset_fields = {1: ('entry_threshold_pct', float), 2: ('exit_threshold_pct', float), 3: ('min_hold_time_sec', float), 4: ('max_hold_time_sec', float)}
+
+        def apply(changes):
+            try:
+                config.apply(changes)
+                return True
+            except ValueError as ex:
+                messagebox.showerror("Settings", f"검증 실패 (적용 안 됨):\n{ex}", parent=top)
+                return False
+
+        def make_editor(view, fields, section):
+            def on_double_click(event):
+                if not view.selection(): return
+                item = view.selection()[0]
+                col = view.identify_column(event.x)
+                col_idx = int(col.replace('#', '')) - 1
+                if col_idx not in fields: return
+                x, y, w, h = view.bbox(item, col)
+                val = view.item(item, 'values')[col_idx]
+                entry = tk.Entry(view); entry.place(x=x, y=y, width=w, height=h); entry.insert(0, val); entry.focus()
+
+                def save(e):
+                    new_val = entry.get()
+                    entry.destroy()
+                    key, cast = fields[col_idx]
+                    try: value = cast(new_val)
+                    except ValueError: return messagebox.showerror("Settings", f"잘못된 값: {new_val}", parent=top)
+                    if apply({section: {item: {key: value}}}):
+                        print(f"✅ Setting Updated: {item}.{key} -> {value}")
+                    load()
+
+                entry.bind('<Return>', save); entry.bind('<FocusOut>', lambda e: entry.destroy())
+            view.bind('<Double-1>', on_double_click)
+
+        make_editor(tree, pair_fields, 'TARGET_PAIRS_CONFIG')
+        make_editor(p_tree, preset_fields, 'STRATEGY_PRESETS')
+
+        # 티커 추가: 예) "hyperliquid=WIF, lighter=5, grvt=WIF_USDT_Perp" → 봇 실행 중이면 해당 거래소만 증분 구독
+        add_frame = ttk.Frame(top); add_frame.pack(fill="x", padx=10, pady=(0, 10))
+        ttk.Label(add_frame, text="Ticker").pack(side="left")
+        e_ticker = tk.Entry(add_frame, width=12); e_ticker.pack(side="left", padx=5)
+        ttk.Label(add_frame, text="Symbols").pack(side="left")
+        e_symbols = tk.Entry(add_frame, width=60); e_symbols.pack(side="left", padx=5)
+
+        def add_ticker():
+            ticker = e_ticker.get().strip().upper()
+            if not ticker: return
+            symbols = {}
+            for part in e_symbols.get().split(','):
+                if '=' not in part: continue
+                k, v = [x.strip() for x in part.split('=', 1)]
+                symbols[k] = int(v) if k == 'lighter' and v.isdigit() else v
+            if apply({'TARGET_PAIRS_CONFIG': {ticker: {'symbols': symbols, 'strategy_preset': 'alt'}}}):
+                e_ticker.delete(0, tk.END); e_symbols.delete(0, tk.END)
+                load()
+        tk.Button(add_frame, text="➕ 티커 추가", command=add_ticker, bg="#2d2d2d", fg="white").pack(side="left", padx=5)
 
     # --- Updates ---
     def update_ui_loop(self):
@@ -226,12 +334,13 @@ class ArbitrageDashboard:
     def _update_data(self):
         pm = self.bot_instance.pm
         if not pm or not pm.balance_history: return
-        init = pm.balance_history[0]
+        init = pm.initial_balance
         curr = pm.balance_history[-1]
-        self.vars["Initial"].set(f"${init['Total_Equity']:,.2f}")
         self.vars["Current"].set(f"${curr['Total_Equity']:,.2f}")
-        pnl = curr['Total_Equity'] - init['Total_Equity']
-        self.vars["PnL"].set(f"${pnl:+.2f}")
+        if init:
+            self.vars["Initial"].set(f"${init['Total_Equity']:,.2f}")
+            pnl = curr['Total_Equity'] - init['Total_Equity']
+            self.vars["PnL"].set(f"${pnl:+.2f}")
         elapsed = int(time.time() - self.start_time)
         self.vars["Time"].set(time.strftime("%H:%M:%S", time.gmtime(elapsed)))
 
@@ -41,7 +41,9 @@ async def test_leverage():
     print("-" * 30)
 
     # 2. Lighter 테스트
-    if os.getenv('LIGHTER_PRIVATE_KEY'):
+    if os.getenv('LIGHTER_PRIVATE_KEY') and not os.getenv('LIGHTER_ACCOUNT_INDEX'):
+        log.error("❌ [Lighter] LIGHTER_ACCOUNT_INDEX 가 없어 건너뜁니다.")
+    elif os.getenv('LIGHTER_PRIVATE_KEY'):
         log.info("🔹 [Lighter] 연결 중...")
         ltr = LighterExchange(os.getenv('LIGHTER_PRIVATE_KEY'), os.getenv('LIGHTER_WALLET_ADDRESS'))
         await ltr.load_markets() # 마켓 정보 로드 필요 (ID 매핑 위해)
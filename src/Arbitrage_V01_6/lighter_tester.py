@@ -40,7 +40,7 @@ class LighterTester:
     async def initialize(self):
         log.info("⏳ Lighter 연결 및 마켓 정보 로딩...")
         
-        # load_markets 내부에서 '스마트 초기화'로 계정 인덱스(288085)를 찾고 클라이언트를 설정함
+        # load_markets 내부에서 LIGHTER_ACCOUNT_INDEX 계정으로 클라이언트를 설정함
         await self.exchange.load_markets()
         
         if not self.exchange.client:
@@ -0,0 +1,111 @@
+# lot_math_benchmark.py
+"""
+[마이크로 벤치마크] 주문 수량/가격 반올림: 기존 경로 vs 정수 로트 (utils/lot_math.py)
+
+실행: python lot_math_benchmark.py [반복 횟수]
+- 기존: validate_amount (매번 10**prec + float floor), GRVT 틱 (Decimal(str()) quantize), Lighter int(amount * 10**prec)
+- 신규: 미리 계산된 LotSpec.validate / round / units
+정확도는 "사람이 의도한 소수 값" (예: 0.29) 이 한 로트 적게 잘리는 건수로 비교합니다.
+"""
+import math
+import random
+import sys
+import timeit
+from decimal import Decimal, ROUND_FLOOR, ROUND_HALF_UP
+
+from utils.lot_math import lot_from_precision, lot_from_step
+from utils.symbol_registry import SymbolRegistry
+
+def legacy_validate(amount, prec, min_sz):
+    if amount < min_sz: return 0.0
+    if prec <= 0:
+        step = 10 ** abs(prec)
+        return math.floor(amount / step) * step
+    factor = 10 ** prec
+    return math.floor(amount * factor) / factor
+
+def legacy_validate_symbol(market_info, symbol, amount):
+    """기존 Exchange.validate_amount: 주문마다 심볼 파싱 + dict 조회 + 10**prec"""
+    base = symbol.split('_')[0].split('-')[0]
+    if base.startswith('k'): base = base[1:]
+    if base.startswith('1000'): base = base[4:]
+    info = market_info.get(base)
+    if not info: return round(amount, 4)
+    return legacy_validate(amount, info.get('qty_prec', 3), info.get('min_size', 0.0))
+
+def legacy_tick(price, tick_size):
+    return float(Decimal(str(price)).quantize(Decimal(str(tick_size)), rounding=ROUND_HALF_UP))
+
+def legacy_units(amount, prec):
+    return int(amount * (10 ** prec))
+
+def _cases(n, prec, seed=7):
+    rnd = random.Random(seed)
+    scale = 10 ** prec
+    # 정확히 로트 배수인 값 (의도된 수량) → 결과가 그대로 나와야 함
+    return [rnd.randint(1, 50000) / scale for _ in range(n)]
+
+def _off_lot_cases(n, prec, seed=11):
+    """로트 배수가 아닌 값 (소수 한 자리 더) + 큰 값 → Decimal 내림 결과와 같아야 함"""
+    rnd = random.Random(seed)
+    fine = 10 ** (prec + 1)
+    vals = [rnd.randint(1, 5000000) / fine for _ in range(n)]
+    # 큰 값: 로트 수 ~1e12 까지 (float 가 정수를 정확히 표현하는 범위 안)
+    vals += [rnd.randint(10 ** 9, 10 ** 12) / 10 ** prec + rnd.random() / 10 ** prec for _ in range(n // 10)]
+    return vals
+
+def _decimal_floor(value, prec):
+    q = Decimal(1).scaleb(-prec)
+    return Decimal(repr(value)).quantize(q, rounding=ROUND_FLOOR)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    prec, min_sz, tick_size = 2, 0.01, 0.01
+    lot = lot_from_precision(prec, min_sz)
+    tick = lot_from_step(tick_size)
+    market_info = {'BTC': {'qty_prec': prec, 'min_size': min_sz}}
+    registry = SymbolRegistry({'BTC': {'symbols': {'hyperliquid': 'BTC'}}})
+    registry.compile_markets('HL', market_info)
+    amounts = _cases(n, prec)
+    prices = [a * 37.3 for a in amounts]
+
+    print(f"== 정확도 (n={n}, prec={prec}) ==")
+    bad_validate = sum(1 for a in amounts if legacy_validate(a, prec, min_sz) != a)
+    bad_units = sum(1 for a in amounts if legacy_units(a, prec) != round(a * 10 ** prec))
+    new_bad_validate = sum(1 for a in amounts if lot.validate(a) != a)
+    new_bad_units = sum(1 for a in amounts if lot.units(a) != round(a * 10 ** prec))
+    # 가격 기준값: 의도된 소수 (a × 37.3) 를 Decimal 로 정확히 계산해 half-up
+    ref = [float((Decimal(repr(a)) * Decimal('37.3')).quantize(Decimal(str(tick_size)), rounding=ROUND_HALF_UP)) for a in amounts]
+    bad_tick = sum(1 for p, r in zip(prices, ref) if legacy_tick(p, tick_size) != r)
+    new_bad_tick = sum(1 for p, r in zip(prices, ref) if tick.round(p) != r)
+    print(f"validate_amount 한 로트 손실: 기존 {bad_validate}건 / 신규 {new_bad_validate}건")
+    print(f"Lighter 정수 변환 손실    : 기존 {bad_units}건 / 신규 {new_bad_units}건")
+    print(f"GRVT 틱 반올림 오류       : 기존 {bad_tick}건 / 신규 {new_bad_tick}건 (정확히 절반인 가격이 float 오차로 내림)")
+
+    # 로트 배수가 아닌 값 / 큰 값: 보정 범위가 진짜 소수부를 올려버리면 안 됨 (예: 318.4854739 → 318.485474)
+    print(f"\n== 정확도: 로트 배수가 아닌 값 + 큰 값 (Decimal 내림 기준) ==")
+    for p in (2, 6):
+        spec = lot_from_precision(p)
+        vals = _off_lot_cases(n, p)
+        bad_floor = sum(1 for v in vals if Decimal(repr(spec.floor(v))) != _decimal_floor(v, p))
+        bad_units = sum(1 for v in vals if spec.units(v) != int(_decimal_floor(v, p).scaleb(p)))
+        print(f"prec={p}: floor 오류 {bad_floor}건 / units 오류 {bad_units}건 (n={len(vals)})")
+    for v, p in ((318.4854739, 6), (1e8, 2), (123456789.129, 2)):
+        spec = lot_from_precision(p)
+        print(f"  lot({p}).floor({v!r}) = {spec.floor(v)!r}, units = {spec.units(v)}")
+
+    print(f"\n== 속도 (호출당 ns, {n}회) ==")
+    rows = [
+        ("validate_amount", lambda: [legacy_validate(a, prec, min_sz) for a in amounts], lambda: [lot.validate(a) for a in amounts]),
+        ("validate_amount+심볼", lambda: [legacy_validate_symbol(market_info, 'BTC', a) for a in amounts],
+                                 lambda: [registry.lot('HL', 'BTC').validate(a) for a in amounts]),
+        ("GRVT 틱 반올림", lambda: [legacy_tick(p, tick_size) for p in prices], lambda: [tick.round(p) for p in prices]),
+        ("Lighter 정수 변환", lambda: [legacy_units(a, prec) for a in amounts], lambda: [lot.units(a) for a in amounts]),
+    ]
+    for name, old, new in rows:
+        t_old = min(timeit.repeat(old, number=1, repeat=3)) / n * 1e9
+        t_new = min(timeit.repeat(new, number=1, repeat=3)) / n * 1e9
+        print(f"{name:<20} 기존 {t_old:8.1f} ns | 신규 {t_new:8.1f} ns | x{t_old / t_new:.2f}")
+
+if __name__ == '__main__':
+    main()
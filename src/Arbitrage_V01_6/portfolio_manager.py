@@ -1,62 +1,172 @@
 # portfolio_manager.py
-import pandas as pd
+import asyncio
 import logging
 import time
 import os
+from collections import deque
 from datetime import datetime
 
+from utils.trade_store import TradeStore
+
+try:
+    import settings
+except ImportError:
+    settings = None
+
 log = logging.getLogger("PortfolioManager")
 
 class PortfolioManager:
-    def __init__(self, exchanges: dict, filename="arbitrage_log_v5.xlsx"):
+    def __init__(self, exchanges: dict, filename="arbitrage_log_v5.db"):
         self.exchanges = exchanges
         self.filename = filename
-        self.trade_history = []
-        self.balance_history = []
-        
-        # 엑셀 파일 초기화
-        self._initialize_excel()
-
-    def _initialize_excel(self):
-        """엑셀 파일이 없으면 헤더 생성"""
-        if not os.path.exists(self.filename):
-            try:
-                with pd.ExcelWriter(self.filename, mode='w', engine='openpyxl') as writer:
-                    pd.DataFrame(columns=['Time', 'Total_Equity', 'HL', 'GRVT', 'PAC', 'LTR', 'EXT']).to_excel(writer, sheet_name='Balance', index=False)
-                    pd.DataFrame(columns=['Time', 'Symbol', 'Type', 'Side', 'Qty', 'Price', 'Exchange', 'PnL']).to_excel(writer, sheet_name='Trades', index=False)
-                log.info(f"📁 엑셀 파일 생성 완료: {self.filename}")
-            except Exception as e:
-                log.error(f"❌ 엑셀 초기화 실패: {e}")
+        cfg = getattr(settings, 'TRADE_STORE_CONFIG', {}) if settings else {}
+        # 전체 기록은 저장소(SQLite)에 있고, 메모리에는 GUI 표시용 최근 기록만 유지
+        keep = cfg.get('MEMORY_HISTORY', 1000)
+        self.trade_history = deque(maxlen=keep)
+        self.balance_history = deque(maxlen=keep)
+        self.initial_balance = None
+
+        # 거래소별 최근 잔고 / 조회 시간 통계 / 진행 중 조회
+        self.snapshot_cfg = getattr(settings, 'BALANCE_SNAPSHOT_CONFIG', {}) if settings else {}
+        self.last_balances = {}
+        self.balance_timings = {}
+        self._inflight = {}
+        self._snapshot_task = None
+        self._subscribers = [self._record_snapshot, self._log_snapshot]
+
+        self.store = TradeStore(
+            filename,
+            flush_interval=cfg.get('FLUSH_INTERVAL_SEC', 1.0),
+            batch_size=cfg.get('BATCH_SIZE', 200)
+        )
+        log.info(f"📁 매매 저장소 연결: {self.filename}")
+
+    def subscribe(self, callback):
+        """
+        잔고 스냅샷 구독 (GUI/로그/저장소 등)
+        callback(snapshot) - 일반 함수면 call_soon, 코루틴 함수면 별도 태스크로 실행되어 호출자를 막지 않습니다.
+        """
+        self._subscribers.append(callback)
+
+    def _publish(self, snapshot):
+        loop = asyncio.get_running_loop()
+        for cb in self._subscribers:
+            if asyncio.iscoroutinefunction(cb):
+                loop.create_task(cb(snapshot))
+            else:
+                loop.call_soon(self._safe_call, cb, snapshot)
+
+    @staticmethod
+    def _safe_call(cb, snapshot):
+        try: cb(snapshot)
+        except Exception as e: log.error(f"❌ 스냅샷 구독자 에러 ({getattr(cb, '__name__', cb)}): {e}")
+
+    def _record_snapshot(self, snapshot):
+        # 기준 자산은 모든 거래소가 실제로 응답한 첫 스냅샷으로 고정
+        # (스냅샷 빠른 시작 직후에는 클라이언트 재검증 전이라 일부 거래소가 0 으로 잡힐 수 있음)
+        if self.initial_balance is None and not snapshot['Stale']: self.initial_balance = snapshot
+        self.balance_history.append(snapshot)
+        self.store.append_balance(snapshot)
+
+    def _log_snapshot(self, snapshot):
+        for name in self.exchanges:
+            bal = self.last_balances.get(name)
+            equity = snapshot.get(name, 0.0)
+            tag = " (stale)" if name in snapshot['Stale'] else ""
+            if bal and bal.get('positions'):
+                pos_str = ", ".join([f"{p['symbol']}:{p['size']}" for p in bal['positions']])
+                log.info(f"   └ {name}: ${equity:.2f}{tag} ({pos_str})")
+            else:
+                log.info(f"   └ {name}: ${equity:.2f}{tag}")
+        log.info(f"💵 총 자산: ${snapshot['Total_Equity']:.2f}")
+
+    def _deadline(self, name):
+        deadlines = self.snapshot_cfg.get('DEADLINE_SEC', {})
+        return deadlines.get(name, deadlines.get('DEFAULT', 3.0))
+
+    async def _fetch_balance(self, name, ex):
+        t = self._timing(name)
+        t0 = time.perf_counter()
+        try:
+            bal = await ex.get_balance()
+        except Exception as e:
+            log.error(f"⚠️ {name} 잔고 조회 에러: {e}")
+            bal = None
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        t['last_ms'] = elapsed_ms
+        t['avg_ms'] += 0.2 * (elapsed_ms - t['avg_ms']) if t['samples'] else elapsed_ms
+        t['max_ms'] = max(t['max_ms'], elapsed_ms)
+        t['samples'] += 1
+        if bal:
+            self.last_balances[name] = bal
+            t['last_ok'] = time.time()
+        else:
+            t['errors'] += 1
+        return bal
+
+    def _timing(self, name):
+        t = self.balance_timings.get(name)
+        if t is None:
+            t = self.balance_timings[name] = {
+                'last_ms': 0.0, 'avg_ms': 0.0, 'max_ms': 0.0, 'samples': 0,
+                'timeouts': 0, 'errors': 0, 'last_ok': 0.0
+            }
+        return t
 
     async def update_balances(self):
-        """모든 거래소 잔고 조회 및 스냅샷 저장"""
+        """
+        모든 거래소 잔고를 동시에 조회하여 스냅샷을 만듭니다.
+        거래소별 마감 시간(DEADLINE_SEC) 안에 응답하지 않으면 기다리지 않고 직전 값을 사용하며 'Stale' 로 표시합니다.
+        (늦은 조회는 취소하지 않고 끝까지 진행되어 last_balances 를 갱신하며, 다음 스냅샷은 진행 중인 조회를 재사용합니다.)
+        """
         snapshot = {
             'Time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'Total_Equity': 0.0
+            'Total_Equity': 0.0,
+            'Stale': []
         }
-        
+
         log.info("💰 잔고 스냅샷 촬영 중...")
+        tasks = {}
         for name, ex in self.exchanges.items():
-            try:
-                bal = await ex.get_balance()
-                equity = bal['equity'] if bal else 0.0
-                snapshot[name] = equity
-                snapshot['Total_Equity'] += equity
-                
-                # 포지션 정보도 로깅 (선택 사항)
-                if bal and bal['positions']:
-                    pos_str = ", ".join([f"{p['symbol']}:{p['size']}" for p in bal['positions']])
-                    log.info(f"   └ {name}: ${equity:.2f} ({pos_str})")
-                else:
-                    log.info(f"   └ {name}: ${equity:.2f}")
-                    
-            except Exception as e:
-                log.error(f"⚠️ {name} 잔고 조회 에러: {e}")
-                snapshot[name] = 0.0
+            task = self._inflight.get(name)
+            if task is None or task.done():
+                task = self._inflight[name] = asyncio.create_task(self._fetch_balance(name, ex))
+            tasks[name] = task
 
-        self.balance_history.append(snapshot)
-        self._save_to_excel('Balance', pd.DataFrame([snapshot]))
-        log.info(f"💵 총 자산: ${snapshot['Total_Equity']:.2f}")
+        async def wait_one(name, task):
+            await asyncio.wait({task}, timeout=self._deadline(name))
+
+        await asyncio.gather(*(wait_one(n, t) for n, t in tasks.items()))
+
+        for name, task in tasks.items():
+            bal = task.result() if task.done() and not task.cancelled() and task.exception() is None else None
+            if not task.done():
+                self._timing(name)['timeouts'] += 1
+                log.warning(f"⏱️ {name} 잔고 조회 지연 ({self._deadline(name)}s 초과) → 직전 값 사용")
+            if not bal:
+                bal = self.last_balances.get(name)
+                snapshot['Stale'].append(name)
+            equity = bal['equity'] if bal else 0.0
+            snapshot[name] = equity
+            snapshot['Total_Equity'] += equity
+
+        self._publish(snapshot)
+        return snapshot
+
+    def request_snapshot(self, delay: float = 0.0):
+        """
+        [비동기 요청] 잔고 스냅샷을 백그라운드 태스크로 실행하고 즉시 반환합니다.
+        이미 진행/예약 중인 요청이 있으면 합쳐집니다.
+        """
+        if self._snapshot_task and not self._snapshot_task.done(): return self._snapshot_task
+
+        async def run():
+            if delay > 0: await asyncio.sleep(delay)
+            try: await self.update_balances()
+            except Exception as e: log.error(f"❌ 잔고 스냅샷 실패: {e}")
+
+        self._snapshot_task = asyncio.get_running_loop().create_task(run())
+        return self._snapshot_task
 
     def log_trade(self, trade_data: dict):
         """
@@ -71,31 +181,15 @@ class PortfolioManager:
             **trade_data
         }
         self.trade_history.append(record)
-        self._save_to_excel('Trades', pd.DataFrame([record]))
+        self.store.append_trade(record)
         log.info(f"📝 매매 기록 저장: {record['Type']} {record['Symbol']}")
 
-    def _save_to_excel(self, sheet_name, df_new):
-        """데이터를 엑셀에 추가 (Append)"""
-        try:
-            # 기존 파일이 있으면 읽어서 합침 (단순 Append 모드가 제한적이므로)
-            if os.path.exists(self.filename):
-                with pd.ExcelWriter(self.filename, mode='a', engine='openpyxl', if_sheet_exists='overlay') as writer:
-                    # 해당 시트의 마지막 행 찾기 로직이 복잡하므로, 
-                    # 실전에서는 CSV로 저장 후 나중에 합치거나, 
-                    # 여기서는 메모리에 있는 전체 히스토리를 덮어쓰는 방식을 권장합니다.
-                    # 하지만 성능을 위해 여기서는 간단히 '새 데이터'만 추가하는 로직 대신
-                    # 전체 데이터를 다시 쓰는 방식을 사용하겠습니다 (안전성 우선).
-                    pass
-
-            # 안전한 저장 방식: 전체 데이터 덮어쓰기 (데이터가 아주 많지 않으므로 가능)
-            all_balance = pd.DataFrame(self.balance_history)
-            all_trades = pd.DataFrame(self.trade_history)
-            
-            with pd.ExcelWriter(self.filename, mode='w', engine='openpyxl') as writer:
-                if not all_balance.empty:
-                    all_balance.to_excel(writer, sheet_name='Balance', index=False)
-                if not all_trades.empty:
-                    all_trades.to_excel(writer, sheet_name='Trades', index=False)
-                    
-        except Exception as e:
-            log.error(f"❌ 엑셀 저장 실패: {e}")
\ No newline at end of file
+    def export(self, out_path=None):
+        """저장소 -> 엑셀(.xlsx) / CSV 내보내기 (블로킹: GUI 에서는 별도 스레드로 호출)"""
+        out_path = out_path or os.path.splitext(self.filename)[0] + '.xlsx'
+        return TradeStore.export(self.filename, out_path)
+
+    async def close(self):
+        for task in [self._snapshot_task, *self._inflight.values()]:
+            if task and not task.done(): task.cancel()
+        await self.store.close()
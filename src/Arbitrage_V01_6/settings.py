@@ -47,6 +47,7 @@ EXCHANGE_CONFIG = {
         # [변경] LIGHTER_PRIVATE_KEY / WALLET_ADDRESS 매핑
         'api_key': os.getenv('LIGHTER_PRIVATE_KEY'), # 라이터는 Private Key를 API Key처럼 사용
         'public_key': os.getenv('LIGHTER_WALLET_ADDRESS'),
+        'account_index': os.getenv('LIGHTER_ACCOUNT_INDEX'), # 필수: 미설정 시 LighterExchange 생성 실패
     },
     'extended': {
         'private_key': os.getenv('EXTENDED_PRIVATE_KEY'),
@@ -141,6 +142,93 @@ LOGGING = {
     'PORTFOLIO_FILEPATH': 'virtual_arbitrage_log.xlsx'
 }
 
+# === 5. 거래소 실행 품질 (Venue Scoring) ===
+# 주문 왕복 지연/체결률/거부율을 측정하여 거래소 쌍 선택 및 주문 순서를 결정합니다.
+VENUE_SCORING_CONFIG = {
+    'EWMA_ALPHA': 0.2,                 # 최근 주문 가중치 (0~1)
+    'DEFAULT_LATENCY_MS': 300.0,       # 측정값이 없을 때 가정하는 주문 왕복 지연
+    'LATENCY_COST_PCT_PER_SEC': 0.05,  # 지연 1초당 예상 가격 불리 (%)
+    'LEGGING_COST_PCT': 0.3,           # 한쪽만 체결될 경우 예상 손실 (%)
+    'SEQUENTIAL_RELIABILITY_GAP': 0.1, # 두 거래소 신뢰도 차이가 이 이상이면 불안한 쪽 먼저 주문
+    'SEQUENTIAL_MAX_LATENCY_MS': 800.0,# 먼저 보낼 거래소의 지연이 이보다 크면 동시 주문 유지
+    'MIN_SAMPLES': 5,                  # 순차 주문 판단에 필요한 최소 표본 수
+    'MIN_NET_EDGE_PCT': 0.0,           # 기대 순수익(비용 차감 후)이 이 값 이하인 쌍은 진입 후보에서 제외 (%)
+}
+
+# === 6. 레깅 복구 (Legging Recovery) ===
+# 한쪽만 체결되었을 때 바로 청산하지 않고, 다른 거래소로 빠진 레그를 재주문합니다.
+LEGGING_RECOVERY_CONFIG = {
+    'ENABLED': True,
+    'QUOTE_MAX_AGE_SEC': 3.0,       # 이보다 오래된 호가의 거래소는 후보에서 제외
+    'MAX_LATENCY_MS': 1500.0,       # 측정 지연이 이보다 큰 거래소는 후보에서 제외
+    'MAX_ADVERSE_PCT': 0.1,         # 체결된 레그 가격 대비 허용 가능한 최대 불리 (%)
+    'TIME_BUDGET_SEC': 5.0,         # 재주문 시도에 쓸 수 있는 최대 시간 (초과 시 청산)
+    'MAX_ATTEMPTS': 2,              # 최대 재주문 거래소 수
+}
+
+# === 7. 거래소 REST 요청 한도 (Rate Limits) ===
+# 거래소별 토큰 버킷. 공개된 한도보다 약간 낮게 잡습니다.
+# RESERVE: 해당 레인이 건드리지 못하는 버킷 비율 (주문용 여유분 확보)
+RATE_LIMITS = {
+    'DEFAULT': {'RATE_PER_SEC': 5.0, 'BURST': 10, 'RESERVE': {'account': 0.2, 'metadata': 0.4}},
+    'HL':   {'RATE_PER_SEC': 18.0, 'BURST': 60},   # 1200 weight/min (info 2~20, exchange 1)
+    'GRVT': {'RATE_PER_SEC': 10.0, 'BURST': 20},
+    'PAC':  {'RATE_PER_SEC': 4.0,  'BURST': 8},
+    'LTR':  {'RATE_PER_SEC': 1.0,  'BURST': 10},   # Standard 계정 60 req/min
+    'EXT':  {'RATE_PER_SEC': 15.0, 'BURST': 30},   # 1000 req/min
+}
+
+# === 8. 매매/잔고 저장소 (Trade Store) ===
+# 기록은 SQLite(WAL) 에 추가만 하고, 엑셀/CSV 는 GUI 메뉴 또는
+# `python utils/trade_store.py arbitrage_log_real.db --out report.xlsx` 로 필요할 때 생성합니다.
+TRADE_STORE_CONFIG = {
+    'FLUSH_INTERVAL_SEC': 1.0,   # 최대 이 시간만큼 모아서 한 번에 기록
+    'BATCH_SIZE': 200,           # 이 개수가 차면 즉시 기록
+    'MEMORY_HISTORY': 1000,      # GUI 표시용으로 메모리에 유지할 최근 기록 수
+}
+
+# === 9. 잔고 스냅샷 (Balance Snapshot) ===
+# 모든 거래소 잔고를 동시에 조회하고, 마감 시간을 넘긴 거래소는 직전 값(Stale)으로 대체합니다.
+BALANCE_SNAPSHOT_CONFIG = {
+    'DEADLINE_SEC': {'DEFAULT': 3.0, 'GRVT': 5.0, 'EXT': 5.0},
+}
+
+# === 10. 마켓 메타데이터 스냅샷 (Fast Startup) ===
+# 정밀도/최소 수량/최대 레버리지/틱/마켓 ID 를 디스크에 저장해 두고 다음 기동 시 즉시 사용합니다.
+# 실시간 로드는 백그라운드에서 재검증하며, 완료 전까지 해당 거래소 주문은 보류됩니다.
+MARKET_SNAPSHOT_CONFIG = {
+    'ENABLED': True,
+    'PATH': os.path.join(os.path.dirname(__file__), 'market_snapshot.json'),
+    'MAX_AGE_SEC': 86400,   # 이보다 오래된 스냅샷은 무시 (상장/레버리지 변경 대비)
+}
+
+# === 11. 설정 핫 리로드 (Config Service) ===
+# STRATEGY_PRESETS / TARGET_PAIRS_CONFIG 의 변경분은 오버라이드 파일에 저장되어 재시작 없이 적용됩니다.
+# (GUI 설정 편집기 또는 파일 직접 수정, 새 티커 추가 시 해당 거래소만 증분 구독)
+CONFIG_SERVICE = {
+    'OVERRIDES_PATH': os.path.join(os.path.dirname(__file__), 'config_overrides.json'),
+    'WATCH_INTERVAL_SEC': 2.0,   # 파일 변경 확인 주기
+}
+
+# === 12. 포지션 저널 (Crash Recovery) ===
+# 진입/체결/청산을 JSON Lines 파일에 추가 기록하고, 재시작 시 재생 + 거래소 실제 포지션과 대조하여 청산 감시를 재개합니다.
+POSITION_JOURNAL_CONFIG = {
+    'PATH': os.path.join(os.path.dirname(__file__), 'position_journal.jsonl'),
+    'FSYNC_INTERVAL_SEC': 0.2,   # 최대 이 시간만큼 모아서 한 번에 fsync
+    'BATCH_SIZE': 100,           # 이 개수가 차면 즉시 fsync
+    'QTY_TOLERANCE': 0.05,       # 거래소 수량이 저널 수량의 이 비율 이하이면 '없음' 으로 판단
+}
+
+# === 13. 전역 기회 순위 / 증거금 할당 (Opportunity Ranking) ===
+# 티커별로 임계값을 넘자마자 진입하지 않고, 전체 티커의 기대 순수익 상위 K 개에 거래소별 가용 증거금을 배정합니다.
+OPPORTUNITY_RANKING_CONFIG = {
+    'TOP_K': 10,                  # 할당 라운드마다 검토할 상위 기회 수
+    'MAX_CONCURRENT_ENTRIES': 2,  # 동시에 진행할 수 있는 진입 주문 수
+    'DEBOUNCE_SEC': 0.05,         # 호가 변경 후 할당까지 모으는 시간 (같은 순간의 더 좋은 기회를 함께 비교)
+    'MARGIN_BUFFER': 1.05,        # 필요 증거금 여유분
+    'MAX_QUOTE_AGE_SEC': 2.0,     # 이보다 오래 갱신되지 않은 기회는 할당하지 않고 순위에서 제거
+}
+
 
 #============================================================
 TARGET_PAIRS_CONFIG = {
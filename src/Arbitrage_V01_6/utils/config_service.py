@@ -0,0 +1,256 @@
+# utils/config_service.py
+import asyncio
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+try:
+    import settings
+except ImportError:
+    settings = None
+
+log = logging.getLogger("ConfigService")
+
+# 거래소 심볼 키 (TARGET_PAIRS_CONFIG[...]['symbols'])
+SYMBOL_KEYS = ('hyperliquid', 'grvt', 'pacifica', 'extended', 'lighter')
+# 숫자 필드 검증 규칙: (타입, 0 허용 여부)
+PAIR_FIELDS = {'trade_size_fixed_usd': (float, False), 'max_margin_usd': (float, False), 'target_leverage': (int, False)}
+PRESET_FIELDS = {'entry_threshold_pct': (float, False), 'exit_threshold_pct': (float, True),
+                 'min_hold_time_sec': (float, True), 'max_hold_time_sec': (float, False)}
+
+def _freeze(obj):
+    """중첩 dict/list -> 읽기 전용 (MappingProxyType / tuple)"""
+    if isinstance(obj, dict): return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list): return tuple(_freeze(v) for v in obj)
+    return obj
+
+def _merge(base: dict, override: dict, keep_none: bool = False) -> dict:
+    """override 를 base 위에 재귀 병합. null 은 항목 삭제 (keep_none=True 면 오버라이드끼리 합칠 때 null 표시를 유지)"""
+    out = copy.deepcopy(base)
+    for key, val in override.items():
+        if val is None:
+            if keep_none: out[key] = None
+            else: out.pop(key, None)
+        elif isinstance(val, dict) and isinstance(out.get(key), dict):
+            out[key] = _merge(out[key], val, keep_none)
+        else:
+            out[key] = copy.deepcopy(val)
+    return out
+
+class CompiledConfig:
+    """
+    [불변 설정] 한 번 만들어지면 바뀌지 않는 전략/페어 설정 묶음.
+    조회하는 쪽은 cfg = service.current 를 한 번 잡고 쓰면, 도중에 설정이 교체되어도 일관된 값을 봅니다.
+    """
+    __slots__ = ('version', 'presets', 'pairs', 'loaded_at')
+
+    def __init__(self, version: int, presets: dict, pairs: dict):
+        self.version = version
+        self.presets = _freeze(presets)
+        self.pairs = _freeze(pairs)
+        self.loaded_at = time.time()
+
+    def pair(self, ticker: str):
+        return self.pairs.get(ticker)
+
+    def strategy(self, ticker: str):
+        """티커의 전략 프리셋 (없으면 'major')"""
+        pair = self.pairs.get(ticker) or {}
+        return self.presets.get(pair.get('strategy_preset', 'major'), {})
+
+def validate(presets: dict, pairs: dict):
+    """잘못된 값이 있으면 ValueError (메시지에 모든 오류 포함)"""
+    errors = []
+    for name, p in presets.items():
+        if not isinstance(p, dict):
+            errors.append(f"preset {name}: dict 아님"); continue
+        for field, (typ, zero_ok) in PRESET_FIELDS.items():
+            if field not in p: continue
+            try: val = typ(p[field])
+            except (TypeError, ValueError):
+                errors.append(f"preset {name}.{field}: 숫자 아님 ({p[field]!r})"); continue
+            if val < 0 or (val == 0 and not zero_ok): errors.append(f"preset {name}.{field}: {val} (양수 필요)")
+        if 'min_hold_time_sec' in p and 'max_hold_time_sec' in p and float(p['min_hold_time_sec']) > float(p['max_hold_time_sec']):
+            errors.append(f"preset {name}: min_hold_time_sec > max_hold_time_sec")
+    for ticker, c in pairs.items():
+        if not isinstance(c, dict):
+            errors.append(f"{ticker}: dict 아님"); continue
+        symbols = c.get('symbols')
+        if not isinstance(symbols, dict) or sum(1 for k in SYMBOL_KEYS if symbols.get(k) not in (None, "None")) < 2:
+            errors.append(f"{ticker}.symbols: 2개 이상 거래소 심볼 필요")
+        elif symbols.get('lighter') is not None and not isinstance(symbols.get('lighter'), int):
+            errors.append(f"{ticker}.symbols.lighter: 마켓 ID(정수) 필요")
+        preset = c.get('strategy_preset', 'major')
+        if preset not in presets: errors.append(f"{ticker}.strategy_preset: 없는 프리셋 '{preset}'")
+        for field, (typ, zero_ok) in PAIR_FIELDS.items():
+            if field not in c: continue
+            try: val = typ(c[field])
+            except (TypeError, ValueError):
+                errors.append(f"{ticker}.{field}: 숫자 아님 ({c[field]!r})"); continue
+            if val < 0 or (val == 0 and not zero_ok): errors.append(f"{ticker}.{field}: {val} (양수 필요)")
+    if errors: raise ValueError("; ".join(errors))
+
+class ConfigService:
+    """
+    [설정 서비스] settings.py 기본값 + 오버라이드 파일(JSON) 을 합쳐 CompiledConfig 를 만들고 원자적으로 교체합니다.
+
+    - 오버라이드 파일: {"STRATEGY_PRESETS": {...}, "TARGET_PAIRS_CONFIG": {...}} (바뀐 필드만, null 은 삭제)
+    - GUI 수정(apply) 은 검증 후 즉시 교체하고 오버라이드 파일에 저장 → 재시작 후에도 유지
+    - watch() 는 파일 변경(mtime)을 감시하여 외부 편집도 반영 (검증 실패 시 기존 설정 유지)
+    - 교체 시 구독자에게 (old, new, 추가/삭제/변경 티커) 를 봇 이벤트 루프에서 전달 → 새 티커만 증분 구독
+    """
+    def __init__(self, overrides_path: str = None, watch_interval: float = 2.0):
+        cfg = getattr(settings, 'CONFIG_SERVICE', {}) if settings else {}
+        self.path = overrides_path or cfg.get('OVERRIDES_PATH')
+        self.watch_interval = cfg.get('WATCH_INTERVAL_SEC', watch_interval)
+        self._base_presets = copy.deepcopy(getattr(settings, 'STRATEGY_PRESETS', {}) if settings else {})
+        self._base_pairs = copy.deepcopy(getattr(settings, 'TARGET_PAIRS_CONFIG', {}) if settings else {})
+        self._lock = threading.Lock()
+        self._loop = None
+        self._subscribers = []
+        self._delivered = None  # 구독자에게 마지막으로 전달된 설정 (attach 전 교체분 재전달용)
+        self._mtime = None
+        self.overrides = {}
+        self.stats = {'reloads': 0, 'rejected': 0, 'last_error': None}
+
+        overrides = self._read_file()
+        try:
+            self.current = self._compile(overrides or {}, 1)
+            self.overrides = overrides or {}
+        except ValueError as e:
+            log.error(f"❌ [설정] 오버라이드 파일 무시 (검증 실패): {e}")
+            self.current = CompiledConfig(1, self._base_presets, self._base_pairs)
+        self._delivered = self.current
+
+    # ------------------------------------------------------------
+    # 컴파일 / 교체
+    # ------------------------------------------------------------
+    def _compile(self, overrides: dict, version: int) -> CompiledConfig:
+        presets = _merge(self._base_presets, overrides.get('STRATEGY_PRESETS', {}))
+        pairs = _merge(self._base_pairs, overrides.get('TARGET_PAIRS_CONFIG', {}))
+        validate(presets, pairs)
+        return CompiledConfig(version, presets, pairs)
+
+    def _swap(self, overrides: dict, source: str):
+        with self._lock:
+            new = self._compile(overrides, self.current.version + 1)
+            old, self.current = self.current, new
+            self.overrides = overrides
+        self.stats['reloads'] += 1
+        diff = self.diff(old, new)
+        log.info(f"🔧 [설정] v{new.version} 적용 ({source}) | 추가:{diff['added']} 삭제:{diff['removed']} 변경:{len(diff['changed'])} 프리셋:{diff['presets']}")
+        self._notify(old, new, diff)
+        return new
+
+    @staticmethod
+    def diff(old: CompiledConfig, new: CompiledConfig) -> dict:
+        return {
+            'added': [t for t in new.pairs if t not in old.pairs],
+            'removed': [t for t in old.pairs if t not in new.pairs],
+            'changed': [t for t in new.pairs if t in old.pairs and old.pairs[t] != new.pairs[t]],
+            'presets': [p for p in set(old.presets) | set(new.presets) if old.presets.get(p) != new.presets.get(p)],
+        }
+
+    def apply(self, changes: dict, source: str = 'gui', persist: bool = True) -> CompiledConfig:
+        """
+        changes = {"TARGET_PAIRS_CONFIG": {"BTC": {"trade_size_fixed_usd": 300}}, "STRATEGY_PRESETS": {...}}
+        검증 실패 시 ValueError (기존 설정 유지). 어느 스레드에서 호출해도 됩니다.
+        """
+        try:
+            new = self._swap(_merge(self.overrides, changes, keep_none=True), source)
+        except ValueError as e:
+            self.stats['rejected'] += 1; self.stats['last_error'] = str(e)
+            raise
+        if persist: self._write_file()
+        return new
+
+    # ------------------------------------------------------------
+    # 구독 (봇 이벤트 루프에서 실행)
+    # ------------------------------------------------------------
+    def attach(self, loop):
+        """
+        구독자 콜백을 실행할 이벤트 루프 (GUI 스레드의 apply 도 이 루프로 전달)
+        attach 전에 교체된 설정은 전달되지 못했으므로, 마지막 전달분 대비 현재 설정을 한 번에 재전달합니다.
+        (구독자를 먼저 등록한 뒤 attach 해야 재전달을 받습니다)
+        """
+        self._loop = loop
+        with self._lock:
+            old, new = self._delivered, self.current
+        if old is not new:
+            log.info(f"🔧 [설정] attach 전 교체분 재전달 (v{old.version} → v{new.version})")
+            self._notify(old, new, self.diff(old, new))
+
+    def subscribe(self, callback):
+        """callback(old, new, diff) - 일반 함수 또는 코루틴 함수"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers: self._subscribers.remove(callback)
+
+    def _notify(self, old, new, diff):
+        loop = self._loop
+        if loop is None or loop.is_closed(): return
+        self._delivered = new
+        for cb in self._subscribers:
+            loop.call_soon_threadsafe(self._dispatch, cb, old, new, diff)
+
+    @staticmethod
+    def _dispatch(cb, old, new, diff):
+        try:
+            res = cb(old, new, diff)
+            if asyncio.iscoroutine(res): asyncio.ensure_future(res)
+        except Exception as e:
+            log.error(f"❌ [설정] 구독자 에러 ({getattr(cb, '__name__', cb)}): {e}")
+
+    # ------------------------------------------------------------
+    # 오버라이드 파일
+    # ------------------------------------------------------------
+    def _read_file(self):
+        if not self.path or not os.path.exists(self.path): return None
+        try:
+            self._mtime = os.path.getmtime(self.path)
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            log.warning(f"⚠️ [설정] 오버라이드 파일 읽기 실패 ({self.path}): {e}")
+            return None
+
+    def _write_file(self):
+        """임시 파일에 쓴 뒤 os.replace 로 교체"""
+        if not self.path: return
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.overrides, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+            self._mtime = os.path.getmtime(self.path)
+        except Exception as e:
+            log.warning(f"⚠️ [설정] 오버라이드 저장 실패 ({self.path}): {e}")
+
+    async def watch(self):
+        """오버라이드 파일 변경 감시 (mtime 폴링, 외부 편집기/다른 프로세스용)"""
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            if not self.path: continue
+            try: mtime = os.path.getmtime(self.path)
+            except OSError: continue
+            if mtime == self._mtime: continue
+            overrides = self._read_file()
+            if overrides is None: continue
+            try:
+                self._swap(overrides, 'file')
+            except ValueError as e:
+                self.stats['rejected'] += 1; self.stats['last_error'] = str(e)
+                log.error(f"❌ [설정] 파일 변경 거부 (기존 설정 유지): {e}")
+
+_SERVICE = None
+
+def get_config() -> ConfigService:
+    """프로세스 전역 설정 서비스 (GUI 와 봇이 공유)"""
+    global _SERVICE
+    if _SERVICE is None: _SERVICE = ConfigService()
+    return _SERVICE
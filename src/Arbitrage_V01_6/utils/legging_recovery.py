@@ -0,0 +1,120 @@
+# utils/legging_recovery.py
+import logging
+import time
+from collections import deque
+import settings
+
+log = logging.getLogger("LeggingRecovery")
+
+class LeggingRecovery:
+    """
+    [레깅 복구 엔진] 한쪽 레그만 체결되었을 때, 실시간 호가 매트릭스(bbo_cache)에서
+    지연/가격 예산 안에 드는 차선 거래소를 골라 빠진 레그를 재주문합니다.
+    모든 후보가 실패하거나 예산을 넘기면 그때 체결된 레그를 청산합니다.
+
+    사고(incident) 1건마다 노출 시간과 결과(rerouted / flattened / unresolved)를 기록합니다.
+    """
+    def __init__(self, exchanges: dict, bbo_cache: dict, venue_scorer, config: dict = None, check_balance=None):
+        self.exchanges = exchanges
+        self.check_balance = check_balance  # async (ex_name, required_usd) -> bool, 1차 진입과 같은 잔고 검사
+        self.bbo_cache = bbo_cache
+        self.venue_scorer = venue_scorer
+        self.cfg = {**getattr(settings, 'LEGGING_RECOVERY_CONFIG', {}), **(config or {})}
+        self.incidents = deque(maxlen=200)
+        self.counts = {'rerouted': 0, 'flattened': 0, 'unresolved': 0}
+
+    def _candidates(self, symbol, need_side, filled_price, exclude):
+        """
+        빠진 레그를 대신 받을 거래소 후보 (유리한 가격 순)
+        need_side='SELL' 이면 후보 bid 로 매도, 'BUY' 이면 후보 ask 로 매수
+        """
+        now = time.time()
+        max_age = self.cfg.get('QUOTE_MAX_AGE_SEC', 3.0)
+        max_lat = self.cfg.get('MAX_LATENCY_MS', 1500.0)
+        max_adverse = self.cfg.get('MAX_ADVERSE_PCT', 0.1)
+        out = []
+        for ex_name, q in self.bbo_cache.get(symbol, {}).items():
+            if ex_name in exclude or ex_name not in self.exchanges: continue
+            if not getattr(self.exchanges[ex_name], 'markets_ready', True): continue
+            if now - q.get('timestamp', 0) > max_age: continue
+            st = self.venue_scorer.stats.get(ex_name)
+            if st and st.latency_ms > max_lat: continue
+            if need_side == 'SELL':
+                px = q['bid']
+                edge_pct = (px - filled_price) / filled_price * 100
+            else:
+                px = q['ask']
+                edge_pct = (filled_price - px) / filled_price * 100
+            if edge_pct < -max_adverse: continue
+            out.append((edge_pct, ex_name, px))
+        out.sort(reverse=True)
+        return out
+
+    async def recover(self, symbol, filled_ex_name, filled_side, filled_qty, filled_price, failed_ex_name, leverage=None):
+        """
+        filled_side: 체결된 레그의 방향 ('BUY' = 롱 레그 체결, 'SELL' = 숏 레그 체결)
+        Returns: incident dict - outcome 이 'rerouted' 이면 route_ex / route_qty / route_price 포함
+        """
+        start = time.time()
+        need_side = 'SELL' if filled_side == 'BUY' else 'BUY'
+        incident = {
+            'symbol': symbol, 'filled_ex': filled_ex_name, 'failed_ex': failed_ex_name,
+            'filled_side': filled_side, 'qty': filled_qty, 'start': start,
+            'attempts': [], 'outcome': None, 'route_ex': None, 'route_qty': 0.0, 'route_price': 0.0,
+            'exposure_sec': 0.0
+        }
+
+        if self.cfg.get('ENABLED', True) and filled_price > 0:
+            budget = self.cfg.get('TIME_BUDGET_SEC', 5.0)
+            cands = self._candidates(symbol, need_side, filled_price, {filled_ex_name, failed_ex_name})
+            for edge_pct, ex_name, px in cands[:self.cfg.get('MAX_ATTEMPTS', 2)]:
+                if time.time() - start > budget:
+                    log.warning(f"⏱️ [레깅 복구] {symbol} 시간 예산 초과 ({budget}s)")
+                    break
+                ex = self.exchanges[ex_name]
+                # 1차 진입과 같은 증거금 검사 (잔고 부족 거래소로 재주문해 거절당하는 시간 낭비 방지)
+                required_margin = (filled_qty * px / (leverage or 1)) * 1.05
+                if self.check_balance and not await self.check_balance(ex_name, required_margin):
+                    incident['attempts'].append({'ex': ex_name, 'filled': 0.0, 'edge_pct': edge_pct, 'skipped': 'balance'})
+                    continue
+                log.info(f"🔁 [레깅 복구] {symbol} {need_side} {filled_qty} → {ex_name} @ {px} (Edge {edge_pct:+.3f}%)")
+                t0 = time.perf_counter()
+                try:
+                    if leverage: await ex.set_leverage(symbol, leverage)
+                    res = await ex.place_market_order(symbol, need_side, filled_qty, px)
+                    self.venue_scorer.record_order(ex_name, time.perf_counter() - t0, accepted=isinstance(res, dict))
+                    got, avg_px = await ex.confirm_fill(res, filled_qty, px)
+                except Exception as e:
+                    log.error(f"❌ [레깅 복구] {ex_name} 주문 예외: {e}")
+                    got, avg_px = 0.0, 0.0
+                incident['attempts'].append({'ex': ex_name, 'filled': got, 'edge_pct': edge_pct})
+                if got > 0:
+                    incident.update(outcome='rerouted', route_ex=ex_name, route_qty=got, route_price=avg_px or px)
+                    break
+
+        if incident['outcome'] is None:
+            # 재주문 실패 → 체결된 레그 청산
+            log.critical(f"🚨 [레깅 복구] {symbol} 대체 거래소 없음 → {filled_ex_name} 청산")
+            ex = self.exchanges[filled_ex_name]
+            close_side = 'SELL' if filled_side == 'BUY' else 'BUY'
+            try:
+                res = await ex.place_market_order(symbol, close_side, filled_qty, filled_price, reduce_only=True)
+                incident['outcome'] = 'flattened' if isinstance(res, dict) else 'unresolved'
+            except Exception as e:
+                log.error(f"❌ [레깅 복구] {symbol} 청산 실패: {e}")
+                incident['outcome'] = 'unresolved'
+
+        incident['exposure_sec'] = time.time() - start
+        self.counts[incident['outcome']] += 1
+        self.incidents.append(incident)
+        log.info(f"📋 [레깅 복구] {symbol} 결과: {incident['outcome']} (노출 {incident['exposure_sec']:.2f}s)")
+        return incident
+
+    def summary(self):
+        out = {'total': dict(self.counts)}
+        for i, inc in enumerate(list(self.incidents)[-10:]):
+            out[f"{inc['symbol']}#{i}"] = {
+                'outcome': inc['outcome'], 'filled_ex': inc['filled_ex'], 'failed_ex': inc['failed_ex'],
+                'route_ex': inc['route_ex'] or '-', 'exposure_sec': inc['exposure_sec']
+            }
+        return out
@@ -0,0 +1,88 @@
+# utils/lighter_nonce.py
+# GRVT_Lighter_Bot/exchanges/lighter_nonce.py 와 같은 구현입니다. 두 봇은 따로 배포/실행되는 프로젝트라
+# (설정 모듈과 import 방식이 다름) 공유 패키지가 없으므로, 수정할 때는 양쪽을 함께 맞춰 주세요.
+import asyncio
+import logging
+import time
+
+log = logging.getLogger("LighterNonce")
+
+class LighterNonceManager:
+    """
+    [Lighter 논스 관리자] API Key 하나당 하나씩 사용합니다.
+
+    - 최초 1회 서버의 nextNonce 를 받아오고, 이후에는 로컬 카운터로 즉시 발급합니다.
+    - 발급 과정에 await 가 없으므로 동시에 주문하는 코루틴끼리 논스가 겹치지 않습니다.
+    - 주문이 거부되면 현재 세대(generation)를 무효화하고, 다음 발급 시 서버와 재동기화합니다.
+      (같은 세대에서 여러 건이 연달아 실패해도 재동기화는 1회만 수행)
+    - 서명은 논스를 발급받은 뒤에만 합니다 (미리 서명해 두지 않음): 미리 서명한 tx 는 그 논스를 쥐고 있게 되고,
+      Lighter 는 그 tx 가 전송될 때까지 같은 키의 이후 논스를 모두 거부합니다.
+    """
+    def __init__(self, fetch_next_nonce, api_key_index: int):
+        self._fetch_next_nonce = fetch_next_nonce  # async () -> int
+        self.api_key_index = api_key_index
+        self._next_nonce = None
+        self._generation = 0
+        self._sync_lock = asyncio.Lock()
+        self._last_coi = 0
+        self.stats = {'issued': 0, 'syncs': 0, 'rejections': 0}
+
+    @staticmethod
+    def is_nonce_error(err) -> bool:
+        return bool(err) and 'nonce' in str(err).lower()
+
+    async def sync(self):
+        async with self._sync_lock:
+            await self._sync_locked()
+
+    async def _sync_locked(self):
+        nonce = int(await self._fetch_next_nonce())
+        self._next_nonce = nonce
+        self._generation += 1
+        self.stats['syncs'] += 1
+        log.info(f"🔢 [LTR] 논스 동기화 완료 (Key:{self.api_key_index}, Next:{nonce})")
+
+    async def acquire(self):
+        """(nonce, generation) 반환. 카운터가 무효 상태면 먼저 서버와 동기화합니다."""
+        if self._next_nonce is None:
+            async with self._sync_lock:
+                if self._next_nonce is None:
+                    await self._sync_locked()
+        nonce = self._next_nonce
+        self._next_nonce += 1
+        self.stats['issued'] += 1
+        return nonce, self._generation
+
+    def on_rejected(self, generation: int, err=None):
+        self.stats['rejections'] += 1
+        if generation != self._generation or self._next_nonce is None: return
+        self._next_nonce = None
+        log.warning(f"⚠️ [LTR] 주문 거부로 논스 재동기화 예약: {err}")
+
+    def next_client_order_index(self) -> int:
+        """단조 증가하는 client_order_index (ms 기준, 같은 ms 내 충돌 시 +1)"""
+        coi = int(time.time() * 1000)
+        if coi <= self._last_coi: coi = self._last_coi + 1
+        self._last_coi = coi
+        return coi
+
+    async def submit(self, send, retries: int = 1, before=None):
+        """
+        send(nonce, api_key_index) -> (tx, tx_hash, err) 형태의 SDK 호출을 실행합니다.
+        논스 에러는 재동기화 후 새 논스로 재시도하고, 그 외 에러는 그대로 반환합니다.
+        before: 논스 발급 직전마다 await (예: 레이트 리밋 대기) - 대기 중에 논스를 쥐고 있지 않도록
+        """
+        result = (None, None, "no attempt")
+        for _ in range(retries + 1):
+            if before is not None: await before()
+            nonce, gen = await self.acquire()
+            try:
+                result = await send(nonce, self.api_key_index)
+            except Exception as e:
+                self.on_rejected(gen, e)
+                raise
+            err = result[2] if isinstance(result, tuple) and len(result) > 2 else None
+            if not err: return result
+            self.on_rejected(gen, err)
+            if not self.is_nonce_error(err): return result
+        return result
@@ -0,0 +1,99 @@
+# utils/lot_math.py
+import math
+from functools import lru_cache
+
+# float 곱셈 오차 보정 범위 (로트 단위 절대값): 0.29 * 100 = 28.999999999999996 → 29 로 인정,
+# 1.005 * 100 = 100.49999999999999 → 반올림 시 정확히 절반(.5)으로 인정.
+# 상대값(|x| * eps)으로 두면 큰 값에서 허용 폭이 1 로트의 일부까지 커져
+# 318.4854739 (prec 6) 가 318.485474 로 올라가는 등 내림이 깨지므로 절대값으로 둡니다.
+_SNAP = 1e-6
+# 최소 수량 비교용 상대 오차
+_EPS = 1e-9
+
+def step_decimals(step: float) -> int:
+    """단위의 소수 자릿수: 0.001 -> 3, 0.5 -> 1, 1e-05 -> 5, 10 -> 0 (시작 시 1회만 호출)"""
+    text = repr(float(step)).lower()
+    exp = 0
+    if 'e' in text:
+        text, e = text.split('e')
+        exp = int(e)
+    frac = len(text.split('.')[1].rstrip('0')) if '.' in text else 0
+    return max(frac - exp, 0)
+
+class LotSpec:
+    """
+    [정수 로트] 수량/가격 단위(step)를 정수 배율(scale = 10^decimals)과 정수 step_units 로 미리 변환해 둡니다.
+
+    - 값 -> 로트 수(정수) 변환 시 float 곱셈 오차 (0.29 * 100 = 28.99..) 는 _SNAP 범위에서 보정합니다.
+    - 결과 값은 lots * step_units / scale (10의 거듭제곱 나눗셈 → 해당 소수에 가장 가까운 float)
+    - units() 는 거래소 정수 단위 (예: Lighter base_amount / price) 를 그대로 돌려줍니다.
+    주문 경로에서 10**prec 재계산, Decimal(str(...)) 변환, 문자열 파싱이 없습니다.
+    """
+    __slots__ = ('step', 'decimals', 'scale', 'step_units', 'min_size', '_inv', '_min_ok')
+
+    def __init__(self, step: float, min_size: float = 0.0):
+        self.step = float(step)
+        self.decimals = step_decimals(step)
+        self.scale = 10 ** self.decimals
+        self.step_units = max(int(round(self.step * self.scale)), 1)
+        self._inv = self.scale / self.step_units
+        self.min_size = float(min_size or 0.0)
+        self._min_ok = self.min_size * (1 - _EPS)
+
+    def __eq__(self, other):
+        return isinstance(other, LotSpec) and (self.step_units, self.scale, self.min_size) == (other.step_units, other.scale, other.min_size)
+
+    def __hash__(self):
+        return hash((self.step_units, self.scale, self.min_size))
+
+    def __repr__(self):
+        return f"LotSpec(step={self.step}, min_size={self.min_size})"
+
+    def lots(self, value: float, mode: str = 'floor') -> int:
+        """값 -> 로트 수 (mode: 'floor' / 'ceil' / 'round' (half-up))"""
+        x = value * self._inv
+        # 다음(이전) 정수와 _SNAP 이내로 붙어 있으면 곱셈 오차로 보고 그 정수로 인정
+        if mode == 'ceil':
+            n = math.ceil(x)
+            return n - 1 if n - x > 1 - _SNAP else n
+        if mode == 'round': x += 0.5
+        n = math.floor(x)
+        return n + 1 if x - n > 1 - _SNAP else n
+
+    def from_lots(self, lots: int) -> float:
+        return lots * self.step_units / self.scale
+
+    def units(self, value: float, mode: str = 'floor') -> int:
+        """값 -> 정수 단위 (value * 10^decimals 를 step 에 맞춘 정수)"""
+        if mode == 'floor':
+            x = value * self._inv
+            n = math.floor(x)
+            return (n + 1 if x - n > 1 - _SNAP else n) * self.step_units
+        return self.lots(value, mode) * self.step_units
+
+    def floor(self, value: float) -> float:
+        return self.from_lots(self.lots(value, 'floor'))
+
+    def ceil(self, value: float) -> float:
+        return self.from_lots(self.lots(value, 'ceil'))
+
+    def round(self, value: float) -> float:
+        return self.from_lots(self.lots(value, 'round'))
+
+    def validate(self, amount: float) -> float:
+        """주문 수량: 로트 단위로 내림, 최소 수량 미만이면 0.0"""
+        if amount <= 0: return 0.0
+        x = amount * self._inv
+        n = math.floor(x)
+        if x - n > 1 - _SNAP: n += 1
+        qty = n * self.step_units / self.scale
+        return qty if n and qty >= self._min_ok else 0.0
+
+@lru_cache(maxsize=None)
+def lot_from_step(step: float, min_size: float = 0.0) -> LotSpec:
+    """같은 (step, 최소 수량) 조합은 하나의 LotSpec 을 공유합니다."""
+    return LotSpec(step, min_size)
+
+def lot_from_precision(prec: int, min_size: float = 0.0) -> LotSpec:
+    """소수 자릿수 기준 (prec=3 → 0.001, prec=-1 → 10)"""
+    return lot_from_step(10.0 ** -prec, min_size)
@@ -0,0 +1,42 @@
+# utils/market_snapshot.py
+import json
+import logging
+import os
+import time
+
+log = logging.getLogger("MarketSnapshot")
+
+# 저장 형식이 바뀌면 올려서 이전 파일을 무시하도록 합니다.
+SNAPSHOT_VERSION = 2
+
+def load_snapshot(path: str, max_age_sec: float = None):
+    """
+    Returns: { 'HL': {'market_info': {...}, ...}, ... } 또는 None (없음/버전 불일치/만료/손상)
+    """
+    if not path or not os.path.exists(path): return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        log.warning(f"⚠️ [스냅샷] 읽기 실패 ({path}): {e}")
+        return None
+    if data.get('version') != SNAPSHOT_VERSION:
+        log.info(f"ℹ️ [스냅샷] 버전 불일치 (파일 {data.get('version')} / 현재 {SNAPSHOT_VERSION}) → 무시")
+        return None
+    age = time.time() - data.get('saved_at', 0)
+    if max_age_sec and age > max_age_sec:
+        log.info(f"ℹ️ [스냅샷] 만료됨 ({age / 3600:.1f}h 경과) → 무시")
+        return None
+    return data.get('exchanges') or None
+
+def save_snapshot(path: str, exchanges_meta: dict):
+    """임시 파일에 쓴 뒤 os.replace 로 교체 (중간에 종료되어도 이전 파일 유지)"""
+    if not path: return
+    payload = {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'exchanges': exchanges_meta}
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception as e:
+        log.warning(f"⚠️ [스냅샷] 저장 실패 ({path}): {e}")
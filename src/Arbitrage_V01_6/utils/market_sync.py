@@ -1,33 +1,109 @@
 # utils/market_sync.py
-import math
+import asyncio
 import logging
+import time
 import settings
+from utils.market_snapshot import load_snapshot, save_snapshot
+from utils.symbol_registry import get_registry
+from utils.config_service import get_config
+from utils.lot_math import lot_from_precision
 
 log = logging.getLogger("MarketSync")
 
 class MarketSynchronizer:
     def __init__(self, exchanges: dict):
         self.exchanges = exchanges
+        self.registry = get_registry()
         # common_info: { 'BTC': {'min_qty': 0.001, 'qty_prec': 3, 'max_lev': 50}, ... }
         self.common_info = {} 
+        # 공통 기준의 정수 로트 (티커 -> LotSpec, common_info 와 함께 교체)
+        self.lots = {}
+        # 예열 단계별 소요 시간 (ms) / 현재 기준의 출처 ('snapshot' → 'live')
+        self.phase_timings = {}
+        self.source = 'none'
+        self._revalidate_task = None
 
     async def warm_up(self):
         """
         [예열] 모든 거래소의 마켓 정보를 수집하고, 교집합 티커에 대해
         가장 보수적인(큰 최소수량, 낮은 정밀도, 낮은 레버리지) 기준을 수립합니다.
+
+        디스크 스냅샷이 유효하면 스냅샷으로 즉시 기준을 세우고, 실시간 로드는 백그라운드에서 재검증합니다.
+        스냅샷이 없으면 모든 거래소를 동시에 로드한 뒤 반환합니다.
         """
         log.info("🔥 [초기화] 시장 데이터 동기화 및 예열 시작...")
-        
-        # 1. 모든 거래소 마켓 로드
-        for name, ex in self.exchanges.items():
+        t0 = time.perf_counter()
+        cfg = getattr(settings, 'MARKET_SNAPSHOT_CONFIG', {})
+
+        snapshot = None
+        if cfg.get('ENABLED', True):
+            snapshot = load_snapshot(cfg.get('PATH'), cfg.get('MAX_AGE_SEC'))
+            self.phase_timings['snapshot_load_ms'] = (time.perf_counter() - t0) * 1000
+
+        if snapshot:
+            restored = 0
+            for name, ex in self.exchanges.items():
+                if name in snapshot:
+                    ex.restore_metadata(snapshot[name])
+                    restored += 1
+            self.build_common_info()
+            self.source = 'snapshot'
+            log.info(f"💾 [스냅샷] {restored}개 거래소 메타데이터 복원 → 즉시 시작 (실시간 재검증은 백그라운드)")
+            self._revalidate_task = asyncio.create_task(self._load_live(cfg))
+        else:
+            await self._load_live(cfg)
+
+        self.phase_timings['warm_up_ms'] = (time.perf_counter() - t0) * 1000
+        log.info(f"⏱️ [예열] {self.phase_timings['warm_up_ms']:.0f}ms (source: {self.source})")
+
+    def after_revalidation(self, callback):
+        """백그라운드 실시간 재검증이 끝나면 callback() 호출 (스냅샷 없이 시작했다면 이미 끝난 상태라 호출하지 않음)"""
+        if self._revalidate_task and not self._revalidate_task.done():
+            self._revalidate_task.add_done_callback(lambda _: callback())
+
+    async def _load_one(self, name, ex):
+        t0 = time.perf_counter()
+        try:
             await ex.load_markets()
-            
-        # 2. 검사할 전체 티커 목록 생성
-        all_tickers = set(settings.TARGET_PAIRS_CONFIG.keys())
+        except Exception as e:
+            log.error(f"❌ [동기화] {name} 마켓 로드 실패: {e}")
+        self.phase_timings[f'load_{name}_ms'] = (time.perf_counter() - t0) * 1000
+
+    async def _load_live(self, cfg):
+        """모든 거래소 load_markets 를 동시에 실행 → 기준 재수립 → 스냅샷 저장"""
+        t0 = time.perf_counter()
+        await asyncio.gather(*(self._load_one(name, ex) for name, ex in self.exchanges.items()))
+        self.phase_timings['live_load_ms'] = (time.perf_counter() - t0) * 1000
+
+        before = dict(self.common_info)
+        self.build_common_info()
+        if self.source == 'snapshot':
+            changed = [t for t, info in self.common_info.items() if before.get(t) != info]
+            if changed: log.warning(f"⚠️ [재검증] 스냅샷과 다른 티커 {len(changed)}개 갱신: {changed[:10]}")
+            else: log.info("✅ [재검증] 스냅샷과 실시간 마켓 정보 일치")
+        self.source = 'live'
+
+        ready = [name for name, ex in self.exchanges.items() if ex.markets_ready]
+        if cfg.get('ENABLED', True) and ready:
+            # 실시간 로드에 성공한 거래소만 갱신 (실패한 거래소는 기존 스냅샷 값 유지)
+            meta = load_snapshot(cfg.get('PATH')) or {}
+            for name in ready: meta[name] = self.exchanges[name].export_metadata()
+            save_snapshot(cfg.get('PATH'), meta)
+        log.info(f"⏱️ [실시간 로드] {self.phase_timings['live_load_ms']:.0f}ms | " +
+                 ", ".join(f"{n}:{self.phase_timings.get(f'load_{n}_ms', 0):.0f}ms" for n in self.exchanges))
+
+    def build_common_info(self):
+        """거래소 market_info 로 공통 기준(common_info / lots)을 다시 세웁니다. (예열, 재검증, 설정 변경으로 티커 추가 시)"""
+        # 0. 거래소별 로트 테이블 갱신 (validate_amount 가 주문마다 심볼을 파싱하지 않도록)
+        for name, ex in self.exchanges.items():
+            self.registry.compile_markets(name, ex.market_info)
+
+        # 1. 검사할 전체 티커 목록 생성
+        all_tickers = set(self.registry.tickers)
         for ex in self.exchanges.values():
             all_tickers.update(ex.market_info.keys())
             
-        sync_count = 0
+        common_info = {}
         
         for ticker in all_tickers:
             min_qtys = []
@@ -37,7 +113,7 @@ class MarketSynchronizer:
             # 2개 이상 거래소에서 지원하는지 확인
             supported_exchanges = 0
             for name, ex in self.exchanges.items():
-                info = ex.market_info.get(ticker)
+                info = ex.get_market(ticker)
                 if info:
                     min_qtys.append(info.get('min_size', 0))
                     precs.append(info.get('qty_prec', 0))
@@ -52,14 +128,16 @@ class MarketSynchronizer:
             safe_prec = min(precs)
             safe_max_lev = min(max_levs) # 가장 낮은 거래소의 최대 레버리지를 기준
             
-            self.common_info[ticker] = {
+            common_info[ticker] = {
                 'min_qty': safe_min_qty,
                 'qty_prec': safe_prec,
                 'max_lev': safe_max_lev
             }
-            sync_count += 1
             
-        log.info(f"✅ [동기화] {sync_count}개 공통 티커 기준 수립 완료")
+        # 한 번에 교체 (조회 중인 코루틴이 반쯤 만들어진 기준을 보지 않도록)
+        self.lots = {t: lot_from_precision(i['qty_prec'], i['min_qty']) for t, i in common_info.items()}
+        self.common_info = common_info
+        log.info(f"✅ [동기화] {len(common_info)}개 공통 티커 기준 수립 완료")
 
     def calculate_smart_order_params(self, ticker: str, price: float):
         """
@@ -71,12 +149,26 @@ class MarketSynchronizer:
         """
         if ticker not in self.common_info or price <= 0:
             return 1, 0.0, 0.0
-            
+
+        effective_lev, final_pos_usd = self.position_budget(ticker)
+
+        # 4. 수량 계산 (정밀도 반영)
+        raw_qty = final_pos_usd / price
+
+        # 정밀도 처리 (정수 로트 단위 내림, 최소 수량 미만이면 0)
+        final_qty = self.lots[ticker].validate(raw_qty)
+        if final_qty <= 0:
+            return effective_lev, 0.0, 0.0
+
+        return effective_lev, final_qty, final_pos_usd
+
+    def position_budget(self, ticker: str):
+        """(유효 레버리지, 목표 포지션 $) - 가격과 무관한 부분 (할당기의 필요 증거금 계산에도 사용)"""
         sync_info = self.common_info[ticker]
-        
+
         # 1. 사용자 설정 가져오기 (settings.py)
         # 예: TRADE_SIZE_USD(목표 포지션) = 200, MAX_MARGIN_USD = 15, TARGET_LEV = 15
-        user_config = settings.TARGET_PAIRS_CONFIG.get(ticker, {})
+        user_config = get_config().current.pairs.get(ticker) or {}
         
         # 설정이 없으면 기본값 사용
         target_pos_usd = user_config.get('trade_size_fixed_usd', 45.0) 
@@ -94,22 +186,10 @@ class MarketSynchronizer:
         # 조건 B: 사용자가 원했던 목표 포지션
         # 최종 포지션 = 둘 중 작은 값
         final_pos_usd = min(target_pos_usd, limit_by_margin)
-        
-        # 4. 수량 계산 (정밀도 반영)
-        raw_qty = final_pos_usd / price
-        
-        prec = sync_info['qty_prec']
-        min_qty = sync_info['min_qty']
-        
-        if raw_qty < min_qty:
-            return effective_lev, 0.0, 0.0
+        return effective_lev, final_pos_usd
 
-        # 정밀도 처리 (Floor)
-        if prec <= 0:
-             step = 10 ** abs(prec)
-             final_qty = math.floor(raw_qty / step) * step
-        else:
-            factor = 10 ** prec
-            final_qty = math.floor(raw_qty * factor) / factor
-            
-        return effective_lev, final_qty, final_pos_usd
\ No newline at end of file
+    def required_margin(self, ticker: str) -> float:
+        """레그당 필요 증거금 ($, 버퍼 제외). 공통 마켓이 아니면 0"""
+        if ticker not in self.common_info: return 0.0
+        lev, pos_usd = self.position_budget(ticker)
+        return pos_usd / lev if lev > 0 else 0.0
\ No newline at end of file
@@ -0,0 +1,190 @@
+# utils/opportunity_book.py
+import heapq
+import logging
+import time
+
+try:
+    import settings
+except ImportError:
+    settings = None
+
+log = logging.getLogger("OpportunityBook")
+
+class IndexedMaxHeap:
+    """
+    [인덱스 힙] 키(티커)마다 점수 1개를 갖는 최대 힙. 키 -> 힙 위치 인덱스를 유지하여
+    갱신/삭제가 O(log n), 최댓값 O(1), 상위 K 개 O(K log K) 입니다.
+    """
+    __slots__ = ('_keys', '_scores', '_payloads', '_pos')
+
+    def __init__(self):
+        self._keys = []
+        self._scores = []
+        self._payloads = []
+        self._pos = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._pos
+
+    def _swap(self, i, j):
+        k, s, p = self._keys, self._scores, self._payloads
+        k[i], k[j] = k[j], k[i]
+        s[i], s[j] = s[j], s[i]
+        p[i], p[j] = p[j], p[i]
+        self._pos[k[i]] = i
+        self._pos[k[j]] = j
+
+    def _up(self, i):
+        s = self._scores
+        while i > 0:
+            parent = (i - 1) >> 1
+            if s[parent] >= s[i]: break
+            self._swap(i, parent)
+            i = parent
+
+    def _down(self, i):
+        s, n = self._scores, len(self._scores)
+        while True:
+            left = 2 * i + 1
+            if left >= n: break
+            child = left + 1 if left + 1 < n and s[left + 1] > s[left] else left
+            if s[i] >= s[child]: break
+            self._swap(i, child)
+            i = child
+
+    def update(self, key, score: float, payload=None):
+        i = self._pos.get(key)
+        if i is None:
+            self._keys.append(key); self._scores.append(score); self._payloads.append(payload)
+            self._pos[key] = len(self._keys) - 1
+            self._up(len(self._keys) - 1)
+            return
+        old = self._scores[i]
+        self._scores[i] = score
+        self._payloads[i] = payload
+        if score > old: self._up(i)
+        elif score < old: self._down(i)
+
+    def remove(self, key):
+        i = self._pos.pop(key, None)
+        if i is None: return
+        last = len(self._keys) - 1
+        if i != last:
+            self._swap(i, last)
+            self._pos.pop(key, None)
+        self._keys.pop(); self._scores.pop(); self._payloads.pop()
+        if i < last:
+            self._pos[self._keys[i]] = i
+            self._up(i); self._down(i)
+
+    def get(self, key):
+        i = self._pos.get(key)
+        return None if i is None else (self._scores[i], self._payloads[i])
+
+    def top(self, k: int):
+        """상위 k 개 [(점수, 키, payload), ...] 점수 내림차순 (힙 전체를 정렬하지 않음)"""
+        out = []
+        if not self._keys or k <= 0: return out
+        s = self._scores
+        frontier = [(-s[0], 0)]
+        while frontier and len(out) < k:
+            neg, i = heapq.heappop(frontier)
+            out.append((-neg, self._keys[i], self._payloads[i]))
+            for c in (2 * i + 1, 2 * i + 2):
+                if c < len(s): heapq.heappush(frontier, (-s[c], c))
+        return out
+
+class OpportunityBook:
+    """
+    [전역 기회 순위] 모든 티커의 "진입 임계값을 넘는 최선의 거래소 쌍" 을 기대 순수익(net edge) 기준 인덱스 힙에 유지합니다.
+    호가가 바뀐 티커만 다시 계산하고 (update), 할당기는 top(k) 로 전체 상위 기회를 O(K log K) 에 가져갑니다.
+    """
+    def __init__(self, venue_scorer):
+        self.scorer = venue_scorer
+        # 스프레드가 임계값을 넘어도 기대 순수익이 이 값 이하이면 순위에 올리지 않음
+        self.min_net_edge = venue_scorer.cfg.get('MIN_NET_EDGE_PCT', 0.0)
+        self.heap = IndexedMaxHeap()
+        self.stats = {'updates': 0, 'removals': 0}
+
+    def update(self, symbol, quotes: dict, entry_threshold: float):
+        """Returns: 갱신된 (net_edge, spread, long_ex, short_ex) 또는 None (임계값/최소 순수익 미달 → 순위에서 제거)"""
+        ranked = self.scorer.rank_pairs(quotes, min_spread_pct=entry_threshold,
+                                        min_net_edge_pct=self.min_net_edge) if len(quotes) >= 2 else None
+        if not ranked:
+            if symbol in self.heap:
+                self.heap.remove(symbol)
+                self.stats['removals'] += 1
+            return None
+        best = ranked[0]
+        self.heap.update(symbol, best[0], (best[1], best[2], best[3], time.time()))
+        self.stats['updates'] += 1
+        return best
+
+    def remove(self, symbol):
+        self.heap.remove(symbol)
+
+    def top(self, k: int):
+        """[(net_edge, symbol, spread, long_ex, short_ex, updated_at), ...]"""
+        return [(score, sym, *payload) for score, sym, payload in self.heap.top(k)]
+
+    def summary(self, k: int = 10):
+        return {sym: {'net_edge': round(edge, 4), 'spread': round(spread, 4), 'pair': f"{l}/{s}"}
+                for edge, sym, spread, l, s, _ in self.top(k)}
+
+class CapitalAllocator:
+    """
+    [증거금 할당] 순위가 높은 기회부터 거래소별 가용 증거금을 배정합니다 (탐욕적).
+    - 티커별 필요 증거금 = 목표 포지션 / 유효 레버리지 × 버퍼 (TARGET_PAIRS_CONFIG 의 trade_size / max_margin / leverage)
+    - 양쪽 거래소 모두 남은 증거금이 있어야 배정, 배정분은 같은 라운드의 다음 기회에서 차감
+    - 주문 진행 중 배정분(reservation)은 주문 완료 후 다음 잔고 스냅샷이 들어올 때까지 유지 (잔고 랙 대비)
+    """
+    def __init__(self, buffer: float = None):
+        cfg = getattr(settings, 'OPPORTUNITY_RANKING_CONFIG', {}) if settings else {}
+        self.buffer = buffer or cfg.get('MARGIN_BUFFER', 1.05)
+        self._reservations = {}   # symbol -> {'venues': (long, short), 'margin': float, 'released_at': None/ts}
+        self.stats = {'rounds': 0, 'allocated': 0, 'skipped_margin': 0}
+
+    def reserve(self, symbol, long_ex, short_ex, margin):
+        self._reservations[symbol] = {'venues': (long_ex, short_ex), 'margin': margin, 'released_at': None}
+
+    def release(self, symbol):
+        r = self._reservations.get(symbol)
+        if r is not None: r['released_at'] = time.time()
+
+    def reserved(self, balance_times: dict) -> dict:
+        """거래소별 아직 잔고에 반영되지 않은 배정 증거금 (잔고 스냅샷 시각 이후 해제된 것만 유지)"""
+        out = {}
+        for symbol, r in list(self._reservations.items()):
+            released = r['released_at']
+            if released is not None and all(balance_times.get(ex, 0.0) > released for ex in r['venues']):
+                del self._reservations[symbol]
+                continue
+            for ex in r['venues']: out[ex] = out.get(ex, 0.0) + r['margin']
+        return out
+
+    def allocate(self, candidates, available: dict, margin_for, max_count: int):
+        """
+        candidates: OpportunityBook.top() 결과 (순위순)
+        available: { ex: 가용 증거금 (예약분 차감 후) }
+        margin_for: symbol -> 필요 증거금 (0 이면 진입 불가)
+        Returns: [(symbol, long_ex, short_ex, spread, net_edge, margin), ...]
+        """
+        self.stats['rounds'] += 1
+        left = dict(available)
+        out = []
+        for net_edge, symbol, spread, long_ex, short_ex, _ in candidates:
+            if len(out) >= max_count: break
+            margin = margin_for(symbol)
+            if margin <= 0: continue
+            margin *= self.buffer
+            if left.get(long_ex, 0.0) < margin or left.get(short_ex, 0.0) < margin:
+                self.stats['skipped_margin'] += 1
+                continue
+            left[long_ex] -= margin
+            left[short_ex] -= margin
+            out.append((symbol, long_ex, short_ex, spread, net_edge, margin))
+        self.stats['allocated'] += len(out)
+        return out
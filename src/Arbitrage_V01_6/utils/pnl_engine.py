@@ -0,0 +1,173 @@
+# utils/pnl_engine.py
+import logging
+import time
+import settings
+from utils.venue_scorer import VENUE_FEE_KEYS
+
+log = logging.getLogger("PnLEngine")
+
+def _empty_agg():
+    return {'realized': 0.0, 'unrealized': 0.0, 'funding': 0.0, 'fees': 0.0, 'net': 0.0, 'volume': 0.0, 'fills': 0}
+
+def builder_fee_rates():
+    """
+    HL 빌더 수수료: 'f' 는 0.1bp 단위 (f=25 → 2.5bp = 0.025% → 0.00025)
+    """
+    cfg = getattr(settings, 'BASED_APP_CONFIG', {})
+    if not cfg.get('ENABLED', False): return {}
+    return {'HL': cfg.get('BUILDER_FEE', 0) / 100000}
+
+class LegState:
+    """한 거래소 레그의 순포지션 (부호 있는 수량, 평균 진입가)"""
+    __slots__ = ('qty', 'avg_price', 'mark', 'unrealized', 'funding')
+
+    def __init__(self):
+        self.qty = 0.0
+        self.avg_price = 0.0
+        self.mark = 0.0
+        self.unrealized = 0.0
+        self.funding = 0.0  # 거래소가 마지막으로 보고한 누적 펀딩
+
+class PositionPnL:
+    __slots__ = ('pos_id', 'symbol', 'pair', 'preset', 'legs', 'agg', 'opened', 'closed')
+
+    def __init__(self, pos_id, symbol, pair, preset):
+        self.pos_id = pos_id
+        self.symbol = symbol
+        self.pair = pair
+        self.preset = preset
+        self.legs = {}
+        self.agg = _empty_agg()
+        self.opened = time.time()
+        self.closed = None
+
+class PnLEngine:
+    """
+    [증분 손익 엔진] 체결 1건마다 O(1) 로 포지션/심볼/거래소 쌍/전략 프리셋 손익을 갱신합니다.
+
+    - 수수료: settings.SIMULATION_CONFIG['FEES'] (거래소별 taker) + HL 빌더 수수료
+    - 실현 손익: 반대 방향 체결로 줄어든 수량 × (체결가 - 평균 진입가)
+    - 미실현 손익: mark() 로 들어온 현재가 기준, 변동분(delta)만 집계에 반영
+    - 펀딩: on_funding() 으로 들어온 금액 (+: 수령, -: 지불)
+      또는 on_funding_total() 로 들어온 레그별 누적 펀딩 (잔고 스냅샷의 포지션 값) 의 변동분
+    """
+    def __init__(self, fee_rates: dict = None):
+        fees = settings.SIMULATION_CONFIG.get('FEES', {})
+        self.fee_rates = {ex: fees.get(key, 0.0) for ex, key in VENUE_FEE_KEYS.items()}
+        for ex, rate in builder_fee_rates().items():
+            self.fee_rates[ex] = self.fee_rates.get(ex, 0.0) + rate
+        if fee_rates: self.fee_rates.update(fee_rates)
+        self.positions = {}
+        self.aggregates = {}  # ('symbol'|'pair'|'preset', key) -> agg
+
+    def _targets(self, p: PositionPnL):
+        return (p.agg,
+                self._agg('symbol', p.symbol), self._agg('pair', p.pair),
+                self._agg('preset', p.preset), self._agg('total', 'all'))
+
+    def _agg(self, kind, key):
+        k = (kind, key)
+        agg = self.aggregates.get(k)
+        if agg is None: agg = self.aggregates[k] = _empty_agg()
+        return agg
+
+    def _apply(self, p, field, delta):
+        for agg in self._targets(p):
+            agg[field] += delta
+            if field != 'volume' and field != 'fills':
+                agg['net'] += -delta if field == 'fees' else delta
+
+    def open(self, pos_id, symbol, long_ex, short_ex, preset=None):
+        p = self.positions.get(pos_id)
+        if p is None:
+            p = self.positions[pos_id] = PositionPnL(pos_id, symbol, f"{long_ex}/{short_ex}", preset or '-')
+        return p
+
+    def on_fill(self, pos_id, ex_name, side, qty, price, fee_rate=None):
+        """
+        side: 'BUY' / 'SELL', qty > 0
+        Returns: (realized_delta, fee)
+        """
+        p = self.positions.get(pos_id)
+        if p is None or qty <= 0 or price <= 0: return 0.0, 0.0
+        leg = p.legs.get(ex_name)
+        if leg is None: leg = p.legs[ex_name] = LegState()
+
+        signed = qty if side.upper() == 'BUY' else -qty
+        realized = 0.0
+        if leg.qty == 0 or (leg.qty > 0) == (signed > 0):
+            # 같은 방향 → 평균가 갱신
+            new_qty = leg.qty + signed
+            leg.avg_price = (leg.avg_price * abs(leg.qty) + price * qty) / abs(new_qty)
+            leg.qty = new_qty
+        else:
+            # 반대 방향 → 줄어든 만큼 실현
+            closing = min(abs(signed), abs(leg.qty))
+            direction = 1.0 if leg.qty > 0 else -1.0
+            realized = closing * (price - leg.avg_price) * direction
+            rest = abs(signed) - closing
+            leg.qty += signed
+            if abs(leg.qty) < 1e-12:
+                leg.qty = 0.0; leg.avg_price = 0.0
+            elif rest > 0:
+                leg.avg_price = price  # 방향이 뒤집힌 경우 남은 수량은 새 진입
+
+        fee = qty * price * (self.fee_rates.get(ex_name, 0.0) if fee_rate is None else fee_rate)
+        if realized: self._apply(p, 'realized', realized)
+        self._apply(p, 'fees', fee)
+        self._apply(p, 'volume', qty * price)
+        self._apply(p, 'fills', 1)
+        self._remark(p, leg, leg.mark or price)
+        return realized, fee
+
+    def _remark(self, p, leg, mark):
+        leg.mark = mark
+        new_u = leg.qty * (mark - leg.avg_price) if leg.qty else 0.0
+        delta = new_u - leg.unrealized
+        leg.unrealized = new_u
+        if delta: self._apply(p, 'unrealized', delta)
+
+    def mark(self, pos_id, ex_name, price):
+        """현재가 반영 → 미실현 손익 변동분만 집계"""
+        p = self.positions.get(pos_id)
+        if p is None or price <= 0: return
+        leg = p.legs.get(ex_name)
+        if leg is not None: self._remark(p, leg, price)
+
+    def on_funding(self, pos_id, amount):
+        p = self.positions.get(pos_id)
+        if p is not None and amount: self._apply(p, 'funding', amount)
+
+    def on_funding_total(self, pos_id, ex_name, total):
+        """레그의 누적 펀딩 (포지션 오픈 이후, +: 수령) → 직전 보고값 대비 변동분만 집계. Returns: 반영한 변동분"""
+        p = self.positions.get(pos_id)
+        leg = p.legs.get(ex_name) if p is not None else None
+        if leg is None or total is None: return 0.0
+        delta = total - leg.funding
+        leg.funding = total
+        if delta: self._apply(p, 'funding', delta)
+        return delta
+
+    def close(self, pos_id):
+        """포지션 종료: 집계는 유지하고 실시간 목록에서 제거. Returns: 포지션 손익 dict"""
+        p = self.positions.pop(pos_id, None)
+        if p is None: return None
+        p.closed = time.time()
+        for ex_name, leg in p.legs.items():
+            if leg.qty:
+                log.warning(f"⚠️ [PnL] {p.symbol} {ex_name} 잔여 수량 {leg.qty:+} 남은 채 종료 (미실현 손익 제외)")
+            if leg.unrealized:
+                self._apply(p, 'unrealized', -leg.unrealized)
+                leg.unrealized = 0.0
+        return dict(p.agg)
+
+    def position_pnl(self, pos_id):
+        p = self.positions.get(pos_id)
+        return dict(p.agg) if p else None
+
+    def summary(self):
+        """GUI 조회용: { 'total:all': {...}, 'symbol:BTC': {...}, 'pair:HL/GRVT': {...}, 'preset:major': {...}, 'pos:<id>': {...} }"""
+        out = {f"{kind}:{key}": dict(agg) for (kind, key), agg in self.aggregates.items()}
+        for pos_id, p in self.positions.items():
+            out[f"pos:{pos_id}"] = dict(p.agg)
+        return out
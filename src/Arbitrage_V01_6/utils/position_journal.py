@@ -0,0 +1,218 @@
+# utils/position_journal.py
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import settings
+except ImportError:
+    settings = None
+
+log = logging.getLogger("PositionJournal")
+
+class PositionJournal:
+    """
+    [포지션 저널] 진입/체결/청산 이벤트를 JSON Lines 파일에 추가만 합니다 (크래시 후 복구용).
+
+    - record 는 큐에 넣기만 하므로 이벤트 루프를 막지 않습니다.
+    - 백그라운드 writer 가 FSYNC_INTERVAL_SEC 또는 BATCH_SIZE 단위로 모아 write + fsync 1회 (전용 스레드)
+    - 기동 시 replay() 로 열린 포지션을 복원하고, compact() 로 열린 포지션만 남긴 파일로 교체합니다.
+
+    이벤트 (한 줄 = 한 이벤트):
+      {"ev": "fill",  "symbol", "ex", "side", "qty", "price", "phase": "entry"/"exit", "ts"}
+      {"ev": "open",  "symbol", "pos": {qty, long_qty, short_qty, long, short, time, entry_spread, long_px, short_px, pnl_id}, "ts"}
+      {"ev": "update","symbol", "fields": {...}, "ts"}
+      {"ev": "close", "symbol", "reason", "pnl", "ts"}
+    """
+    def __init__(self, path: str = None, fsync_interval: float = None, batch_size: int = None):
+        cfg = getattr(settings, 'POSITION_JOURNAL_CONFIG', {}) if settings else {}
+        self.path = path or cfg.get('PATH') or 'position_journal.jsonl'
+        self.fsync_interval = fsync_interval if fsync_interval is not None else cfg.get('FSYNC_INTERVAL_SEC', 0.2)
+        self.batch_size = batch_size or cfg.get('BATCH_SIZE', 100)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pos_journal")
+        self._fh = None
+        self._queue = None
+        self._writer = None
+        self._closed = False
+        self.stats = {'records': 0, 'fsyncs': 0, 'errors': 0, 'replayed': 0, 'last_fsync_ms': 0.0}
+
+    # ------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------
+    def _ensure_writer(self):
+        if self._writer is not None: return True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run_writer())
+        return True
+
+    def _append(self, event: dict):
+        if self._closed: return
+        event['ts'] = time.time()
+        line = json.dumps(event, default=str)
+        if self._ensure_writer():
+            self._queue.put_nowait(line)
+        else:
+            # 이벤트 루프 밖 (CLI/테스트) → 즉시 기록
+            self._write_batch([line])
+
+    def record_fill(self, symbol, ex_name, side, qty, price, phase='entry'):
+        if qty > 0:
+            self._append({'ev': 'fill', 'symbol': symbol, 'ex': ex_name, 'side': side, 'qty': qty, 'price': price, 'phase': phase})
+
+    def record_open(self, symbol, pos: dict):
+        self._append({'ev': 'open', 'symbol': symbol, 'pos': {k: v for k, v in pos.items() if k != 'current_spread'}})
+
+    def record_close(self, symbol, reason='exit', pnl=None):
+        self._append({'ev': 'close', 'symbol': symbol, 'reason': reason, 'pnl': pnl})
+
+    def _write_batch(self, lines):
+        t0 = time.perf_counter()
+        try:
+            if self._fh is None: self._fh = open(self.path, 'a', encoding='utf-8')
+            self._fh.write("\n".join(lines) + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self.stats['records'] += len(lines)
+            self.stats['fsyncs'] += 1
+            self.stats['last_fsync_ms'] = (time.perf_counter() - t0) * 1000
+        except Exception as e:
+            self.stats['errors'] += 1
+            log.error(f"❌ [저널] 기록 실패 ({len(lines)}건): {e}")
+
+    async def _run_writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None: break
+            batch = [item]
+            deadline = loop.time() + self.fsync_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0: break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            await loop.run_in_executor(self._executor, self._write_batch, batch)
+            if stop: break
+
+    async def close(self):
+        """남은 이벤트를 모두 fsync 하고 종료합니다."""
+        if self._closed: return
+        self._closed = True
+        if self._writer is not None:
+            self._queue.put_nowait(None)
+            try: await self._writer
+            except Exception as e: log.error(f"❌ [저널] writer 종료 에러: {e}")
+        loop = asyncio.get_running_loop()
+        if self._fh is not None: await loop.run_in_executor(self._executor, self._fh.close)
+        self._executor.shutdown(wait=True)
+        log.info(f"📓 [저널] 종료 ({self.stats['records']}건 / fsync {self.stats['fsyncs']}회)")
+
+    # ------------------------------------------------------------
+    # 복구
+    # ------------------------------------------------------------
+    def replay(self):
+        """
+        저널을 처음부터 재생하여 (열린 포지션, 포지션 없는 진입 체결) 을 반환합니다.
+        - 열린 포지션: { symbol: pos dict }
+        - 고아 체결: { symbol: [fill, ...] } (진입 체결 후 'open' 기록 전에 종료된 경우 → 거래소 대조 필요)
+        마지막 줄이 잘린 경우 (fsync 전 크래시) 해당 줄만 건너뜁니다.
+        """
+        positions, pending = {}, {}
+        if not os.path.exists(self.path): return positions, pending
+        bad = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip(): continue
+                try: ev = json.loads(line)
+                except ValueError:
+                    bad += 1; continue
+                symbol, kind = ev.get('symbol'), ev.get('ev')
+                if kind == 'fill':
+                    if ev.get('phase') == 'entry' and symbol not in positions:
+                        pending.setdefault(symbol, []).append(ev)
+                elif kind == 'open':
+                    positions[symbol] = ev['pos']
+                    pending.pop(symbol, None)
+                elif kind == 'close':
+                    positions.pop(symbol, None)
+                    pending.pop(symbol, None)
+        if bad: log.warning(f"⚠️ [저널] 손상된 줄 {bad}개 건너뜀")
+        self.stats['replayed'] = len(positions)
+        return positions, pending
+
+    def compact(self, positions: dict, pending: dict = None):
+        """열린 포지션 (+ 미확인 진입 체결) 만 남긴 새 파일로 원자적 교체 (기동 시 1회, writer 시작 전)"""
+        tmp = f"{self.path}.tmp"
+        now = time.time()
+        lines = [json.dumps({'ev': 'fill', **{k: v for k, v in f.items() if k != 'ev'}}, default=str)
+                 for fills in (pending or {}).values() for f in fills]
+        lines += [json.dumps({'ev': 'open', 'symbol': s, 'pos': p, 'ts': now}, default=str) for s, p in positions.items()]
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                if lines: f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except Exception as e:
+            log.warning(f"⚠️ [저널] 압축 실패 (기존 파일 유지): {e}")
+
+def reconcile(positions: dict, balances: dict, registry, tolerance: float = 0.05):
+    """
+    [거래소 대조] 저널의 열린 포지션을 거래소 실제 포지션 (get_balance()['positions']) 과 비교합니다.
+    balances = { ex_name: get_balance() 결과 또는 None (조회 실패) } - positions_ok 가 False 인 거래소도 조회 실패로 취급
+
+    Returns: { symbol: (status, long_qty, short_qty) }
+      - 'ok'        : 양쪽 레그 확인 (수량은 거래소 값과 저널 값 중 작은 쪽)
+      - 'unverified': 한쪽 이상 거래소 조회 실패 → 저널 값으로 감시 재개
+      - 'one_leg'   : 한쪽 레그만 남음 (남은 쪽만 청산 대상)
+      - 'gone'      : 양쪽 모두 없음 (외부에서 청산됨)
+    """
+    # 거래소별 { (티커, 방향): 수량 }
+    held = {}
+    for ex_name, bal in balances.items():
+        # 포지션 조회까지 성공한 거래소만 대조 (잔고만 받고 포지션 조회가 실패한 경우 빈 목록을 '청산됨' 으로 오인하지 않도록)
+        if not bal or not bal.get('positions_ok', True): continue
+        book = held[ex_name] = {}
+        for p in bal.get('positions', []):
+            sym = str(p.get('symbol', ''))
+            ticker = registry.ticker(ex_name, sym) or registry.ticker(ex_name, sym.upper()) or sym
+            side = str(p.get('side', '')).upper()
+            side = 'LONG' if side in ('LONG', 'BUY', 'BID') else 'SHORT'
+            book[(ticker, side)] = book.get((ticker, side), 0.0) + float(p.get('size') or 0)
+
+    def leg_qty(ex_name, symbol, side, journal_qty):
+        book = held.get(ex_name)
+        if book is None: return None
+        qty = book.get((symbol, side), 0.0)
+        if qty <= journal_qty * tolerance: return 0.0
+        return min(qty, journal_qty)
+
+    out = {}
+    for symbol, pos in positions.items():
+        long_j = pos.get('long_qty', pos['qty'])
+        short_j = pos.get('short_qty', pos['qty'])
+        long_q = leg_qty(pos['long'], symbol, 'LONG', long_j)
+        short_q = leg_qty(pos['short'], symbol, 'SHORT', short_j)
+        if long_q is None or short_q is None:
+            out[symbol] = ('unverified', long_j if long_q is None else long_q, short_j if short_q is None else short_q)
+        elif long_q and short_q:
+            out[symbol] = ('ok', long_q, short_q)
+        elif long_q or short_q:
+            out[symbol] = ('one_leg', long_q, short_q)
+        else:
+            out[symbol] = ('gone', 0.0, 0.0)
+    return out
@@ -0,0 +1,149 @@
+# utils/rate_limiter.py
+# GRVT_Lighter_Bot/exchanges/rate_limiter.py 와 같은 구현입니다. 두 봇은 따로 배포/실행되는 프로젝트라
+# (설정 모듈과 import 방식이 다름) 공유 패키지가 없으므로, 수정할 때는 양쪽을 함께 맞춰 주세요.
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+try:
+    import settings
+except ImportError:
+    settings = None
+
+log = logging.getLogger("RateLimiter")
+
+# 우선순위 레인 (숫자가 작을수록 먼저 처리)
+ORDER, CANCEL, ACCOUNT, METADATA = 0, 1, 2, 3
+LANE_NAMES = {ORDER: 'order', CANCEL: 'cancel', ACCOUNT: 'account', METADATA: 'metadata'}
+
+class RateLimiter:
+    """
+    [거래소별 토큰 버킷] 초당 RATE_PER_SEC 만큼 토큰이 차고, 최대 BURST 개까지 쌓입니다.
+
+    - 요청은 레인별 우선순위(주문 > 취소 > 계정 조회 > 메타데이터) 순으로 토큰을 받습니다.
+    - 하위 레인은 RESERVE 비율만큼의 토큰을 남겨두고만 사용할 수 있어서,
+      대시보드 갱신이나 잔고 조회가 주문 직전에 한도를 다 써버리지 못합니다.
+    - 대기열은 (레인, 순번) 힙이며, 토큰이 찰 시점에 loop.call_later 로 한 번만 깨웁니다.
+    """
+    def __init__(self, name: str, rate_per_sec: float, burst: float, reserve: dict = None):
+        self.name = name
+        self.rate = max(float(rate_per_sec), 1e-6)
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        reserve = reserve or {}
+        self.reserve = {lane: reserve.get(LANE_NAMES[lane], 0.0) * self.capacity for lane in LANE_NAMES}
+        self._waiters = []  # (lane, seq, cost, future, enqueued_at)
+        self._seq = itertools.count()
+        self._timer = None
+        self.metrics = {
+            lane: {'requests': 0, 'queued': 0, 'total_wait_sec': 0.0, 'max_wait_sec': 0.0, 'depth': 0, 'max_depth': 0}
+            for lane in LANE_NAMES
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _can_take(self, lane, cost):
+        return self.tokens - cost >= self.reserve[lane] - 1e-9
+
+    async def acquire(self, lane: int = METADATA, cost: float = 1.0) -> float:
+        """토큰을 받을 때까지 대기합니다. Returns: 대기 시간(초)"""
+        # 버킷 크기를 넘는 비용은 영원히 대기하므로 상한을 둡니다
+        cost = min(float(cost), max(self.capacity - self.reserve[lane], 1.0))
+        m = self.metrics[lane]
+        m['requests'] += 1
+        self._refill()
+        # 같거나 더 높은 우선순위의 대기자가 없을 때만 새치기 없이 바로 통과
+        if (not self._waiters or self._waiters[0][0] > lane) and self._can_take(lane, cost):
+            self.tokens -= cost
+            return 0.0
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._seq), cost, fut, time.monotonic()))
+        m['queued'] += 1
+        m['depth'] += 1
+        m['max_depth'] = max(m['max_depth'], m['depth'])
+        self._schedule()
+        try:
+            return await fut
+        finally:
+            if fut.cancelled(): m['depth'] -= 1
+
+    def _schedule(self):
+        if self._timer is not None or not self._waiters: return
+        lane, _, cost, _, _ = self._waiters[0]
+        deficit = cost + self.reserve[lane] - self.tokens
+        delay = max(deficit / self.rate, 0.001)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._drain)
+
+    def _drain(self):
+        self._timer = None
+        self._refill()
+        now = time.monotonic()
+        while self._waiters:
+            lane, _, cost, fut, enqueued_at = self._waiters[0]
+            if fut.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_take(lane, cost): break
+            heapq.heappop(self._waiters)
+            self.tokens -= cost
+            waited = now - enqueued_at
+            m = self.metrics[lane]
+            m['depth'] -= 1
+            m['total_wait_sec'] += waited
+            m['max_wait_sec'] = max(m['max_wait_sec'], waited)
+            if waited > 1.0:
+                log.warning(f"🐢 [{self.name}] {LANE_NAMES[lane]} 요청 {waited:.2f}s 대기 (Rate Limit)")
+            fut.set_result(waited)
+        self._schedule()
+
+    async def call(self, lane: int, fn, *args, cost: float = 1.0, **kwargs):
+        """토큰을 받은 뒤 fn(*args, **kwargs) 실행 (코루틴이면 await)"""
+        await self.acquire(lane, cost)
+        res = fn(*args, **kwargs)
+        if asyncio.iscoroutine(res) or isinstance(res, asyncio.Future):
+            res = await res
+        return res
+
+    def summary(self):
+        out = {}
+        for lane, m in self.metrics.items():
+            if not m['requests']: continue
+            avg_ms = m['total_wait_sec'] / m['queued'] * 1000 if m['queued'] else 0.0
+            out[LANE_NAMES[lane]] = {
+                'requests': m['requests'], 'queued': m['queued'], 'depth': m['depth'],
+                'max_depth': m['max_depth'], 'avg_wait_ms': round(avg_ms, 1),
+                'max_wait_ms': round(m['max_wait_sec'] * 1000, 1)
+            }
+        return out
+
+# 거래소 약어별 공유 인스턴스 (봇/대시보드/잔고 조회가 같은 버킷을 사용)
+_LIMITERS = {}
+
+def get_limiter(ex_name: str) -> RateLimiter:
+    limiter = _LIMITERS.get(ex_name)
+    if limiter is None:
+        limits = getattr(settings, 'RATE_LIMITS', {}) if settings else {}
+        cfg = limits.get(ex_name, {})
+        default = limits.get('DEFAULT', {})
+        limiter = _LIMITERS[ex_name] = RateLimiter(
+            ex_name,
+            cfg.get('RATE_PER_SEC', default.get('RATE_PER_SEC', 5.0)),
+            cfg.get('BURST', default.get('BURST', 10.0)),
+            cfg.get('RESERVE', default.get('RESERVE'))
+        )
+    return limiter
+
+def rate_limit_summary():
+    """Returns: { 'HL/order': {...}, 'GRVT/account': {...}, ... }"""
+    out = {}
+    for ex_name, limiter in _LIMITERS.items():
+        for lane_name, m in limiter.summary().items():
+            out[f"{ex_name}/{lane_name}"] = m
+    return out
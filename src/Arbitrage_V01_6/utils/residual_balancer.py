@@ -0,0 +1,115 @@
+# utils/residual_balancer.py
+import logging
+import time
+
+log = logging.getLogger("ResidualBalancer")
+
+class ResidualBalancer:
+    """
+    [잔여 델타 정리] IOC/시장가 양방향 주문의 체결 수량이 서로 다를 때,
+    부족한 쪽을 즉시 추가 주문(Top-up)하고, 그래도 남으면 많은 쪽을 줄여(Trim) 헤지 수량을 맞춥니다.
+
+    metrics[symbol] = {
+        'residual_qty': 현재 미헤지 수량 (+: 롱 과다, -: 숏 과다),
+        'residual_usd': 현재 미헤지 금액, 'open_since': 발생 시각 (없으면 None),
+        'events': 누적 발생 횟수, 'total_duration_sec': 누적 미헤지 시간, 'max_duration_sec': 최장 미헤지 시간
+    }
+    """
+    def __init__(self, exchanges: dict, market_sync):
+        self.exchanges = exchanges
+        self.market_sync = market_sync
+        self.metrics = {}
+
+    def _min_qty(self, symbol):
+        info = self.market_sync.common_info.get(symbol, {}) if self.market_sync else {}
+        return info.get('min_qty', 0.0) or 0.0
+
+    def _metric(self, symbol):
+        m = self.metrics.get(symbol)
+        if m is None:
+            m = self.metrics[symbol] = {
+                'residual_qty': 0.0, 'residual_usd': 0.0, 'open_since': None,
+                'events': 0, 'total_duration_sec': 0.0, 'max_duration_sec': 0.0
+            }
+        return m
+
+    def _open(self, symbol, residual, price):
+        m = self._metric(symbol)
+        m['residual_qty'] = residual
+        m['residual_usd'] = abs(residual) * price
+        if m['open_since'] is None:
+            m['open_since'] = time.time()
+            m['events'] += 1
+
+    def _close(self, symbol, residual=0.0, price=0.0):
+        m = self._metric(symbol)
+        m['residual_qty'] = residual
+        m['residual_usd'] = abs(residual) * price
+        if m['open_since'] is not None and residual == 0.0:
+            dur = time.time() - m['open_since']
+            m['total_duration_sec'] += dur
+            m['max_duration_sec'] = max(m['max_duration_sec'], dur)
+            m['open_since'] = None
+
+    async def reconcile(self, symbol, long_ex_name, long_qty, short_ex_name, short_qty, long_price, short_price):
+        """
+        Returns: (hedged_qty, long_qty, short_qty) - 정리 후 실제 각 레그 보유 수량
+        """
+        residual = long_qty - short_qty
+        min_qty = self._min_qty(symbol)
+        if abs(residual) < max(min_qty, 1e-12):
+            self._close(symbol)
+            return min(long_qty, short_qty), long_qty, short_qty
+
+        ref_price = long_price or short_price
+        self._open(symbol, residual, ref_price)
+        log.warning(f"⚖️ [잔여 델타] {symbol} Long:{long_qty} / Short:{short_qty} (차이 {residual:+})")
+
+        long_ex = self.exchanges[long_ex_name]
+        short_ex = self.exchanges[short_ex_name]
+
+        # 1. Top-up: 부족한 쪽 추가 주문
+        if residual > 0:
+            ex, side, price = short_ex, 'SELL', short_price
+        else:
+            ex, side, price = long_ex, 'BUY', long_price
+        try:
+            res = await ex.place_market_order(symbol, side, abs(residual), price)
+            filled, _ = await ex.confirm_fill(res, abs(residual), price)
+        except Exception as e:
+            log.error(f"❌ [잔여 델타] {symbol} Top-up 실패: {e}")
+            filled = 0.0
+        if residual > 0: short_qty += filled
+        else: long_qty += filled
+
+        # 2. Trim: 그래도 남으면 많은 쪽을 reduce-only 로 축소
+        residual = long_qty - short_qty
+        if abs(residual) >= max(min_qty, 1e-12):
+            if residual > 0:
+                ex, side, price = long_ex, 'SELL', long_price
+            else:
+                ex, side, price = short_ex, 'BUY', short_price
+            try:
+                res = await ex.place_market_order(symbol, side, abs(residual), price, reduce_only=True)
+                trimmed, _ = await ex.confirm_fill(res, abs(residual), price)
+            except Exception as e:
+                log.error(f"❌ [잔여 델타] {symbol} Trim 실패: {e}")
+                trimmed = 0.0
+            if residual > 0: long_qty -= trimmed
+            else: short_qty -= trimmed
+            residual = long_qty - short_qty
+
+        if abs(residual) < max(min_qty, 1e-12):
+            self._close(symbol)
+            log.info(f"✅ [잔여 델타] {symbol} 정리 완료 → 헤지 수량 {min(long_qty, short_qty)}")
+        else:
+            self._close(symbol, residual, ref_price)
+            log.critical(f"🚨 [잔여 델타] {symbol} 미정리 잔량 {residual:+} 남음")
+        return min(long_qty, short_qty), long_qty, short_qty
+
+    def summary(self):
+        now = time.time()
+        out = {}
+        for sym, m in self.metrics.items():
+            out[sym] = {**m, 'open_duration_sec': (now - m['open_since']) if m['open_since'] else 0.0}
+        return out
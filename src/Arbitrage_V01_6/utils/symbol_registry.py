@@ -0,0 +1,182 @@
+# utils/symbol_registry.py
+import logging
+import sys
+from utils.lot_math import lot_from_step, lot_from_precision
+from utils.config_service import get_config
+
+log = logging.getLogger("SymbolRegistry")
+
+# 봇 거래소 약칭 -> TARGET_PAIRS_CONFIG[...]['symbols'] 키
+VENUE_SYMBOL_KEYS = {'HL': 'hyperliquid', 'GRVT': 'grvt', 'PAC': 'pacifica', 'EXT': 'extended', 'LTR': 'lighter'}
+
+def _base(native: str) -> str:
+    """거래소 심볼 -> market_info 키 ('KPEPE_USDT_Perp' -> 'KPEPE', 'ETH-USD' -> 'ETH')"""
+    return native.split('_')[0].split('-')[0]
+
+def _normalize(symbol: str) -> str:
+    """설정에 없는 심볼용 (기존 validate_amount 규칙: 접미사 제거, 'k' / '1000' 접두어 제거)"""
+    base = _base(symbol)
+    if base.startswith('k'): base = base[1:]
+    if base.startswith('1000'): base = base[4:]
+    return base
+
+def _aliases(native: str):
+    base = _base(native)
+    out = [native, native.upper(), base, base.upper()]
+    if base.startswith('k'): out += [base[1:], base[1:].upper()]
+    if base.startswith('1000'): out += [base[4:], base[4:].upper()]
+    return out
+
+class SymbolRegistry:
+    """
+    [심볼 레지스트리] TARGET_PAIRS_CONFIG 를 시작 시 한 번만 컴파일하여 모든 거래소 어댑터와 전략이 공유합니다.
+
+    - 티커마다 정수 ID (tickers[id] <-> ids[ticker]), 문자열은 intern 되어 dict 조회 시 포인터 비교로 끝납니다.
+    - 거래소별 양방향 맵: 봇 티커 <-> 네이티브 심볼 ('k' / '1000' 접두어, 대문자, '_USDT_Perp' / '-USD' 별칭 포함)
+    - Lighter 마켓 ID <-> 티커
+    - 거래소별 정수 로트(수량) / 틱(가격) 단위 LotSpec (compile_markets 로 갱신)
+    모든 조회는 dict 1~2회 (O(1)) 이며, 주문 경로에서 심볼 문자열을 다시 파싱하지 않습니다.
+    """
+    def __init__(self, pairs_config: dict):
+        self.tickers = []
+        self.ids = {}
+        self.market_ids = {}    # 티커 -> Lighter 마켓 ID
+        self.by_market_id = {}  # Lighter 마켓 ID -> 티커
+        self._native = {ex: {} for ex in VENUE_SYMBOL_KEYS}       # ex -> 티커 -> 네이티브 심볼
+        self._reverse = {ex: {} for ex in VENUE_SYMBOL_KEYS}      # ex -> 네이티브/별칭 -> 티커
+        self._market_keys = {ex: {} for ex in VENUE_SYMBOL_KEYS}  # ex -> 티커/심볼 -> market_info 키
+        self._lots = {ex: {} for ex in VENUE_SYMBOL_KEYS}         # ex -> market_info 키 -> LotSpec (수량)
+        self._ticks = {ex: {} for ex in VENUE_SYMBOL_KEYS}        # ex -> market_info 키 -> LotSpec (가격)
+
+        for ticker, cfg in pairs_config.items():
+            self._register(ticker, cfg)
+
+        # 별칭은 정식 심볼을 모두 등록한 뒤, 비어 있는 자리에만 추가 (다른 티커의 정식 심볼을 가리지 않도록)
+        for ex, natives in self._native.items():
+            for ticker, native in natives.items():
+                self._add_aliases(ex, ticker, native)
+
+        log.info(f"🗂️ [심볼] {len(self.tickers)}개 티커 컴파일 완료 (Lighter 마켓 {len(self.market_ids)}개)")
+
+    def _register(self, ticker, cfg):
+        """Returns: { ex: 네이티브 심볼 (LTR 은 마켓 ID) } (새로 등록된 것만)"""
+        ticker = sys.intern(ticker)
+        if ticker not in self.ids:
+            self.ids[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        added = {}
+        symbols = cfg.get('symbols', {})
+        for ex, key in VENUE_SYMBOL_KEYS.items():
+            native = symbols.get(key)
+            if native is None or native == "None": continue
+            if ex == 'LTR':
+                if isinstance(native, int) and self.market_ids.get(ticker) != native:
+                    self._bind_market_id(ticker, native)
+                    added[ex] = native
+                continue
+            native = sys.intern(native)
+            if self._native[ex].get(ticker) == native: continue
+            self._native[ex][ticker] = native
+            self._reverse[ex][native] = ticker
+            self._market_keys[ex][ticker] = sys.intern(_base(native))
+            added[ex] = native
+        return added
+
+    def _add_aliases(self, ex, ticker, native):
+        rev = self._reverse[ex]
+        for alias in _aliases(native): rev.setdefault(alias, ticker)
+
+    def add_ticker(self, ticker: str, cfg: dict) -> dict:
+        """
+        [증분 등록] 실행 중 추가된 티커 (설정 핫 리로드). 기존 티커의 ID/맵은 그대로 유지됩니다.
+        Returns: { ex: 네이티브 심볼 / 마켓 ID } → 해당 거래소만 구독 추가
+        """
+        added = self._register(ticker, cfg)
+        for ex, native in added.items():
+            if ex != 'LTR': self._add_aliases(ex, sys.intern(ticker), native)
+        return added
+
+    def _bind_market_id(self, ticker, market_id):
+        self.market_ids[ticker] = market_id
+        self.by_market_id[market_id] = ticker
+        self._market_keys['LTR'][ticker] = ticker
+
+    # ------------------------------------------------------------
+    # 조회 (O(1))
+    # ------------------------------------------------------------
+    def native(self, ex: str, ticker: str, default=None):
+        """봇 티커 -> 거래소 네이티브 심볼 (예: HL '1000PEPE' -> 'kPEPE')"""
+        return self._native[ex].get(ticker, default)
+
+    def ticker(self, ex: str, native: str, default=None):
+        """거래소 네이티브 심볼 (또는 별칭) -> 봇 티커"""
+        return self._reverse[ex].get(native, default)
+
+    def natives(self, ex: str) -> dict:
+        """{ 네이티브 심볼: 티커 } (WS 구독 목록용, 설정 순서 유지)"""
+        return {native: ticker for ticker, native in self._native[ex].items()}
+
+    def market_id(self, ticker: str, default=None):
+        return self.market_ids.get(ticker, default)
+
+    def ticker_for_market_id(self, market_id: int, default=None):
+        return self.by_market_id.get(market_id, default)
+
+    def market_key(self, ex: str, symbol: str) -> str:
+        """봇 티커 / 네이티브 심볼 -> 해당 거래소 market_info 키"""
+        keys = self._market_keys[ex]
+        key = keys.get(symbol)
+        if key is not None: return key
+        ticker = self._reverse[ex].get(symbol)
+        if ticker is not None and ticker in keys:
+            key = keys[ticker]
+        elif symbol in self._lots[ex]:
+            key = symbol
+        else:
+            key = _normalize(symbol)
+        # 설정에 없는 심볼은 한 번만 파싱하고 결과를 캐시
+        keys[symbol] = key
+        return key
+
+    def lot(self, ex: str, symbol: str):
+        """수량 LotSpec 또는 None"""
+        return self._lots[ex].get(self.market_key(ex, symbol))
+
+    def tick(self, ex: str, symbol: str):
+        """가격 LotSpec 또는 None (tick_size / price_prec 를 제공하는 거래소만)"""
+        return self._ticks[ex].get(self.market_key(ex, symbol))
+
+    # ------------------------------------------------------------
+    # 갱신 (load_markets / 스냅샷 복원 후)
+    # ------------------------------------------------------------
+    def compile_markets(self, ex: str, market_info: dict):
+        """거래소 market_info -> 로트/틱 테이블 재구성 (한 번에 교체)"""
+        lots, ticks = {}, {}
+        for key, info in market_info.items():
+            min_size = info.get('min_size', 0.0)
+            if info.get('lot_size'): lots[key] = lot_from_step(info['lot_size'], min_size)
+            else: lots[key] = lot_from_precision(info.get('qty_prec', 3), min_size)
+            if info.get('tick_size'): ticks[key] = lot_from_step(info['tick_size'])
+            elif 'price_prec' in info: ticks[key] = lot_from_precision(info['price_prec'])
+        self._lots[ex] = lots
+        self._ticks[ex] = ticks
+        # 설정 밖 심볼의 캐시된 키는 새 마켓 목록 기준으로 다시 계산
+        configured = set(self._native[ex]) | (set(self.market_ids) if ex == 'LTR' else set())
+        keys = self._market_keys[ex]
+        for symbol in [s for s in keys if s not in configured]: del keys[symbol]
+
+    def bind_lighter_markets(self, ticker_map: dict):
+        """Lighter API 의 {심볼: 마켓 ID} 로 설정에 없는 마켓 ID 를 채웁니다 (설정 값이 우선)."""
+        for ticker, market_id in ticker_map.items():
+            if market_id in self.by_market_id: continue
+            if ticker in self.ids and ticker not in self.market_ids:
+                self._bind_market_id(ticker, market_id)
+
+_REGISTRY = None
+
+def get_registry() -> SymbolRegistry:
+    """프로세스 전역 레지스트리 (settings + 오버라이드가 반영된 TARGET_PAIRS_CONFIG 로 최초 1회 컴파일)"""
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = SymbolRegistry(get_config().current.pairs)
+    return _REGISTRY
@@ -0,0 +1,186 @@
+# utils/trade_store.py
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger("TradeStore")
+
+BALANCE_COLUMNS = ['Time', 'Total_Equity', 'HL', 'GRVT', 'PAC', 'LTR', 'EXT']
+TRADE_COLUMNS = ['Time', 'Symbol', 'Type', 'Side', 'Qty', 'Price', 'Exchange', 'PnL']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS balances (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    symbol TEXT,
+    type TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol);
+"""
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+class TradeStore:
+    """
+    [추가 전용 저장소] 잔고 스냅샷/매매 기록을 SQLite(WAL) 에 한 줄씩 추가합니다.
+
+    - append_* 는 큐에 넣기만 하므로 이벤트 루프를 막지 않습니다.
+    - 백그라운드 writer 태스크가 BATCH_SIZE 개 또는 FLUSH_INTERVAL_SEC 마다 모아서 한 트랜잭션으로 기록합니다.
+    - SQLite 쓰기는 전용 스레드 1개에서만 수행합니다.
+    - 엑셀/CSV 는 export() 또는 `python utils/trade_store.py <db> --out <file>` 로 필요할 때만 만듭니다.
+    """
+    def __init__(self, path: str, flush_interval: float = 1.0, batch_size: int = 200):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trade_store")
+        self._conn = _connect(path)
+        self._queue = None
+        self._writer = None
+        self._closed = False
+        self.stats = {'rows': 0, 'flushes': 0, 'errors': 0}
+
+    def _ensure_writer(self):
+        if self._writer is not None: return True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run_writer())
+        return True
+
+    def _append(self, table, row):
+        if self._closed: return
+        if self._ensure_writer():
+            self._queue.put_nowait((table, row))
+        else:
+            # 이벤트 루프 밖에서 호출된 경우 (CLI/테스트) 즉시 기록
+            self._write_batch([(table, row)])
+
+    def append_balance(self, snapshot: dict):
+        self._append('balances', (time.time(), json.dumps(snapshot, default=str)))
+
+    def append_trade(self, record: dict):
+        self._append('trades', (time.time(), record.get('Symbol'), record.get('Type'), json.dumps(record, default=str)))
+
+    def _write_batch(self, batch):
+        balances = [row for table, row in batch if table == 'balances']
+        trades = [row for table, row in batch if table == 'trades']
+        try:
+            with self._conn:
+                if balances: self._conn.executemany("INSERT INTO balances (ts, data) VALUES (?, ?)", balances)
+                if trades: self._conn.executemany("INSERT INTO trades (ts, symbol, type, data) VALUES (?, ?, ?, ?)", trades)
+            self.stats['rows'] += len(batch)
+            self.stats['flushes'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            log.error(f"❌ [저장소] 기록 실패 ({len(batch)}건): {e}")
+
+    async def _run_writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None: break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0: break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            await loop.run_in_executor(self._executor, self._write_batch, batch)
+            if stop: break
+
+    async def close(self):
+        """남은 기록을 모두 flush 하고 종료합니다."""
+        if self._closed: return
+        self._closed = True
+        if self._writer is not None:
+            # 대기 중인 항목을 먼저 모두 기록한 뒤 종료 신호(None)를 처리
+            self._queue.put_nowait(None)
+            try: await self._writer
+            except Exception as e: log.error(f"❌ [저장소] writer 종료 에러: {e}")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._conn.close)
+        self._executor.shutdown(wait=True)
+        log.info(f"💾 [저장소] 종료 ({self.stats['rows']}건 / {self.stats['flushes']}회 기록)")
+
+    # ------------------------------------------------------------
+    # 조회 / 내보내기 (별도 읽기 연결 사용 → writer 와 경합 없음)
+    # ------------------------------------------------------------
+    @staticmethod
+    def read_rows(path: str, table: str):
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return [json.loads(r[0]) for r in conn.execute(f"SELECT data FROM {table} ORDER BY id")]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def export(path: str, out_path: str):
+        """
+        저장소 -> 엑셀(.xlsx) 또는 CSV 로 내보냅니다.
+        CSV 는 <out>_balance.csv / <out>_trades.csv 두 파일로 나뉩니다.
+        """
+        balances = TradeStore.read_rows(path, 'balances')
+        trades = TradeStore.read_rows(path, 'trades')
+        if out_path.lower().endswith('.xlsx'):
+            import pandas as pd
+            with pd.ExcelWriter(out_path, mode='w', engine='openpyxl') as writer:
+                pd.DataFrame(balances, columns=_columns(balances, BALANCE_COLUMNS)).to_excel(writer, sheet_name='Balance', index=False)
+                pd.DataFrame(trades, columns=_columns(trades, TRADE_COLUMNS)).to_excel(writer, sheet_name='Trades', index=False)
+            written = [out_path]
+        else:
+            base = out_path[:-4] if out_path.lower().endswith('.csv') else out_path
+            written = []
+            for suffix, rows, cols in (('balance', balances, BALANCE_COLUMNS), ('trades', trades, TRADE_COLUMNS)):
+                fname = f"{base}_{suffix}.csv"
+                with open(fname, 'w', newline='', encoding='utf-8-sig') as f:
+                    w = csv.DictWriter(f, fieldnames=_columns(rows, cols), extrasaction='ignore')
+                    w.writeheader(); w.writerows(rows)
+                written.append(fname)
+        log.info(f"📤 [저장소] 내보내기 완료: {', '.join(written)} (잔고 {len(balances)}건, 매매 {len(trades)}건)")
+        return written
+
+def _columns(rows, base_cols):
+    """기본 컬럼 순서 유지 + 기록에만 있는 추가 컬럼은 뒤에 붙임"""
+    cols = list(base_cols)
+    for r in rows:
+        for k in r:
+            if k not in cols: cols.append(k)
+    return cols
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="매매/잔고 저장소(SQLite) 내보내기")
+    parser.add_argument('db', help="저장소 파일 (예: arbitrage_log_real.db)")
+    parser.add_argument('--out', help="출력 파일 (.xlsx 또는 .csv, 기본: <db>.xlsx)")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"저장소 파일 없음: {args.db}")
+    TradeStore.export(args.db, args.out or os.path.splitext(args.db)[0] + '.xlsx')
@@ -0,0 +1,121 @@
+# utils/venue_scorer.py
+import logging
+import time
+import settings
+
+log = logging.getLogger("VenueScorer")
+
+# 봇 내부 거래소 약어 -> settings.SIMULATION_CONFIG['FEES'] 키
+VENUE_FEE_KEYS = {
+    'HL': 'hyperliquid', 'GRVT': 'grvt', 'PAC': 'pacifica',
+    'LTR': 'lighter', 'EXT': 'extended'
+}
+
+class VenueStats:
+    """거래소별 주문 실행 통계 (EWMA)"""
+    __slots__ = ('latency_ms', 'fill_ratio', 'reject_rate', 'samples', 'last_update')
+
+    def __init__(self, default_latency_ms):
+        self.latency_ms = default_latency_ms
+        self.fill_ratio = 1.0
+        self.reject_rate = 0.0
+        self.samples = 0
+        self.last_update = 0.0
+
+    @property
+    def reliability(self):
+        """주문 1건이 실제로 체결될 기대 확률"""
+        return self.fill_ratio * (1.0 - self.reject_rate)
+
+class VenueScorer:
+    def __init__(self, config: dict = None):
+        self.cfg = {**getattr(settings, 'VENUE_SCORING_CONFIG', {}), **(config or {})}
+        self.alpha = self.cfg.get('EWMA_ALPHA', 0.2)
+        self.default_latency_ms = self.cfg.get('DEFAULT_LATENCY_MS', 300.0)
+        self.stats = {}
+        fees = settings.SIMULATION_CONFIG.get('FEES', {})
+        self.fee_pct = {ex: fees.get(key, 0.0) * 100 for ex, key in VENUE_FEE_KEYS.items()}
+
+    def _get(self, ex_name):
+        st = self.stats.get(ex_name)
+        if st is None:
+            st = self.stats[ex_name] = VenueStats(self.default_latency_ms)
+        return st
+
+    def record_order(self, ex_name, latency_sec, accepted: bool, fill_ratio: float = None):
+        """
+        주문 1건의 결과를 반영합니다.
+        accepted=False 이면 거부(에러/None 응답), fill_ratio 는 요청 수량 대비 체결 비율.
+        (체결 수량은 보통 주문 응답 이후에 확정되므로 record_fill_ratio 로 따로 반영 가능)
+        """
+        st = self._get(ex_name)
+        a = self.alpha
+        st.latency_ms += a * (latency_sec * 1000 - st.latency_ms)
+        st.reject_rate += a * ((0.0 if accepted else 1.0) - st.reject_rate)
+        if accepted and fill_ratio is not None:
+            self.record_fill_ratio(ex_name, fill_ratio)
+        st.samples += 1
+        st.last_update = time.time()
+
+    def record_fill_ratio(self, ex_name, fill_ratio: float):
+        st = self._get(ex_name)
+        st.fill_ratio += self.alpha * (max(0.0, min(1.0, fill_ratio)) - st.fill_ratio)
+
+    def expected_net_edge(self, long_ex, short_ex, spread_pct):
+        """
+        [기대 순수익 %] = 스프레드 - 왕복 수수료(진입+청산) - 지연 비용 - 레깅 기대 손실
+        """
+        l, s = self._get(long_ex), self._get(short_ex)
+        fees = 2 * (self.fee_pct.get(long_ex, 0.0) + self.fee_pct.get(short_ex, 0.0))
+        latency_cost = max(l.latency_ms, s.latency_ms) / 1000 * self.cfg.get('LATENCY_COST_PCT_PER_SEC', 0.05)
+        p_both = l.reliability * s.reliability
+        legging_cost = (1.0 - p_both) * self.cfg.get('LEGGING_COST_PCT', 0.3)
+        return spread_pct - fees - latency_cost - legging_cost
+
+    def rank_pairs(self, quotes: dict, min_spread_pct: float = None, min_net_edge_pct: float = None):
+        """
+        quotes: { 'HL': bbo, 'GRVT': bbo, ... }
+        Returns: [(net_edge, spread_pct, long_ex, short_ex), ...] 기대 순수익 내림차순
+        min_net_edge_pct 를 주면 기대 순수익이 그 이하인 쌍 (수수료/지연/레깅 비용 후 손실) 은 제외
+        """
+        mids = {}
+        for ex, q in quotes.items():
+            mid = (q['bid'] + q['ask']) / 2
+            if mid > 0: mids[ex] = mid
+        ranked = []
+        for long_ex, long_p in mids.items():
+            for short_ex, short_p in mids.items():
+                if long_ex == short_ex: continue
+                spread = (short_p - long_p) / long_p * 100
+                if min_spread_pct is not None and spread <= min_spread_pct: continue
+                edge = self.expected_net_edge(long_ex, short_ex, spread)
+                if min_net_edge_pct is not None and edge <= min_net_edge_pct: continue
+                ranked.append((edge, spread, long_ex, short_ex))
+        ranked.sort(reverse=True)
+        return ranked
+
+    def plan_legs(self, long_ex, short_ex):
+        """
+        [주문 순서 결정]
+        Returns: (mode, first_ex) - mode 는 'parallel' 또는 'sequential'
+        - 두 거래소 신뢰도가 비슷하면 동시 주문
+        - 한쪽이 확연히 불안하면 그쪽을 먼저 보내고, 체결 확인 후 안정적인 쪽을 주문
+          (단, 불안한 쪽의 지연이 너무 크면 기회 손실이 더 크므로 동시 주문 유지)
+        """
+        l, s = self._get(long_ex), self._get(short_ex)
+        if min(l.samples, s.samples) < self.cfg.get('MIN_SAMPLES', 5):
+            return 'parallel', None
+        weaker, stronger = (l, s) if l.reliability < s.reliability else (s, l)
+        weaker_ex = long_ex if weaker is l else short_ex
+        if stronger.reliability - weaker.reliability < self.cfg.get('SEQUENTIAL_RELIABILITY_GAP', 0.1):
+            return 'parallel', None
+        if weaker.latency_ms > self.cfg.get('SEQUENTIAL_MAX_LATENCY_MS', 800.0):
+            return 'parallel', None
+        return 'sequential', weaker_ex
+
+    def summary(self):
+        return {
+            ex: {'latency_ms': round(st.latency_ms, 1), 'fill_ratio': round(st.fill_ratio, 3),
+                 'reject_rate': round(st.reject_rate, 3), 'samples': st.samples}
+            for ex, st in self.stats.items()
+        }
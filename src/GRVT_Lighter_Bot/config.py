@@ -50,6 +50,17 @@ class Config:
     MAX_POSITION = 0.1
     SPREAD_BPS = 5 # 0.05%
     HEDGE_SLIPPAGE_BPS = 20 # 0.2%
+    HEDGE_THRESHOLD_USD = 10.0 # GRVT fills are batched into one Lighter hedge once worth this much...
+    MAX_HEDGE_DELAY = 10.0 # ...or this many seconds after the batch's first fill
+    HEDGE_RETRY_BASE_SEC = 0.25 # Failed hedges retry after a jittered backoff doubling from this...
+    HEDGE_RETRY_MAX_SEC = 2.0 # ...up to this (a Lighter market update retries sooner)
+    # Lighter hedge fast path: per-symbol order templates (protective limit prices) refreshed in the background
+    LIGHTER_TEMPLATE_REFRESH_SEC = 0.5
+    LIGHTER_TEMPLATE_MAX_AGE_SEC = 5.0 # Older templates fall back to the general market order path
+    LIGHTER_HEDGE_PROTECT_SLIPPAGE = 0.05 # Protective price = top of book +/- 5%
+    # Lighter WS: one market_stats/all subscription (per-market fallback if rejected);
+    # order_book channels only for perp markets being hedged or watched
+    LIGHTER_WS_STATS_ALL = True
     LEVERAGE = 10
     
     # Funding Logic
@@ -58,5 +69,51 @@ class Config:
     # Dry Run Safety
     MAX_ACTIVE_POSITIONS = 1
     
+    # REST rate limits (token bucket per exchange, kept a little under the published limits).
+    # reserve: fraction of the bucket a lane may not spend, so polling never starves orders.
+    RATE_LIMITS = {
+        'default': {'rate_per_sec': 5.0, 'burst': 10, 'reserve': {'account': 0.2, 'metadata': 0.4}},
+        'grvt': {'rate_per_sec': 10.0, 'burst': 20},
+        'lighter': {'rate_per_sec': 1.0, 'burst': 10},  # Standard account: 60 requests/min
+    }
+
+    # GRVT ticker.s cache (entry pricing): entries older than this fall back to REST.
+    # The top GRVT_TICKER_WATCH_TOP scanned opportunities are kept subscribed.
+    GRVT_TICKER_MAX_AGE_SEC = 2.0
+    GRVT_TICKER_WATCH_TOP = 5
+
+    # GRVT maker quoting (QuoteEngine): entry orders are cancel-replaced to follow the book.s touch,
+    # at most once per QUOTE_MIN_REPRICE_SEC per order and only with rate-limit tokens free.
+    QUOTE_MIN_REPRICE_SEC = 0.5
+    QUOTE_MAX_LIFETIME_SEC = 300 # Replaces the 60s timeout for quoted entry orders
+    QUOTE_BOOK_DEPTH = 10
+    QUOTE_MAX_DRIFT_PCT = 0.5 # A quote whose touch moved this far (%) from its first price is ended, not chased
+    ORDER_RETAIN_SEC = 60 # Closed orders stay addressable this long so late fills still route
+    ORDER_MAX_CANCEL_RETRIES = 5 # Failed expiry cancels are retried this often, then left open and logged as critical
+
+    # OpportunityScanner is fed by the GRVT ticker.s / Lighter market_stats streams;
+    # a full REST resync backfills quiet symbols this often.
+    SCANNER_RESYNC_SEC = 300
+
+    # Funding engine (strategy/funding_engine.py): opportunities are ranked by expected carry over
+    # FUNDING_HOLD_HOURS, blending the current rate (weight FUNDING_CURRENT_WEIGHT) with the mean of
+    # the last FUNDING_HISTORY_HOURS of settled rates. History is synced for the top FUNDING_SYNC_TOP
+    # symbols every FUNDING_SYNC_SEC and cached in data/funding_history.json.
+    FUNDING_HOLD_HOURS = 24
+    FUNDING_HISTORY_HOURS = 72
+    FUNDING_CURRENT_WEIGHT = 0.5
+    FUNDING_SYNC_SEC = 900
+    FUNDING_SYNC_TOP = 20
+    LIGHTER_FUNDING_INTERVAL_HOURS = 1
+    GRVT_DEFAULT_FUNDING_INTERVAL_HOURS = 8  # only when the instrument metadata has no interval
+
+    # Lighter /account responses are shared by balance, leverage and position queries for this long
+    LIGHTER_ACCOUNT_CACHE_TTL_SEC = 1.0
+
+    # Position state store (strategy/bot_state.py): deltas are flushed in the background,
+    # then folded into the snapshot once the log reaches STATE_COMPACT_EVERY records.
+    STATE_FLUSH_INTERVAL_SEC = 0.5
+    STATE_COMPACT_EVERY = 500
+
     # Logging
     LOG_LEVEL = "INFO"
@@ -41,12 +41,11 @@ class Dashboard:
         print("=" * 100)
         
         # 2. Opportunity Table
-        print(f"{'Symbol':<8} | {'GRVT Price':<12} | {'Lighter Price':<14} | {'GRVT Rate (Int)':<18} | {'Lighter Rate (Adj)':<24} | {'Diff':<10} | {'Recommendation'}")
+        print(f"{'Symbol':<8} | {'GRVT Price':<12} | {'Lighter Price':<14} | {'GRVT Rate (Int)':<18} | {'Lighter Rate (Adj)':<24} | {'Diff':<10} | {'Carry':<10} | {'Recommendation'}")
         print("-" * 100)
         
-        # Sort opportunities by Spread desc
-        # The scanner now returns ALL scanned symbols, so we need to filter/sort.
-        opps = sorted(self.bot.scanner.opportunities.values(), key=lambda x: x.spread, reverse=True)
+        # Scanner keeps ALL scanned symbols ranked by expected carry desc
+        opps = self.bot.scanner.ranked()
         
         for opp in opps[:15]: # Show top 15
             rec_color = "" 
@@ -54,8 +53,9 @@ class Dashboard:
             # Windows CMD might need colorama, let's stick to text for simplicity or basic ANSI.
             
             grvt_desc = f"{opp.grvt_funding_rate:.5f} ({opp.grvt_funding_interval_hours}h)"
-            lighter_desc = f"{opp.lighter_funding_rate:.5f} (1h->{opp.adj_lighter_rate_1h:.5f})"
+            lighter_desc = f"{opp.lighter_funding_rate:.5f} ({opp.lighter_funding_interval_hours}h->{opp.adj_lighter_rate_1h:.5f})"
             diff_desc = f"{opp.spread:.5f}"
+            carry_desc = f"{opp.expected_carry:.4f}%"
             
             # ANSI Color Codes
             GREEN = '\033[92m'
@@ -71,7 +71,7 @@ class Dashboard:
             grvt_price_str = f"${opp.grvt_price:.2f}"
             lighter_price_str = f"${opp.lighter_price:.2f}"
 
-            print(f"{opp.symbol:<8} | {grvt_price_str:<12} | {lighter_price_str:<14} | {grvt_desc:<18} | {lighter_desc:<24} | {diff_desc:<10} | {rec_str}")
+            print(f"{opp.symbol:<8} | {grvt_price_str:<12} | {lighter_price_str:<14} | {grvt_desc:<18} | {lighter_desc:<24} | {diff_desc:<10} | {carry_desc:<10} | {rec_str}")
             
         print("-" * 100)
         
@@ -83,6 +83,29 @@ class Dashboard:
                 print(f"[{pos.symbol}] Size: {pos.size} | Status: {pos.status} | Hedge Pending: {pos.pending_hedge_qty}")
         else:
             print("\nNo Active Positions.")
+        
+        h = self.bot.pm.hedger.summary()
+        if h['fills']:
+            print(f"Hedges: {h['hedges']} for {h['fills']} fills ({h['fills_per_hedge']}/hedge) | "
+                  f"Fill->Hedge avg {h['latency_ms_avg']}ms, p50 {h['latency_ms_p50']}ms, p99 {h['latency_ms_p99']}ms, "
+                  f"max {h['latency_ms_max']}ms | Fast/Fallback: {h['fast_path']}/{h['fallback_path']} | Failures: {h['failures']}")
+            u = h['unhedged']
+            print(f"Unhedged: ${u['usd']} {u['qty']} | Oldest batch: {u['oldest_sec']}s | Dust: {u['dust']} | "
+                  f"Retrying: {u['retrying']} (scheduled {h['retries_scheduled']}, max attempts {h['max_attempts']})")
+            stages = self.bot.pm.hedger.stage_summary()
+            print("Stages: " + " | ".join(f"{name} p50 {st['p50_ms']}ms p99 {st['p99_ms']}ms"
+                                           for name, st in stages.items() if name != 'fill->acked' and st['count']))
+
+        qs = self.bot.pm.quoter.summary()
+        if qs['placed']:
+            print(f"Quotes: {qs['active']} active / {qs['placed']} placed | Reprices: {qs['reprices']} "
+                  f"(update p50 {qs['update_ms_p50']}ms, p99 {qs['update_ms_p99']}ms, budget deferrals {qs['budget_deferrals']}) | "
+                  f"Fill rate: {qs['fill_rate']:.1%} ({qs['quotes_filled_pct']}% of quotes filled) | Queue ahead: {qs['queue_ahead_x']}x size")
+
+        om = self.bot.pm.orders.summary()
+        if om['tracked']:
+            print(f"Orders: {om['states']} | Expired: {om['expired']} (max lag {om['max_expiry_lag_ms']}ms) | "
+                  f"Cancel failures: {om['cancel_failures']}")
             
         # 4. Save to Log File (Append snapshot)
         # Maybe not every refresh? User said "Main_bot_log.txt saves logs". 
@@ -1,29 +1,96 @@
 import logging
 import asyncio
-from pysdk.grvt_ccxt import GrvtCcxt
+import time
+from typing import Dict, Iterable, List, Optional
+from pysdk.grvt_ccxt_ws import GrvtCcxtWS
 from pysdk.grvt_ccxt_env import GrvtEnv
 from ..config import Config
 from ..utils import Utils
+from .rate_limiter import get_limiter, ORDER, CANCEL, ACCOUNT, METADATA
 
 logger = logging.getLogger(__name__)
 
+def _parse_ticker(raw: dict) -> Optional[dict]:
+    """
+    Normalizes a GRVT ticker (REST fetch_ticker result or ticker.s WS feed) to
+    {'bid', 'ask', 'last', 'mark', 'funding_rate'} floats.
+    funding_rate is the rate applied over the instrument's funding interval, in percentage points
+    (the 8h fields are deprecated fallbacks).
+    """
+    if isinstance(raw, list):
+        raw = raw[0] if raw else None
+    if not isinstance(raw, dict):
+        return None
+    if isinstance(raw.get('result'), dict):
+        raw = raw['result']
+    def num(*keys):
+        for k in keys:
+            v = raw.get(k)
+            if v not in (None, ''):
+                return float(v)
+        return 0.0
+    return {
+        'bid': num('best_bid_price', 'bid'),
+        'ask': num('best_ask_price', 'ask'),
+        'last': num('last_price', 'last', 'close'),
+        'mark': num('mark_price', 'index_price'),
+        'funding_rate': num('funding_rate', 'funding_rate_curr', 'funding_rate_8h_curr'),
+    }
+
+def _parse_book(raw: dict) -> Optional[dict]:
+    """Normalizes a book.s feed to {'bids': [(price, size), ...], 'asks': [...]} (best level first)."""
+    if not isinstance(raw, dict):
+        return None
+    def levels(key):
+        out = []
+        for lvl in raw.get(key) or []:
+            try:
+                out.append((float(lvl['price']), float(lvl['size'])))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return out
+    return {'bids': levels('bids'), 'asks': levels('asks')}
+
 class GrvtExchange:
+    """
+    GRVT adapter on the SDK's async client (GrvtCcxtWS = GrvtCcxtPro + websocket).
+
+    REST calls are awaited directly on one pooled aiohttp session instead of running the
+    synchronous GrvtCcxt in worker threads, and the same client carries the WS subscriptions
+    (user fills, the ticker.s cache used for entry pricing and the book.s cache used for quoting).
+    """
     def __init__(self):
-        env = GrvtEnv.TESTNET if Config.GRVT_ENV == "TESTNET" else GrvtEnv.PROD
-        
-        # Reference Logic: Get loop and use it for GrvtCcxtWS
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
+        self.env = GrvtEnv.TESTNET if Config.GRVT_ENV == "TESTNET" else GrvtEnv.PROD
+        self.client: Optional[GrvtCcxtWS] = None  # created in initialize() (needs the running loop)
+        self._ws_running = False
+        self._fill_callback = None
+        self.market_rules = {}
+        self.instruments: Dict[str, str] = {}  # base symbol -> perp instrument, e.g. 'BTC' -> 'BTC_USDT_Perp'
+        self.funding_intervals: Dict[str, int] = {}  # instrument -> funding interval (hours), from instrument metadata
+        self.limiter = get_limiter('grvt')
+        # WS ticker cache: instrument -> parsed ticker + 'ts' (monotonic receive time)
+        self.tickers: Dict[str, dict] = {}
+        self._ticker_subs = set()
+        self.ticker_max_age = getattr(Config, 'GRVT_TICKER_MAX_AGE_SEC', 2.0)
+        self.ticker_stats = {'ws_updates': 0, 'cache_hits': 0, 'rest_fallbacks': 0}
+        self._update_listeners = []  # fn(base_symbol), called on every ticker update
+        # WS order book cache (maker quoting): instrument -> parsed book + 'ts'
+        self.books: Dict[str, dict] = {}
+        self._book_subs = set()
+        self._book_listeners = []  # fn(instrument, book), called on every book update
+        self.book_depth = getattr(Config, 'QUOTE_BOOK_DEPTH', 10)
+
+    async def initialize(self):
+        """Creates the async client on the running loop and loads market rules."""
+        if self.client is not None:
+            return
         # Reference Logic: Suppress Pysdk Logger
         quiet = logging.getLogger("quiet_grvt")
         quiet.setLevel(logging.CRITICAL)
-        
-        self.client = GrvtCcxt(
-            env=env,
+
+        self.client = GrvtCcxtWS(
+            env=self.env,
+            loop=asyncio.get_running_loop(),
             logger=quiet, # Use quiet logger
             parameters={
                 "api_key": Config.GRVT_API_KEY,
@@ -31,18 +98,13 @@ class GrvtExchange:
                 "trading_account_id": Config.GRVT_TRADING_ACCOUNT_ID,
             }
         )
-        self._ws_running = False
-        self.market_rules = {}
-        self.load_market_rules() # Load rules immediately after client is created
-        
-    async def initialize(self):
-        """Asynchronous initializer for API consistency."""
-        # Synchronous client is fully initialized in __init__
+        # initialize() loads markets over REST and opens the websocket connections
+        await self.limiter.call(METADATA, self.client.initialize, cost=3)
+        self.load_market_rules()
         logger.info("GrvtExchange initialized.")
-        pass
 
     def load_market_rules(self) -> set:
-        """Loads market trading rules and returns a set of available base symbols."""
+        """Parses the markets loaded by the client and returns a set of available base symbols."""
         logger.info("[GRVT] Attempting to load market rules...")
         available_symbols = set()
         if not self.client:
@@ -50,19 +112,11 @@ class GrvtExchange:
             return available_symbols
 
         try:
-            # Check if markets are already populated
-            if hasattr(self.client, 'markets') and self.client.markets:
-                logger.info(f"[GRVT] Found pre-populated client.markets. Count: {len(self.client.markets)}")
-                markets_to_parse = self.client.markets
-            else:
-                # If not, explicitly call load_markets
-                logger.warning("[GRVT] client.markets not populated. Attempting explicit load_markets() call.")
-                markets_to_parse = self.client.load_markets()
-                logger.info(f"[GRVT] Explicit load_markets() response. Count: {len(markets_to_parse) if markets_to_parse else 0}")
-
+            markets_to_parse = getattr(self.client, 'markets', None)
             if not markets_to_parse:
-                logger.error("[GRVT] No market data found in either .markets attribute or load_markets() call.")
+                logger.error("[GRVT] No market data found on the client after initialize().")
                 return available_symbols
+            logger.info(f"[GRVT] Found client.markets. Count: {len(markets_to_parse)}")
 
             for symbol, market in markets_to_parse.items():
                 base = symbol.split('_')[0]
@@ -71,6 +125,10 @@ class GrvtExchange:
                     'min_size': market.get('min_size'), # Corrected based on user-provided API docs
                     'max_leverage': market.get('limits', {}).get('leverage', {}).get('max', 20),
                 }
+                if symbol.endswith('_Perp') and (base not in self.instruments or '_USDT_' in symbol):
+                    self.instruments[base] = symbol
+                if market.get('funding_interval_hours'):
+                    self.funding_intervals[symbol] = int(market['funding_interval_hours'])
             logger.info(f"[GRVT] {len(self.market_rules)} market rules loaded.")
             logger.info(f"[GRVT] Loaded rule keys: {list(self.market_rules.keys())}")
         except Exception as e:
@@ -78,13 +136,117 @@ class GrvtExchange:
         
         return available_symbols
 
+    # ------------------------------------------------------------------
+    # Tickers
+    # ------------------------------------------------------------------
+    async def fetch_ticker(self, symbol: str, lane: int = METADATA):
+        """Raw REST ticker for an instrument."""
+        return await self.limiter.call(lane, self.client.fetch_ticker, Utils.to_grvt_symbol(symbol))
+
+    def add_update_listener(self, fn):
+        """Registers fn(base_symbol), called (synchronously, keep it cheap) whenever a cached ticker changes."""
+        self._update_listeners.append(fn)
+
+    def store_ticker(self, instrument: str, raw) -> Optional[dict]:
+        """Parses a raw ticker into the cache and notifies listeners."""
+        ticker = _parse_ticker(raw)
+        if ticker is None: return None
+        ticker['ts'] = time.monotonic()
+        self.tickers[instrument] = ticker
+        base = instrument.split('_')[0]
+        for fn in self._update_listeners:
+            fn(base)
+        return ticker
+
+    async def _on_ticker(self, msg):
+        feed = msg.get('feed') if isinstance(msg, dict) else None
+        if not feed: return
+        instrument = feed.get('instrument')
+        if instrument and self.store_ticker(instrument, feed):
+            self.ticker_stats['ws_updates'] += 1
+
+    async def _subscribe_ticker(self, instrument: str):
+        await self.client.subscribe(stream='ticker.s', callback=self._on_ticker, params={'instrument': instrument})
+
+    async def watch_tickers(self, symbols: Iterable[str]):
+        """Adds instruments to the WS ticker cache (subscribed now if the WS is up, else on connect)."""
+        for symbol in symbols:
+            instrument = Utils.to_grvt_symbol(symbol)
+            if instrument in self._ticker_subs: continue
+            self._ticker_subs.add(instrument)
+            if self._ws_running and self.client is not None:
+                try:
+                    await self._subscribe_ticker(instrument)
+                except Exception as e:
+                    logger.warning(f"Failed to subscribe GRVT ticker for {instrument}: {e}")
+
+    # ------------------------------------------------------------------
+    # Order book
+    # ------------------------------------------------------------------
+    def add_book_listener(self, fn):
+        """Registers fn(instrument, book), called (synchronously, keep it cheap) on every book update."""
+        self._book_listeners.append(fn)
+
+    async def _on_book(self, msg):
+        feed = msg.get('feed') if isinstance(msg, dict) else None
+        if not feed: return
+        instrument = feed.get('instrument')
+        book = _parse_book(feed)
+        if not instrument or book is None: return
+        book['ts'] = time.monotonic()
+        self.books[instrument] = book
+        for fn in self._book_listeners:
+            fn(instrument, book)
+
+    async def _subscribe_book(self, instrument: str):
+        await self.client.subscribe(stream='book.s', callback=self._on_book,
+                                    params={'instrument': instrument, 'depth': self.book_depth})
+
+    async def watch_books(self, symbols: Iterable[str]):
+        """Adds instruments to the WS order book cache (subscribed now if the WS is up, else on connect)."""
+        for symbol in symbols:
+            instrument = Utils.to_grvt_symbol(symbol)
+            if instrument in self._book_subs: continue
+            self._book_subs.add(instrument)
+            if self._ws_running and self.client is not None:
+                try:
+                    await self._subscribe_book(instrument)
+                except Exception as e:
+                    logger.warning(f"Failed to subscribe GRVT book for {instrument}: {e}")
+
+    async def get_bbo(self, symbol: str, max_age: float = None, lane: int = METADATA) -> Optional[dict]:
+        """
+        Best bid/ask (+ last/mark/funding) for entry pricing.
+        Served from the WS ticker cache when fresh; otherwise one REST fetch, and the
+        instrument is added to the WS subscriptions so the next call hits the cache.
+        """
+        instrument = Utils.to_grvt_symbol(symbol)
+        max_age = self.ticker_max_age if max_age is None else max_age
+        cached = self.tickers.get(instrument)
+        if cached and time.monotonic() - cached['ts'] <= max_age:
+            self.ticker_stats['cache_hits'] += 1
+            return cached
+
+        self.ticker_stats['rest_fallbacks'] += 1
+        await self.watch_tickers([instrument])
+        started = time.monotonic()
+        try:
+            raw = await self.fetch_ticker(instrument, lane)
+        except Exception as e:
+            logger.error(f"Error fetching GRVT ticker for {instrument}: {e}")
+            return cached
+        latest = self.tickers.get(instrument)
+        if latest and latest['ts'] >= started:
+            return latest  # a WS update landed while the REST call was in flight
+        return self.store_ticker(instrument, raw) or cached
+
     async def get_funding_rate(self, symbol: str):
         """
         Fetch funding rate for the symbol.
         Returns the current funding rate.
         """
         try:
-            ticker = await asyncio.to_thread(self.client.fetch_ticker, symbol)
+            ticker = await self.fetch_ticker(symbol)
             
             if ticker:
                 # Check for funding_rate_curr (default) or fallbacks
@@ -102,9 +264,12 @@ class GrvtExchange:
     async def get_all_tickers(self):
         """
         Fetch all tickers to find best funding.
+        Returns {} when the SDK has no batch endpoint (callers fall back to per-symbol fetches).
         """
         try:
-            tickers = await asyncio.to_thread(self.client.fetch_tickers)
+            if not hasattr(self.client, 'fetch_tickers'):
+                return {}
+            tickers = await self.limiter.call(METADATA, self.client.fetch_tickers, cost=5)
             return tickers
         except Exception as e:
             logger.error(f"Error fetching all GRVT tickers: {e}")
@@ -126,7 +291,8 @@ class GrvtExchange:
             if params:
                 final_params.update(params)
             
-            order = await asyncio.to_thread(
+            order = await self.limiter.call(
+                ORDER,
                 self.client.create_order,
                 grvt_symbol, # Use GRVT-formatted symbol
                 'limit',
@@ -159,7 +325,8 @@ class GrvtExchange:
             grvt_symbol = Utils.to_grvt_symbol(symbol) # Convert symbol to GRVT format
             
             # The SDK's create_order method handles market orders by setting type='market' and price=None
-            order = await asyncio.to_thread(
+            order = await self.limiter.call(
+                ORDER,
                 self.client.create_order,
                 grvt_symbol, # Use GRVT-formatted symbol
                 'market',
@@ -181,15 +348,41 @@ class GrvtExchange:
             logger.error(f"GRVT Market Order Failed for {symbol}: {e}", exc_info=True)
             return None
         
+    async def cancel_order(self, order_id, symbol: str):
+        """
+        Cancels an open order through the cancel lane of the rate limiter.
+        """
+        return await self.limiter.call(CANCEL, self.client.cancel_order, order_id, symbol=symbol)
+
+    async def fetch_order_fill(self, order_id) -> Optional[tuple]:
+        """
+        (status, traded size) of an order from the order query, or None if it could not be read.
+        The SDK's cancel_order only reports whether the cancel was acked; this is the order's final state.
+        """
+        try:
+            resp = await self.limiter.call(ORDER, self.client.fetch_order, id=str(order_id))
+        except Exception as e:
+            logger.warning(f"GRVT order query failed for {order_id}: {e}")
+            return None
+        order = resp.get('result') if isinstance(resp, dict) else None
+        state = order.get('state') if isinstance(order, dict) else None
+        if not isinstance(state, dict) or not state.get('status'):
+            return None
+        traded = state.get('traded_size') or []
+        if not isinstance(traded, list): traded = [traded]
+        return str(state['status']).upper(), sum(float(x or 0) for x in traded)
+
     async def get_balance(self):
         """
         Fetch USDT balance and positions.
         Returns dict with 'equity', 'available', 'positions'.
         """
         try:
-            # Run blocking calls in thread
-            bal = await asyncio.to_thread(self.client.fetch_balance)
-            positions = await asyncio.to_thread(self.client.fetch_positions)
+            # Independent requests on the pooled session: fetch both at once
+            bal, positions = await asyncio.gather(
+                self.limiter.call(ACCOUNT, self.client.fetch_balance),
+                self.limiter.call(ACCOUNT, self.client.fetch_positions),
+            )
             
             # Parse Balance
             equity = float(bal.get('USDT', {}).get('total', 0))
@@ -219,40 +412,28 @@ class GrvtExchange:
 
     async def listen_fills(self, callback):
         """
-        Listen for user fills via WebSocket.
+        Listen for user fills via WebSocket (on the shared async client).
+        Watched tickers are (re)subscribed on every connect.
         """
         if self._ws_running: return
         self._ws_running = True
+        self._fill_callback = callback
         
         while self._ws_running:
             try:
-                from pysdk.grvt_ccxt_ws import GrvtCcxtWS
-                # Reference Logic: Loop Injection for WS
-                loop = asyncio.get_running_loop()
-                env = GrvtEnv.TESTNET if Config.GRVT_ENV == "TESTNET" else GrvtEnv.PROD
-                
-                quiet = logging.getLogger("quiet_grvt_ws")
-                quiet.setLevel(logging.CRITICAL)
-                
-                params = {
-                    "api_key": Config.GRVT_API_KEY,
-                    "private_key": Config.GRVT_PRIVATE_KEY,
-                    "trading_account_id": Config.GRVT_TRADING_ACCOUNT_ID,
-                }
-                
-                self.ws = GrvtCcxtWS(
-                    env=env, 
-                    loop=loop, 
-                    logger=quiet, 
-                    parameters=params
-                )
-                
-                await self.ws.initialize()
+                if self.client is None:
+                    await self.initialize()
                 logger.info("GRVT WebSocket Initialized.")
                 
                 # Subscribe to user trades/fills
-                await self.ws.subscribe(stream='user.trades', callback=callback)
+                await self.client.subscribe(stream='user.trades', callback=callback)
                 logger.info("Subscribed to user.trades")
+                for instrument in list(self._ticker_subs):
+                    await self._subscribe_ticker(instrument)
+                if self._ticker_subs:
+                    logger.info(f"Subscribed to ticker.s for {len(self._ticker_subs)} instruments")
+                for instrument in list(self._book_subs):
+                    await self._subscribe_book(instrument)
                 
                 # Mock keepalive to prevent loop exit in this version
                 while self._ws_running:
@@ -261,6 +442,11 @@ class GrvtExchange:
             except Exception as e:
                 logger.error(f"GRVT WS Error: {e}")
                 await asyncio.sleep(5)
+                # Reconnect the websocket on the existing client
+                try:
+                    await self.client.initialize()
+                except Exception as re:
+                    logger.error(f"GRVT WS reconnect failed: {re}")
 
 
     async def get_ticker_info(self, symbol):
@@ -287,7 +473,7 @@ class GrvtExchange:
                 url = f"{base_url}/full/v1/get_all_initial_leverage"
                 
                 if hasattr(self.client, '_auth_and_post'):
-                    resp = await asyncio.to_thread(self.client._auth_and_post, url, payload=payload)
+                    resp = await self.limiter.call(METADATA, self.client._auth_and_post, url, payload=payload)
                     results = resp.get('results', [])
                     target = next((r for r in results if r.get('instrument') == grvt_symbol), None)
                     if target:
@@ -322,8 +508,7 @@ class GrvtExchange:
             url = f"{base_url}/full/v1/set_initial_leverage"
             
             if hasattr(self.client, '_auth_and_post'):
-                # Run the synchronous post call in a separate thread
-                resp = await asyncio.to_thread(self.client._auth_and_post, url, payload=payload)
+                resp = await self.limiter.call(ORDER, self.client._auth_and_post, url, payload=payload)
                 
                 if resp.get('success'):
                     logger.info(f"Successfully set GRVT leverage for {grvt_symbol} to {leverage}x.")
@@ -338,14 +523,34 @@ class GrvtExchange:
             logger.error(f"Error setting GRVT leverage for {symbol}: {e}", exc_info=True)
             return False
 
+    async def get_funding_history(self, symbol: str, since_ns: int = 0, limit: int = 1000) -> List[tuple]:
+        """
+        Settled funding rates since `since_ns` (unix ns), oldest first:
+        [(funding_time_sec, rate_pct_per_interval, interval_hours), ...]
+        """
+        grvt_symbol = Utils.to_grvt_symbol(symbol)
+        history = await self.limiter.call(METADATA, self.client.fetch_funding_rate_history, grvt_symbol, since=since_ns, limit=limit)
+        out = []
+        for r in (history or {}).get('result', []):
+            try:
+                out.append((int(r['funding_time']) / 1e9, float(r['funding_rate']), int(r.get('funding_interval_hours') or 0)))
+            except (KeyError, TypeError, ValueError):
+                continue
+        out.sort()
+        if out and out[-1][2]:
+            self.funding_intervals[grvt_symbol] = out[-1][2]
+        return out
+
     async def get_funding_interval(self, symbol: str) -> int | None:
         """
-        Fetches the funding interval in hours using the official SDK method.
+        Funding interval in hours: instrument metadata when loaded, else the latest history record.
         """
         try:
             grvt_symbol = Utils.to_grvt_symbol(symbol)
+            if grvt_symbol in self.funding_intervals:
+                return self.funding_intervals[grvt_symbol]
             # Use the official SDK method to be more robust
-            history = await asyncio.to_thread(self.client.fetch_funding_rate_history, grvt_symbol, limit=1)
+            history = await self.limiter.call(METADATA, self.client.fetch_funding_rate_history, grvt_symbol, limit=1)
             results = history.get('result', [])
             if results and 'funding_interval_hours' in results[0]:
                 return int(results[0]['funding_interval_hours'])
@@ -360,7 +565,7 @@ class GrvtExchange:
         """
         try:
             grvt_symbol = Utils.to_grvt_symbol(symbol)
-            ticker_task = asyncio.to_thread(self.client.fetch_ticker, grvt_symbol)
+            ticker_task = self.fetch_ticker(grvt_symbol)
             interval_task = self.get_funding_interval(symbol)
             
             ticker, interval = await asyncio.gather(ticker_task, interval_task)
@@ -376,13 +581,18 @@ class GrvtExchange:
             return {"funding_rate": None, "next_funding_time": None, "funding_interval": None}
 
     async def close(self):
-        """Gracefully close the underlying client session."""
+        """Gracefully close the WS connections, then the underlying client session."""
         self._ws_running = False
-        if hasattr(self, 'ws') and self.ws:
-            # The GrvtCcxtWS class handles its own shutdown
-            pass
-        if self.client and hasattr(self.client, '_session') and self.client._session:
-            # This is a synchronous requests.Session, so no await
-            self.client._session.close()
+        if self.client is not None and any(getattr(self.client, 'ws', {}).values()):
+            # GrvtCcxtWS keeps one connection per endpoint in client.ws; its (argument-less)
+            # __aexit__ closes each of them
+            try:
+                await self.client.__aexit__()
+                logger.info("GRVT WS connections closed.")
+            except Exception as e:
+                logger.warning(f"Failed to close GRVT WS connections: {e}")
+        session = getattr(self.client, '_session', None)
+        if session is not None and not session.closed:
+            # Pooled aiohttp session shared by every REST call
+            await session.close()
             logger.info("GRVT client session closed.")
-
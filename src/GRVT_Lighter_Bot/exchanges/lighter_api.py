@@ -1,6 +1,8 @@
+import inspect
 import logging
 import time
 import json
+import aiohttp
 import websockets
 import asyncio
 from lighter.api.funding_api import FundingApi
@@ -12,9 +14,95 @@ from lighter.signer_client import SignerClient
 from ..config import Config
 from ..utils import Utils
 from ..constants import LIGHTER_MARKET_IDS, SYMBOL_METADATA, SYMBOL_ALIASES
+from .lighter_nonce import LighterNonceManager
+from .rate_limiter import get_limiter, ORDER, ACCOUNT, METADATA
 
 logger = logging.getLogger(__name__)
 
+class MarketSlot:
+    """
+    Latest WS state of one Lighter perp market (the bbo_cache values). Fields are updated in place by
+    the channel dispatch table; .get() keeps the dict-style access callers already use.
+    """
+    __slots__ = ('symbol', 'market_id', 'bid', 'ask', 'price', 'index_price', 'mark_price',
+                 'funding_rate', 'next_funding_time', 'updated_at', 'book_at')
+    FIELDS = frozenset(__slots__)
+
+    def __init__(self, symbol: str, market_id: int):
+        self.symbol = symbol
+        self.market_id = market_id
+        self.bid = self.ask = self.price = self.index_price = self.mark_price = None
+        self.funding_rate = self.next_funding_time = None
+        self.updated_at = 0.0   # monotonic time of the last market_stats update
+        self.book_at = 0.0      # monotonic time bid/ask were last confirmed by the order_book channel
+
+    def __bool__(self):
+        return self.updated_at > 0  # no WS update yet reads like the old empty cache entry
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key) if key in self.FIELDS else None
+        return default if value is None else value
+
+    def __repr__(self):
+        return (f"MarketSlot({self.symbol} bid={self.bid} ask={self.ask} price={self.price} "
+                f"funding_rate={self.funding_rate})")
+
+class LocalBook:
+    """
+    One Lighter market's order book rebuilt from the order_book channel, which sends a full
+    snapshot on subscribe and only changed levels after that (size 0 removes a level).
+    The touch is kept incrementally; a full rescan only happens when the best level is removed.
+    """
+    __slots__ = ('bids', 'asks', 'best_bid', 'best_ask', 'nonce', 'awaiting_snapshot')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, awaiting_snapshot: bool = False):
+        self.bids, self.asks = {}, {}
+        self.best_bid = self.best_ask = None
+        self.nonce = None
+        self.awaiting_snapshot = awaiting_snapshot
+
+    def apply(self, ob: dict) -> bool:
+        """Applies one update. False when it does not continue the previous one (an update was missed)."""
+        begin = ob.get('begin_nonce')
+        if self.nonce is not None and begin is not None and begin != self.nonce:
+            return False
+        self.nonce = ob.get('nonce', self.nonce)
+        self.best_bid = self._apply_side(self.bids, ob.get('bids'), self.best_bid, max)
+        self.best_ask = self._apply_side(self.asks, ob.get('asks'), self.best_ask, min)
+        return True
+
+    @staticmethod
+    def _apply_side(levels: dict, updates, best, pick):
+        if not updates: return best
+        rescan = False
+        for level in updates:
+            price, size = float(level['price']), float(level['size'])
+            if size > 0:
+                levels[price] = size
+                if best is None or pick(price, best) == price: best = price
+            elif levels.pop(price, None) is not None and price == best:
+                rescan = True
+        if rescan: best = pick(levels) if levels else None
+        return best
+
+class HedgeTemplate:
+    """
+    Pre-computed market-order parameters for one Lighter market: everything the hedge path needs
+    except the quantity. Protective prices are integer limits at +/- LIGHTER_HEDGE_PROTECT_SLIPPAGE
+    around the top of book; updated_at is when that book was observed, not when the template was built.
+    """
+    __slots__ = ('market_index', 'size_scale', 'buy_price_int', 'sell_price_int', 'updated_at')
+
+    def __init__(self, market_index: int, size_scale: int, buy_price_int: int, sell_price_int: int, updated_at: float):
+        self.market_index = market_index
+        self.size_scale = size_scale
+        self.buy_price_int = buy_price_int
+        self.sell_price_int = sell_price_int
+        self.updated_at = updated_at
+
 class LighterExchange:
     def __init__(self):
         self.config = Configuration()
@@ -31,12 +119,96 @@ class LighterExchange:
              self.lighter_module = None
         
         self.client = None # Will be initialized async
+        self.nonce_manager = None # Local nonce allocator, created with the SignerClient
+        self.limiter = get_limiter('lighter') # Shared REST budget for every Lighter call
         self.ws_running = False
         self.bbo_cache = {}
+        self._update_listeners = []  # fn(symbol), called on every market_stats update
+        # WS routing: channel -> (handler, MarketSlot), rebuilt from ticker_map (perp markets only)
+        self._dispatch = {}
+        self._slots_by_id = {}
+        self._book_symbols = set()   # perp markets whose order_book channel is subscribed (watch_order_books)
+        self.ws = None
+        self.stats_all = getattr(Config, 'LIGHTER_WS_STATS_ALL', True)
+        self.ws_stats = {'messages': 0, 'unrouted': 0, 'stats_updates': 0, 'book_updates': 0, 'book_resyncs': 0}
+        self._books = {}             # symbol -> LocalBook (order_book channel state)
         self.id_map = {}
         self.ticker_map = {}
         self.market_rules = {}
 
+        # One pooled HTTP session for every REST call (created lazily on the running loop)
+        self._session = None
+        # /account?by=l1_address is shared by balance, leverage and position queries:
+        # a response is reused for LIGHTER_ACCOUNT_CACHE_TTL_SEC and concurrent callers share one request
+        self.account_cache_ttl = getattr(Config, 'LIGHTER_ACCOUNT_CACHE_TTL_SEC', 1.0)
+        self._account_cache = None      # (fetched_at, resp_json)
+        self._account_inflight = None   # asyncio.Task
+        self._account_gen = 0           # bumped on invalidate so an older in-flight response is not cached
+        self.account_stats = {'fetches': 0, 'cache_hits': 0, 'joined': 0}
+
+        # Hedge fast path: per-symbol order templates kept fresh in the background (warm_hedge_template)
+        self.hedge_templates = {}
+        self._template_symbols = set()
+        self._template_task = None
+        self._sign_params = None  # parameter names of SignerClient.sign_create_order, read once
+        self.template_refresh_sec = getattr(Config, 'LIGHTER_TEMPLATE_REFRESH_SEC', 0.5)
+        self.template_max_age = getattr(Config, 'LIGHTER_TEMPLATE_MAX_AGE_SEC', 5.0)
+        self.protect_slippage = getattr(Config, 'LIGHTER_HEDGE_PROTECT_SLIPPAGE', 0.05)
+        self.hedge_stats = {'fast': 0, 'fallback': 0, 'template_refreshes': 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, headers={"accept": "application/json"})
+        return self._session
+
+    async def _get_json(self, url: str, lane: int, timeout: float = 10, raise_for_status: bool = True):
+        """
+        GET through the shared session under the Lighter rate limiter.
+        With raise_for_status=False a non-200 response returns None instead of raising.
+        """
+        await self.limiter.acquire(lane)
+        async with self._get_session().get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if not raise_for_status and response.status != 200:
+                logger.warning(f"[Lighter] GET {url} -> status {response.status}")
+                return None
+            response.raise_for_status()
+            return await response.json()
+
+    async def _fetch_account(self, max_age: float = None):
+        """
+        Returns the /account?by=l1_address response, reusing one younger than max_age (default: cache TTL).
+        Concurrent callers share a single in-flight request; failures are not cached.
+        """
+        max_age = self.account_cache_ttl if max_age is None else max_age
+        cached = self._account_cache
+        if cached and time.monotonic() - cached[0] <= max_age:
+            self.account_stats['cache_hits'] += 1
+            return cached[1]
+        if self._account_inflight is not None and not self._account_inflight.done() and self._account_inflight.gen == self._account_gen:
+            self.account_stats['joined'] += 1
+        else:
+            self._account_inflight = asyncio.ensure_future(self._request_account(self._account_gen))
+            self._account_inflight.gen = self._account_gen
+        # shield: one caller being cancelled must not cancel the request the others are waiting on
+        return await asyncio.shield(self._account_inflight)
+
+    async def _request_account(self, gen):
+        url = f"{self.config.host}/api/v1/account?by=l1_address&value={Config.LIGHTER_WALLET_ADDRESS}"
+        resp_json = await self._get_json(url, ACCOUNT, timeout=10)
+        if gen == self._account_gen: self._account_cache = (time.monotonic(), resp_json)
+        self.account_stats['fetches'] += 1
+        return resp_json
+
+    def invalidate_account(self):
+        """Drops the cached account after our own orders / leverage changes so the next read is fresh."""
+        self._account_cache = None
+        self._account_gen += 1
+
+    def _target_account(self, resp_json):
+        if not resp_json or not resp_json.get('accounts'): return None
+        return next((acc for acc in resp_json['accounts'] if int(acc.get('index', -1)) == self.client.account_index), None)
+
     async def initialize(self):
         """
         Initializes the client, discovers account index, and loads all market data.
@@ -51,14 +223,8 @@ class LighterExchange:
 
         found_idx = -1
         try:
-            import aiohttp
             l1_address = Config.LIGHTER_WALLET_ADDRESS
-            url = f"{self.config.host}/api/v1/account?by=l1_address&value={l1_address}"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={"accept": "application/json"}, timeout=20) as response:
-                    response.raise_for_status()
-                    resp_json = await response.json()
+            resp_json = await self._fetch_account(max_age=0)
 
             if resp_json and resp_json.get('accounts'):
                 data = resp_json['accounts'][0]
@@ -79,13 +245,19 @@ class LighterExchange:
         if pk.startswith("0x"): pk = pk[2:]
         
         try:
-            import inspect
             sig = inspect.signature(self.lighter_module.SignerClient)
             init_kwargs = { "url": self.config.host, "account_index": found_idx, "api_private_keys": {Config.LIGHTER_API_KEY_INDEX: pk} }
             valid_kwargs = {k: v for k, v in init_kwargs.items() if k in sig.parameters}
             self.client = self.lighter_module.SignerClient(**valid_kwargs)
             logger.info(f"LighterExchange SignerClient initialized (Account: {found_idx}).")
 
+            # Nonces are allocated locally so concurrent hedges don't serialize on the SDK's per-call fetch
+            self.nonce_manager = LighterNonceManager(self._fetch_next_nonce, Config.LIGHTER_API_KEY_INDEX)
+            try:
+                await self.nonce_manager.sync()
+            except Exception as e:
+                logger.warning(f"Initial Lighter nonce sync failed ({e}). Will retry on first order.")
+
             # Generate auth token and configure ApiClient
             try:
                 auth_token_result = self.client.create_auth_token_with_expiry()
@@ -108,6 +280,57 @@ class LighterExchange:
         except Exception as e:
              logger.error(f"Failed to init SignerClient or load leverage limits: {e}.")
 
+    async def _fetch_next_nonce(self) -> int:
+        """Reads the server-side next nonce for our account / API key."""
+        url = f"{self.config.host}/api/v1/nextNonce?account_index={self.client.account_index}&api_key_index={Config.LIGHTER_API_KEY_INDEX}"
+        resp_json = await self._get_json(url, ORDER, timeout=5)
+        return int(resp_json['nonce'])
+
+    async def _signed_call(self, method, **kwargs):
+        """
+        Runs a SignerClient tx method with a nonce from the local nonce manager.
+        Falls back to the SDK's own nonce handling if the method doesn't accept one.
+        """
+        if not self.nonce_manager or 'nonce' not in inspect.signature(method).parameters:
+            return await self.limiter.call(ORDER, method, **kwargs)
+        # Take the rate-limit token before the nonce: a nonce held while queued lets later
+        # nonces reach the server first, and Lighter rejects the out-of-order one
+        return await self.nonce_manager.submit(
+            lambda nonce, api_key_index: method(**kwargs, nonce=nonce, api_key_index=api_key_index),
+            before=lambda: self.limiter.acquire(ORDER)
+        )
+
+    async def _signed_send(self, order_kwargs: dict, trace=None):
+        """
+        Signs locally, then sends (sign_create_order + send_tx), so `trace` can mark 'signed'
+        between the two. SDKs without the split API go through create_order in one call.
+        Returns (tx_info, tx_hash, err) like the SDK tx methods.
+        """
+        sign = getattr(self.client, 'sign_create_order', None)
+        send = getattr(self.client, 'send_tx', None)
+        if sign is None or send is None or not self.nonce_manager:
+            return await self._signed_call(self.client.create_order, **order_kwargs)
+        if self._sign_params is None:
+            self._sign_params = set(inspect.signature(sign).parameters)
+
+        async def attempt(nonce, api_key_index):
+            kwargs = dict(order_kwargs, nonce=nonce)
+            if 'api_key_index' in self._sign_params: kwargs['api_key_index'] = api_key_index
+            signed = sign(**kwargs)
+            if asyncio.iscoroutine(signed): signed = await signed
+            # (tx_info, err) on older SDKs, (tx_type, tx_info, tx_hash, err) on newer ones
+            err = signed[-1]
+            if err: return None, None, err
+            tx_info = signed[1] if len(signed) >= 4 else signed[0]
+            if trace is not None: trace.mark('signed')
+            resp = await send(tx_type=self.client.TX_TYPE_CREATE_ORDER, tx_info=tx_info)
+            code = getattr(resp, 'code', 200)
+            if code not in (None, 200):
+                return tx_info, None, getattr(resp, 'message', None) or f"send_tx code {code}"
+            return tx_info, getattr(resp, 'tx_hash', None) or resp, None
+
+        return await self.nonce_manager.submit(attempt, before=lambda: self.limiter.acquire(ORDER))
+
     async def load_markets(self) -> set:
         """
         Fetches market data from two separate endpoints to build a comprehensive map of
@@ -122,11 +345,7 @@ class LighterExchange:
         try:
             # First, get all possible markets from the explorer to populate id_map
             explorer_url = "https://explorer.elliot.ai/api/markets"
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(explorer_url, headers={"accept": "application/json"}, timeout=10) as response:
-                    response.raise_for_status()
-                    markets_data = await response.json()
+            markets_data = await self._get_json(explorer_url, METADATA, timeout=10)
             
             for item in markets_data:
                 symbol = item.get('symbol', '').split('/')[0]
@@ -138,10 +357,7 @@ class LighterExchange:
 
             # Now, get the tradable orderbooks to get correct perp trading IDs
             orderbooks_url = f"{self.config.host}/api/v1/orderBooks"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(orderbooks_url, headers={"accept": "application/json"}, timeout=10) as response:
-                    response.raise_for_status()
-                    orderbooks_data = await response.json()
+            orderbooks_data = await self._get_json(orderbooks_url, METADATA, timeout=10)
 
             if orderbooks_data and 'order_books' in orderbooks_data:
                 for item in orderbooks_data.get('order_books', []):
@@ -171,12 +387,16 @@ class LighterExchange:
 
                             price_decimals = item.get('supported_price_decimals')
                             self.market_rules[ticker]['price_decimals'] = int(price_decimals) if price_decimals is not None else 2 # Default 2
+                            # Integer scales used on the order path
+                            self.market_rules[ticker]['size_scale'] = 10 ** self.market_rules[ticker]['decimals']
+                            self.market_rules[ticker]['price_scale'] = 10 ** self.market_rules[ticker]['price_decimals']
 
                             self.market_rules[ticker]['max_leverage'] = 'N/A'
                 
                 logger.info(f"[Lighter] Loaded trading rules for {len(self.market_rules)} perp markets.")
                 logger.info(f"[Lighter] Loaded market rule keys: {list(self.market_rules.keys())}")
                 logger.info(f"[Lighter] Final ticker map for perp trading: {self.ticker_map}")
+                self._build_dispatch()
         except Exception as e:
             logger.error(f"[Lighter] Failed to load market data: {e}")
         
@@ -222,27 +442,18 @@ class LighterExchange:
         # Attempt to get current leverage from account positions
         if self.client:
             try:
-                l1_address = Config.LIGHTER_WALLET_ADDRESS
-                url = f"{self.config.host}/api/v1/account?by=l1_address&value={l1_address}"
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, headers={"accept": "application/json"}, timeout=5) as response:
-                        response.raise_for_status()
-                        resp_json = await response.json()
-
-                if resp_json and resp_json.get('accounts'):
-                    target_account = next((acc for acc in resp_json['accounts'] if int(acc.get('index', -1)) == self.client.account_index), None)
-                    if target_account and 'positions' in target_account:
-                        for p in target_account['positions']:
-                            pos_symbol = p.get('symbol')
-                            if pos_symbol == base_symbol:
-                                imf_str = p.get('initial_margin_fraction')
-                                if imf_str:
-                                    try:
-                                        current_leverage = 100 / float(imf_str)
-                                    except (ValueError, ZeroDivisionError):
-                                        pass
-                                break
+                target_account = self._target_account(await self._fetch_account())
+                if target_account and 'positions' in target_account:
+                    for p in target_account['positions']:
+                        pos_symbol = p.get('symbol')
+                        if pos_symbol == base_symbol:
+                            imf_str = p.get('initial_margin_fraction')
+                            if imf_str:
+                                try:
+                                    current_leverage = 100 / float(imf_str)
+                                except (ValueError, ZeroDivisionError):
+                                    pass
+                            break
             except Exception as e:
                 logger.warning(f"Could not fetch current leverage for Lighter {symbol}: {e}")
 
@@ -275,42 +486,33 @@ class LighterExchange:
 
         # 1. Fetch Position & Account Data
         try:
-            l1_address = Config.LIGHTER_WALLET_ADDRESS
-            url = f"{self.config.host}/api/v1/account?by=l1_address&value={l1_address}"
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={"accept": "application/json"}, timeout=5) as response:
-                    if response.status == 200:
-                        resp_json = await response.json()
-                        if resp_json and resp_json.get('accounts'):
-                            target_account = next((acc for acc in resp_json['accounts'] if int(acc.get('index', -1)) == self.client.account_index), None)
-                            
-                            if target_account and 'positions' in target_account:
-                                for p in target_account['positions']:
-                                    if p.get('symbol') == base_symbol:
-                                        # logger.info(f"Raw Position Data for {base_symbol}: {p}") # Debug log
-                                        
-                                        raw_size = float(p.get('position', 0))
-                                        sign = int(p.get('sign', 1))
-                                        # Lighter: sign 1 for Long, -1 for Short, 0 for Flat? Let's check logs.
-                                        # Log shows sign: 1 for Positive.
-                                        # If raw_size is absolute, we apply sign.
-                                        details['size'] = raw_size * sign
-                                        
-                                        details['entry_price'] = float(p.get('avg_entry_price', 0)) # Mapped from 'avg_entry_price'
-                                        details['unrealized_pnl'] = float(p.get('unrealized_pnl', 0))
-                                        
-                                        # Calculate Leverage & Margin
-                                        imf_str = p.get('initial_margin_fraction')
-                                        if imf_str:
-                                            try:
-                                                imf = float(imf_str)
-                                                if imf > 0:
-                                                    details['leverage'] = round(100 / imf, 2)
-                                                    # Margin Used ~= size * entry_price / leverage
-                                                    details['margin_used'] = abs(details['size'] * details['entry_price'] / details['leverage'])
-                                            except: pass
-                                        break
+            target_account = self._target_account(await self._fetch_account())
+            if target_account and 'positions' in target_account:
+                for p in target_account['positions']:
+                    if p.get('symbol') == base_symbol:
+                        # logger.info(f"Raw Position Data for {base_symbol}: {p}") # Debug log
+
+                        raw_size = float(p.get('position', 0))
+                        sign = int(p.get('sign', 1))
+                        # Lighter: sign 1 for Long, -1 for Short, 0 for Flat? Let's check logs.
+                        # Log shows sign: 1 for Positive.
+                        # If raw_size is absolute, we apply sign.
+                        details['size'] = raw_size * sign
+
+                        details['entry_price'] = float(p.get('avg_entry_price', 0)) # Mapped from 'avg_entry_price'
+                        details['unrealized_pnl'] = float(p.get('unrealized_pnl', 0))
+
+                        # Calculate Leverage & Margin
+                        imf_str = p.get('initial_margin_fraction')
+                        if imf_str:
+                            try:
+                                imf = float(imf_str)
+                                if imf > 0:
+                                    details['leverage'] = round(100 / imf, 2)
+                                    # Margin Used ~= size * entry_price / leverage
+                                    details['margin_used'] = abs(details['size'] * details['entry_price'] / details['leverage'])
+                            except: pass
+                        break
         except Exception as e:
             logger.error(f"Error fetching account details for {symbol}: {e}")
 
@@ -324,20 +526,18 @@ class LighterExchange:
                 funding_url = f"{self.config.host}/api/v1/fundingRate?market_id={market_id}" 
                 # OR check if it's in orderbook snapshot
                 
-                async with aiohttp.ClientSession() as session:
-                     async with session.get(funding_url, headers={"accept": "application/json"}, timeout=5) as fr_response:
-                         if fr_response.status == 200:
-                             fr_data = await fr_response.json()
-                             # Parse funding data if available
-                             # This depends on actual API response format which we might need to verify
-                             # Let's try to get 'rate' and 'next_funding_time'
-                             if 'rate' in fr_data:
-                                 details['funding_rate'] = float(fr_data['rate'])
-                             if 'next_funding_timestamp' in fr_data:
-                                 # Convert timestamp to human readable
-                                 import datetime
-                                 ts = int(fr_data['next_funding_timestamp'])
-                                 details['next_funding_time'] = datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+                fr_data = await self._get_json(funding_url, METADATA, timeout=5, raise_for_status=False)
+                if fr_data:
+                    # Parse funding data if available
+                    # This depends on actual API response format which we might need to verify
+                    # Let's try to get 'rate' and 'next_funding_time'
+                    if 'rate' in fr_data:
+                        details['funding_rate'] = float(fr_data['rate'])
+                    if 'next_funding_timestamp' in fr_data:
+                        # Convert timestamp to human readable
+                        import datetime
+                        ts = int(fr_data['next_funding_timestamp'])
+                        details['next_funding_time'] = datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
 
         except Exception as e:
             logger.warning(f"Could not fetch funding rate for {symbol} (Optional): {e}")
@@ -347,16 +547,10 @@ class LighterExchange:
     async def get_balance(self):
         if not self.client: return {'equity': 0, 'available': 0, 'positions': []}
         try:
-            l1_address = Config.LIGHTER_WALLET_ADDRESS
-            url = f"{self.config.host}/api/v1/account?by=l1_address&value={l1_address}"
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={"accept": "application/json"}, timeout=10) as response:
-                    response.raise_for_status()
-                    resp_json = await response.json()
+            resp_json = await self._fetch_account()
 
             if resp_json and resp_json.get('accounts'):
-                target_account = next((acc for acc in resp_json['accounts'] if int(acc.get('index', -1)) == self.client.account_index), None)
+                target_account = self._target_account(resp_json)
                 if not target_account: return {'equity': 0, 'available': 0, 'positions': []}
 
                 # Fallback for Max Leverage if accountLimits failed
@@ -381,45 +575,175 @@ class LighterExchange:
             logger.error(f"Error fetching Lighter balance: {e}")
             return {'equity': 0, 'available': 0, 'positions': []}
 
+    # ------------------------------------------------------------------
+    # WebSocket
+    # ------------------------------------------------------------------
+    def _build_dispatch(self):
+        """One MarketSlot per perp market and the channel -> (handler, slot) table used by start_ws."""
+        self._dispatch, self._slots_by_id = {}, {}
+        for symbol, mid in self.ticker_map.items():
+            slot = self.bbo_cache.get(symbol)
+            if not isinstance(slot, MarketSlot):
+                slot = self.bbo_cache[symbol] = MarketSlot(symbol, mid)
+            self._slots_by_id[str(mid)] = slot
+            self._dispatch[f"order_book:{mid}"] = (self._apply_book, slot)
+            self._dispatch[f"market_stats:{mid}"] = (self._apply_stats, slot)
+
+    def _apply_book(self, slot: MarketSlot, data: dict):
+        book = self._books.get(slot.symbol)
+        if book is None:
+            book = self._books[slot.symbol] = LocalBook()
+        if str(data.get('type', '')).startswith('subscribed'):
+            book.reset()  # (re)subscription snapshot
+        elif book.awaiting_snapshot:
+            return
+        if not book.apply(data.get('order_book') or {}):
+            # Missed an update: the touch can't be trusted until a fresh snapshot arrives
+            book.reset(awaiting_snapshot=True)
+            slot.bid = slot.ask = None
+            slot.book_at = 0.0
+            self.ws_stats['book_resyncs'] += 1
+            logger.warning(f"[Lighter] order_book gap on {slot.symbol}; resubscribing for a new snapshot.")
+            asyncio.ensure_future(self._resubscribe_book(slot.market_id))
+            return
+        slot.bid, slot.ask = book.best_bid, book.best_ask
+        slot.book_at = time.monotonic()
+        self.ws_stats['book_updates'] += 1
+
+    async def _resubscribe_book(self, market_id: int):
+        ws = self.ws
+        if ws is None: return  # the reconnect subscribes (and snapshots) again
+        try:
+            await ws.send(json.dumps({"type": "unsubscribe", "channel": f"order_book/{market_id}"}))
+            await self._send_subscribe(ws, [f"order_book/{market_id}"])
+        except Exception as e:
+            logger.warning(f"[Lighter] order_book resubscribe failed for market {market_id}: {e}")
+
+    def _apply_stats(self, slot: MarketSlot, data: dict):
+        self._apply_stats_fields(slot, data.get('market_stats') or {})
+
+    def _apply_stats_fields(self, slot: MarketSlot, stats: dict):
+        v = stats.get('last_trade_price')
+        if v: slot.price = float(v)
+        v = stats.get('funding_rate')
+        if v: slot.funding_rate = float(v)
+        v = stats.get('funding_timestamp')
+        if v: slot.next_funding_time = v
+        v = stats.get('index_price')
+        if v: slot.index_price = float(v)
+        v = stats.get('mark_price')
+        if v: slot.mark_price = float(v)
+        slot.updated_at = time.monotonic()
+        self.ws_stats['stats_updates'] += 1
+        for fn in self._update_listeners: fn(slot.symbol)
+
+    def _apply_all_stats(self, data: dict):
+        """market_stats/all: one message carries the stats of many markets (keyed by market id)."""
+        payload = data.get('market_stats') or {}
+        items = payload.values() if isinstance(payload, dict) else payload
+        if isinstance(payload, dict) and 'market_id' in payload: items = (payload,)
+        for stats in items:
+            if not isinstance(stats, dict): continue
+            slot = self._slots_by_id.get(str(stats.get('market_id')))
+            if slot is not None: self._apply_stats_fields(slot, stats)
+
+    def _channels(self) -> list:
+        if self.stats_all:
+            channels = ["market_stats/all"]
+        else:
+            channels = [f"market_stats/{mid}" for mid in self.ticker_map.values()]
+        channels += [f"order_book/{self.ticker_map[s]}" for s in self._book_symbols if s in self.ticker_map]
+        return channels
+
+    async def _send_subscribe(self, ws, channels):
+        for channel in channels:
+            await ws.send(json.dumps({"type": "subscribe", "channel": channel}))
+
+    async def watch_order_books(self, symbols):
+        """Adds perp markets to the order_book subscriptions (sent now if connected, else on connect)."""
+        new = []
+        for symbol in symbols:
+            base = symbol.split('-')[0]
+            if base in self._book_symbols or base not in self.ticker_map: continue
+            self._book_symbols.add(base)
+            new.append(f"order_book/{self.ticker_map[base]}")
+        if new and self.ws is not None:
+            try:
+                await self._send_subscribe(self.ws, new)
+            except Exception as e:
+                logger.warning(f"[Lighter] order_book subscribe failed (retried on reconnect): {e}")
+
     async def start_ws(self):
         self.ws_running = True
         ws_url = "wss://mainnet.zklighter.elliot.ai/stream" if Config.LIGHTER_ENV == "MAINNET" else "wss://testnet.zklighter.elliot.ai/stream"
-        logger.info(f"[Lighter] Starting WebSocket for {len(self.id_map)} markets...")
+        if not self.ticker_map:
+            await self.load_markets()
+        self._build_dispatch()
+        logger.info(f"[Lighter] Starting WebSocket for {len(self.ticker_map)} perp markets "
+                    f"({'market_stats/all' if self.stats_all else 'per-market stats'}, {len(self._book_symbols)} order books)...")
         while self.ws_running:
             try:
                 async with websockets.connect(ws_url, ping_interval=20, ping_timeout=60) as ws:
                     self.ws = ws
-                    for mid in self.id_map.keys():
-                        await ws.send(json.dumps({"type": "subscribe", "channel": f"order_book/{mid}"}))
-                        await ws.send(json.dumps({"type": "subscribe", "channel": f"market_stats/{mid}"}))
+                    for book in self._books.values(): book.reset()  # every subscription starts with a snapshot
+                    await self._send_subscribe(ws, self._channels())
                     async for msg in ws:
                         if not self.ws_running: break
                         try:
                             data = json.loads(msg)
-                            if data.get('type') == 'ping': await ws.send(json.dumps({"type": "pong"})); continue
-                            
-                            channel = data.get('channel', '')
-                            if not channel: continue
-                            channel_type, mid_str = channel.split(':')
-                            mid = int(mid_str)
-                            ticker = self.id_map.get(mid)
-                            if not ticker: continue
-                            
-                            self.bbo_cache.setdefault(ticker, {})
-                            if channel_type == 'order_book':
-                                ob = data.get('order_book', {})
-                                bids, asks = ob.get('bids', []), ob.get('asks', [])
-                                if bids: self.bbo_cache[ticker]['bid'] = float(bids[0]['price'])
-                                if asks: self.bbo_cache[ticker]['ask'] = float(asks[0]['price'])
-                            elif channel_type == 'market_stats':
-                                stats = data.get('market_stats', {})
-                                if stats.get('last_trade_price'): self.bbo_cache[ticker]['price'] = float(stats['last_trade_price'])
-                                if stats.get('funding_rate'): self.bbo_cache[ticker]['funding_rate'] = float(stats['funding_rate'])
-                                if stats.get('funding_timestamp'): self.bbo_cache[ticker]['next_funding_time'] = stats['funding_timestamp']
+                            self.ws_stats['messages'] += 1
+                            channel = data.get('channel')
+                            if not channel:
+                                msg_type = data.get('type')
+                                if msg_type == 'ping': await ws.send(json.dumps({"type": "pong"}))
+                                elif msg_type == 'error':
+                                    if self.stats_all and 'market_stats/all' in msg:
+                                        # Aggregated stats channel not available: fall back to one per perp market
+                                        logger.warning(f"[Lighter] WS error {data}; subscribing market_stats per market.")
+                                        self.stats_all = False
+                                        await self._send_subscribe(ws, [f"market_stats/{mid}" for mid in self.ticker_map.values()])
+                                    else:
+                                        logger.warning(f"[Lighter] WS error: {data}")
+                                continue
+                            entry = self._dispatch.get(channel)
+                            if entry is not None:
+                                entry[0](entry[1], data)
+                            elif channel == 'market_stats:all':
+                                self._apply_all_stats(data)
+                            else:
+                                self.ws_stats['unrouted'] += 1
                         except Exception: pass
             except Exception as e:
                 logger.error(f"Lighter WebSocket connection error: {e}")
                 await asyncio.sleep(5)
+            finally:
+                self.ws = None
+
+    async def get_funding_history(self, symbol: str, start_ts: int, end_ts: int = None) -> list:
+        """
+        Hourly settled funding for a perp market between unix seconds [start_ts, end_ts], oldest first:
+        [(timestamp_sec, rate_pct_per_hour), ...]. 'direction' == 'short' means shorts paid (negative rate).
+        """
+        market_id = self.ticker_map.get(symbol)
+        if market_id is None: return []
+        end_ts = end_ts or int(time.time())
+        count = max(int((end_ts - start_ts) // 3600) + 1, 1)
+        url = (f"{self.config.host}/api/v1/fundings?market_id={market_id}&resolution=1h"
+               f"&start_timestamp={int(start_ts)}&end_timestamp={int(end_ts)}&count_back={count}")
+        data = await self._get_json(url, METADATA, timeout=10, raise_for_status=False)
+        out = []
+        for f in (data or {}).get('fundings', []):
+            try:
+                rate = abs(float(f['rate']))
+                out.append((int(f['timestamp']), -rate if f.get('direction') == 'short' else rate))
+            except (KeyError, TypeError, ValueError):
+                continue
+        out.sort()
+        return out
+
+    def add_update_listener(self, fn):
+        """Registers fn(symbol), called (synchronously, keep it cheap) whenever a market_stats update lands."""
+        self._update_listeners.append(fn)
 
     async def get_market_stats(self, symbol):
         # Cache usually keyed by full symbol e.g. "ETH-USDT"
@@ -445,8 +769,11 @@ class LighterExchange:
 
     async def close(self):
         self.ws_running = False
-        if hasattr(self, 'ws') and self.ws: await self.ws.close()
+        self._template_symbols.clear()
+        if self._template_task is not None and not self._template_task.done(): self._template_task.cancel()
+        if self.ws is not None: await self.ws.close()
         if self.client and hasattr(self.client, 'api_client'): await self.client.api_client.close()
+        if self._session is not None and not self._session.closed: await self._session.close()
         logger.info("LighterExchange resources closed.")
 
     async def set_leverage(self, symbol: str, leverage: int, margin_mode: str = 'cross'):
@@ -482,7 +809,8 @@ class LighterExchange:
             
             # The signer_client's update_leverage method handles the API call
             # Returns: (tx, tx_hash, err)
-            tx, tx_hash, err = await self.client.update_leverage(
+            tx, tx_hash, err = await self._signed_call(
+                self.client.update_leverage,
                 market_index=market_index,
                 margin_mode=mode_int,
                 leverage=leverage
@@ -492,6 +820,7 @@ class LighterExchange:
                 logger.error(f"[Error] Failed to set Lighter leverage for {base_symbol}. Error: {err}")
                 return False
             
+            self.invalidate_account()
             if tx_hash:
                 logger.info(f"[Success] Successfully submitted Lighter leverage update for {base_symbol}. Tx Hash: {tx_hash}")
                 return True
@@ -508,20 +837,15 @@ class LighterExchange:
     async def get_funding_rate(self, symbol: str):
         try:
             funding_api = self.lighter_module.FundingApi(self.api_client)
-            return await funding_api.funding_rates()
+            return await self.limiter.call(METADATA, funding_api.funding_rates)
         except Exception as e:
             logger.error(f"Error fetching Lighter funding rate: {e}")
             return None
 
     async def get_recent_trades_direct(self, market_id: int):
         try:
-            host = "https://mainnet.zklighter.elliot.ai" if Config.LIGHTER_ENV == "MAINNET" else "https://testnet.zklighter.elliot.ai"
-            url = f"{host}/api/v1/recentTrades?market_id={market_id}&limit=1"
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={"accept": "application/json"}, timeout=10) as response:
-                    response.raise_for_status()
-                    return await response.json()
+            url = f"{self.config.host}/api/v1/recentTrades?market_id={market_id}&limit=1"
+            return await self._get_json(url, METADATA, timeout=10)
         except Exception as e:
             logger.error(f"Error fetching Lighter recent trades for ID {market_id}: {e}")
             return None
@@ -543,18 +867,22 @@ class LighterExchange:
                 logger.error(f"[Error] Could not find market_id for Lighter symbol {base_symbol}")
                 return None
             
-            # Generate a client_order_index based on timestamp to ensure uniqueness
-            client_order_index = int(time.time() * 1000)
+            # Strictly increasing client_order_index (wall-time ms can collide under concurrent hedges)
+            if self.nonce_manager:
+                client_order_index = self.nonce_manager.next_client_order_index()
+            else:
+                client_order_index = int(time.time() * 1000)
 
             # Convert amount to integer based on decimals
-            decimals = self.market_rules.get(base_symbol, {}).get('decimals', 18) # Default to 18 if missing
-            amount_int = int(amount * (10 ** decimals))
+            rules = self.market_rules.get(base_symbol, {})
+            size_scale = rules.get('size_scale', 10 ** 18) # Default to 18 decimals if missing
+            amount_int = Utils.to_scaled_int(amount, size_scale)
             
             # Calculate Price (Market Order Emulation)
             price_int = 0
             try:
-                # Get Price Decimals
-                price_decimals = self.market_rules.get(base_symbol, {}).get('price_decimals', 2)
+                # Get Price Scale
+                price_scale = rules.get('price_scale', 100)
                 
                 # Fetch Reference Price
                 ref_price = None
@@ -569,24 +897,19 @@ class LighterExchange:
                     market_id = self.ticker_map.get(base_symbol)
                     if market_id is not None:
                         url = f"{self.config.host}/api/v1/orderBook?market_id={market_id}"
-                        import aiohttp
-                        async with aiohttp.ClientSession() as session:
-                             async with session.get(url, headers={"accept": "application/json"}, timeout=5) as response:
-                                 if response.status == 200:
-                                     ob_data = await response.json()
-                                     # logger.info(f"OrderBook Snapshot for {base_symbol}: {str(ob_data)[:200]}...") # Log start of OB
-                                     
-                                     # Determine generic side for price ref
-                                     # For Buy (Ask), For Sell (Bid)
-                                     target_side = 'asks' if (side.lower() != 'sell') else 'bids'
-                                     target_list = ob_data.get(target_side, [])
-                                     
-                                     if target_list:
-                                         ref_price = float(target_list[0]['price'])
-                                     else:
-                                         logger.warning(f"OrderBook {target_side} empty for {base_symbol}. Full OB keys: {ob_data.keys()}")
-                                 else:
-                                     logger.warning(f"Failed to fetch OrderBook for {base_symbol}: Status {response.status}")
+                        ob_data = await self._get_json(url, ORDER, timeout=5, raise_for_status=False)
+                        if ob_data is not None:
+                            # logger.info(f"OrderBook Snapshot for {base_symbol}: {str(ob_data)[:200]}...") # Log start of OB
+
+                            # Determine generic side for price ref
+                            # For Buy (Ask), For Sell (Bid)
+                            target_side = 'asks' if (side.lower() != 'sell') else 'bids'
+                            target_list = ob_data.get(target_side, [])
+
+                            if target_list:
+                                ref_price = float(target_list[0]['price'])
+                            else:
+                                logger.warning(f"OrderBook {target_side} empty for {base_symbol}. Full OB keys: {ob_data.keys()}")
                 
                 # 3. Fallback to hardcoded safe values if still None (Network error etc)
                 if not ref_price:
@@ -604,7 +927,7 @@ class LighterExchange:
                     final_price = ref_price * 0.95
                 
                 # Convert to integer
-                price_int = int(final_price * (10 ** price_decimals))
+                price_int = Utils.to_scaled_int(final_price, price_scale)
                 if price_int < 1: price_int = 1 # Minimum 1
                 
                 logger.info(f"Market Order {base_symbol} {side}: Ref Price {ref_price}, Final Price {final_price}, Int Price {price_int}")
@@ -616,7 +939,8 @@ class LighterExchange:
 
             # Using the general `create_order` to pass the `reduce_only` flag.
             # For market orders, price is 0, and time_in_force is IMMEDIATE_OR_CANCEL.
-            tx, tx_hash, err = await self.client.create_order(
+            tx, tx_hash, err = await self._signed_call(
+                self.client.create_order,
                 market_index=int(market_index),
                 is_ask=(side.lower() == 'sell'),
                 base_amount=amount_int,
@@ -632,11 +956,115 @@ class LighterExchange:
                 logger.error(f"[Error] Lighter Order Error: {err}")
                 return None
             
+            self.invalidate_account()
             return tx_hash
         except Exception as e:
              logger.error(f"[Error] Lighter Order Exception: {e}", exc_info=True)
              return None
 
+    # ------------------------------------------------------------------
+    # Hedge fast path
+    # ------------------------------------------------------------------
+    async def _top_of_book(self, base: str, allow_rest: bool):
+        """
+        (bid, ask, as_of): the WS book's touch while the order_book channel keeps it fresh,
+        otherwise (if allowed) one REST fetch stamped with its request time.
+        """
+        slot = self.bbo_cache.get(base)
+        if slot is not None and slot.bid and slot.ask and time.monotonic() - slot.book_at <= self.template_max_age:
+            return slot.bid, slot.ask, slot.book_at
+        if not allow_rest: return None, None, 0.0
+        market_id = self.ticker_map.get(base)
+        url = f"{self.config.host}/api/v1/orderBook?market_id={market_id}"
+        requested_at = time.monotonic()
+        ob = await self._get_json(url, METADATA, timeout=5, raise_for_status=False) or {}
+        bid = float(ob['bids'][0]['price']) if ob.get('bids') else None
+        ask = float(ob['asks'][0]['price']) if ob.get('asks') else None
+        return bid, ask, requested_at
+
+    async def _refresh_template(self, base: str, allow_rest: bool = False):
+        market_index = self.ticker_map.get(base)
+        rules = self.market_rules.get(base)
+        if market_index is None or not rules: return None
+        bid, ask, as_of = await self._top_of_book(base, allow_rest)
+        if not bid or not ask: return None
+        price_scale = rules.get('price_scale', 100)
+        # Stamped with the book's own time, so a template built from a dead feed ages out
+        template = HedgeTemplate(
+            int(market_index), rules.get('size_scale', 10 ** 18),
+            Utils.to_scaled_int(ask * (1 + self.protect_slippage), price_scale, mode='ceil'),
+            max(Utils.to_scaled_int(bid * (1 - self.protect_slippage), price_scale), 1),
+            as_of,
+        )
+        self.hedge_templates[base] = template
+        self.hedge_stats['template_refreshes'] += 1
+        return template
+
+    async def _refresh_templates_loop(self):
+        while self._template_symbols:
+            for base in list(self._template_symbols):
+                try:
+                    t = self.hedge_templates.get(base)
+                    # REST top of book only when the WS cache can't keep the template fresh
+                    stale = t is None or time.monotonic() - t.updated_at > self.template_max_age / 2
+                    await self._refresh_template(base, allow_rest=stale)
+                except Exception as e:
+                    logger.warning(f"[Lighter] Hedge template refresh failed for {base}: {e}")
+            await asyncio.sleep(self.template_refresh_sec)
+
+    async def warm_hedge_template(self, symbol: str):
+        """Starts keeping a hedge template for `symbol` (call before a hedge can be needed)."""
+        base = symbol.split('-')[0]
+        self._template_symbols.add(base)
+        await self.watch_order_books([base])
+        if base not in self.hedge_templates:
+            await self._refresh_template(base, allow_rest=True)
+        if self._template_task is None or self._template_task.done():
+            self._template_task = asyncio.create_task(self._refresh_templates_loop())
+
+    def retain_hedge_templates(self, symbols):
+        """Stops refreshing templates for symbols not in `symbols` (e.g. positions that closed)."""
+        keep = {s.split('-')[0] for s in symbols}
+        for base in self._template_symbols - keep:
+            self._template_symbols.discard(base)
+            self.hedge_templates.pop(base, None)
+
+    async def place_hedge(self, symbol: str, side: str, amount: float, reduce_only: bool = False, trace=None):
+        """
+        Hedge order on the fast path: with a fresh template the fill only scales the quantity,
+        takes a client_order_index and signs/sends. Without one it falls back to the general
+        market order path (which may fetch the order book first).
+        """
+        base = symbol.split('-')[0]
+        t = self.hedge_templates.get(base)
+        if not self.client or not self.nonce_manager or t is None or time.monotonic() - t.updated_at > self.template_max_age:
+            self.hedge_stats['fallback'] += 1
+            return await self._place_general_market_order(symbol, side, amount, reduce_only)
+
+        self.hedge_stats['fast'] += 1
+        is_ask = side.lower() == 'sell'
+        order_kwargs = dict(
+            market_index=t.market_index,
+            client_order_index=self.nonce_manager.next_client_order_index(),
+            base_amount=Utils.to_scaled_int(amount, t.size_scale),
+            price=t.sell_price_int if is_ask else t.buy_price_int,
+            is_ask=is_ask,
+            order_type=self.client.ORDER_TYPE_MARKET,
+            time_in_force=self.client.ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL,
+            reduce_only=reduce_only,
+            order_expiry=0, # Must be 0 for IOC orders
+        )
+        try:
+            tx, tx_hash, err = await self._signed_send(order_kwargs, trace)
+        except Exception as e:
+            logger.error(f"[Error] Lighter Hedge Exception: {e}", exc_info=True)
+            return None
+        if err:
+            logger.error(f"[Error] Lighter Hedge Error: {err}")
+            return None
+        self.invalidate_account()
+        return tx_hash
+
     async def place_market_order(self, symbol: str, side: str, amount: float):
         """Places a standard market order to open or increase a position."""
         logger.info(f"Placing new market order: {side.upper()} {amount} {symbol}")
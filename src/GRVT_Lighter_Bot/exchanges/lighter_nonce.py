@@ -0,0 +1,113 @@
+# Same implementation as Arbitrage_V01_6/utils/lighter_nonce.py. The two bots are deployed and run as
+# separate projects (different config modules and import styles) with no shared package,
+# so keep both copies in step when changing either.
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lighter rejects a tx whose nonce is not exactly the next one for the API key,
+# so any rejected/unknown tx leaves a hole that every later local nonce inherits.
+NONCE_ERROR_MARKERS = ("nonce",)
+
+
+class LighterNonceManager:
+    """
+    Local nonce and client_order_index allocator for one (account, api_key) pair.
+
+    - Syncs with the server's next nonce once (lazily, on first use).
+    - Hands out nonces atomically: allocation is a plain counter bump with no
+      await in between, so concurrent submitters on the same loop never collide.
+    - Recovers from rejections: any failed submission invalidates the current
+      generation and the next acquire re-syncs from the server. Rejections that
+      belong to an older generation are ignored so a burst of in-flight failures
+      triggers a single resync.
+
+    Txs are signed only once their nonce is allocated, never ahead of demand: a pre-signed tx would
+    hold its nonce, and Lighter rejects every later nonce of the key until that tx is sent. Everything
+    but the nonce, client_order_index and quantity is precomputed instead (LighterExchange hedge templates).
+    """
+
+    def __init__(self, fetch_next_nonce: Callable[[], Awaitable[int]], api_key_index: int):
+        self._fetch_next_nonce = fetch_next_nonce
+        self.api_key_index = api_key_index
+        self._next_nonce: Optional[int] = None
+        self._generation = 0
+        self._sync_lock = asyncio.Lock()
+        self._last_client_order_index = 0
+        self.stats = {'issued': 0, 'syncs': 0, 'rejections': 0, 'nonce_errors': 0}
+
+    @staticmethod
+    def is_nonce_error(err) -> bool:
+        if not err: return False
+        text = str(err).lower()
+        return any(marker in text for marker in NONCE_ERROR_MARKERS)
+
+    async def sync(self):
+        """Fetches the server-side next nonce and resets the local counter."""
+        async with self._sync_lock:
+            await self._sync_locked()
+
+    async def _sync_locked(self):
+        nonce = int(await self._fetch_next_nonce())
+        self._next_nonce = nonce
+        self._generation += 1
+        self.stats['syncs'] += 1
+        logger.info(f"[Lighter] Nonce synced (api_key={self.api_key_index}, next={nonce}, gen={self._generation})")
+
+    async def acquire(self) -> Tuple[int, int]:
+        """Returns (nonce, generation). Syncs first if the counter is invalid."""
+        if self._next_nonce is None:
+            async with self._sync_lock:
+                if self._next_nonce is None:
+                    await self._sync_locked()
+        nonce = self._next_nonce
+        self._next_nonce += 1
+        self.stats['issued'] += 1
+        return nonce, self._generation
+
+    def on_rejected(self, generation: int, err=None):
+        """Invalidates the counter once per generation after a failed submission."""
+        self.stats['rejections'] += 1
+        if self.is_nonce_error(err): self.stats['nonce_errors'] += 1
+        if generation != self._generation or self._next_nonce is None:
+            return
+        self._next_nonce = None
+        logger.warning(f"[Lighter] Nonce counter invalidated after rejection (gen={generation}): {err}")
+
+    def next_client_order_index(self) -> int:
+        """Strictly increasing client_order_index seeded from wall time (ms)."""
+        candidate = int(time.time() * 1000)
+        if candidate <= self._last_client_order_index:
+            candidate = self._last_client_order_index + 1
+        self._last_client_order_index = candidate
+        return candidate
+
+    async def submit(self, send: Callable[[int, int], Awaitable[tuple]], retries: int = 1,
+                     before: Optional[Callable[[], Awaitable]] = None):
+        """
+        Runs `send(nonce, api_key_index)` (an SDK call returning (tx, tx_hash, err))
+        with a locally allocated nonce. Nonce errors are retried with a fresh nonce
+        after resync; other errors are returned to the caller as-is.
+        `before` (e.g. a rate-limit wait) is awaited ahead of every nonce allocation,
+        so no nonce is held while the caller is queued behind later ones.
+        """
+        result = (None, None, "nonce manager: no attempt made")
+        for _ in range(retries + 1):
+            if before is not None:
+                await before()
+            nonce, generation = await self.acquire()
+            try:
+                result = await send(nonce, self.api_key_index)
+            except Exception as e:
+                self.on_rejected(generation, e)
+                raise
+            err = result[2] if isinstance(result, tuple) and len(result) > 2 else None
+            if not err:
+                return result
+            self.on_rejected(generation, err)
+            if not self.is_nonce_error(err):
+                return result
+        return result
@@ -0,0 +1,163 @@
+# Same implementation as Arbitrage_V01_6/utils/rate_limiter.py. The two bots are deployed and run as
+# separate projects (different config modules and import styles) with no shared package,
+# so keep both copies in step when changing either.
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, Optional
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, lower value is served first.
+ORDER, CANCEL, ACCOUNT, METADATA = 0, 1, 2, 3
+LANE_NAMES = {ORDER: 'order', CANCEL: 'cancel', ACCOUNT: 'account', METADATA: 'metadata'}
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every REST caller of one exchange.
+
+    - Tokens refill at `rate_per_sec` up to `burst`.
+    - Waiters are served strictly by lane (orders > cancels > account reads > metadata),
+      FIFO within a lane.
+    - Lower lanes may only spend tokens above their reserved fraction of the bucket,
+      so background polling cannot drain the budget an order is about to need.
+    - A single loop.call_later timer wakes the queue when the head waiter can be served.
+    """
+
+    def __init__(self, name: str, rate_per_sec: float, burst: float, reserve: Optional[Dict[str, float]] = None):
+        self.name = name
+        self.rate = max(float(rate_per_sec), 1e-6)
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        reserve = reserve or {}
+        self.reserve = {lane: reserve.get(LANE_NAMES[lane], 0.0) * self.capacity for lane in LANE_NAMES}
+        self._waiters = []  # (lane, seq, cost, future, enqueued_at)
+        self._seq = itertools.count()
+        self._timer = None
+        self.metrics = {
+            lane: {'requests': 0, 'queued': 0, 'total_wait_sec': 0.0, 'max_wait_sec': 0.0, 'depth': 0, 'max_depth': 0}
+            for lane in LANE_NAMES
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _can_take(self, lane: int, cost: float) -> bool:
+        return self.tokens - cost >= self.reserve[lane] - 1e-9
+
+    def available(self, lane: int) -> float:
+        """Tokens `lane` could spend right now without queueing (0 while other requests are waiting)."""
+        self._refill()
+        if self._waiters: return 0.0
+        return max(self.tokens - self.reserve[lane], 0.0)
+
+    async def acquire(self, lane: int = METADATA, cost: float = 1.0) -> float:
+        """Waits for `cost` tokens in the given lane. Returns the time spent queued (seconds)."""
+        # A cost larger than the usable bucket could never be served
+        cost = min(float(cost), max(self.capacity - self.reserve[lane], 1.0))
+        m = self.metrics[lane]
+        m['requests'] += 1
+        self._refill()
+        if (not self._waiters or self._waiters[0][0] > lane) and self._can_take(lane, cost):
+            self.tokens -= cost
+            return 0.0
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._seq), cost, fut, time.monotonic()))
+        m['queued'] += 1
+        m['depth'] += 1
+        m['max_depth'] = max(m['max_depth'], m['depth'])
+        self._schedule()
+        try:
+            return await fut
+        finally:
+            if fut.cancelled(): m['depth'] -= 1
+
+    def _schedule(self):
+        if self._timer is not None or not self._waiters:
+            return
+        lane, _, cost, _, _ = self._waiters[0]
+        deficit = cost + self.reserve[lane] - self.tokens
+        self._timer = asyncio.get_running_loop().call_later(max(deficit / self.rate, 0.001), self._drain)
+
+    def _drain(self):
+        self._timer = None
+        self._refill()
+        now = time.monotonic()
+        while self._waiters:
+            lane, _, cost, fut, enqueued_at = self._waiters[0]
+            if fut.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_take(lane, cost):
+                break
+            heapq.heappop(self._waiters)
+            self.tokens -= cost
+            waited = now - enqueued_at
+            m = self.metrics[lane]
+            m['depth'] -= 1
+            m['total_wait_sec'] += waited
+            m['max_wait_sec'] = max(m['max_wait_sec'], waited)
+            if waited > 1.0:
+                logger.warning(f"[{self.name}] {LANE_NAMES[lane]} request queued {waited:.2f}s by rate limit")
+            fut.set_result(waited)
+        self._schedule()
+
+    async def call(self, lane: int, fn, *args, cost: float = 1.0, **kwargs):
+        """Acquires tokens, then runs `fn(*args, **kwargs)` (awaited if it returns a coroutine)."""
+        await self.acquire(lane, cost)
+        res = fn(*args, **kwargs)
+        if asyncio.iscoroutine(res) or isinstance(res, asyncio.Future):
+            res = await res
+        return res
+
+    async def to_thread(self, lane: int, fn, *args, cost: float = 1.0, **kwargs):
+        """Acquires tokens, then runs a blocking SDK call in a worker thread."""
+        await self.acquire(lane, cost)
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for lane, m in self.metrics.items():
+            if not m['requests']:
+                continue
+            avg_ms = m['total_wait_sec'] / m['queued'] * 1000 if m['queued'] else 0.0
+            out[LANE_NAMES[lane]] = {
+                'requests': m['requests'], 'queued': m['queued'], 'depth': m['depth'],
+                'max_depth': m['max_depth'], 'avg_wait_ms': round(avg_ms, 1),
+                'max_wait_ms': round(m['max_wait_sec'] * 1000, 1),
+            }
+        return out
+
+
+_LIMITERS: Dict[str, RateLimiter] = {}
+
+
+def get_limiter(exchange: str) -> RateLimiter:
+    """Returns the process-wide limiter for an exchange ('grvt', 'lighter'), configured from Config.RATE_LIMITS."""
+    limiter = _LIMITERS.get(exchange)
+    if limiter is None:
+        limits = getattr(Config, 'RATE_LIMITS', {})
+        default = limits.get('default', {})
+        cfg = {**default, **limits.get(exchange, {})}
+        limiter = _LIMITERS[exchange] = RateLimiter(
+            exchange, cfg.get('rate_per_sec', 5.0), cfg.get('burst', 10), cfg.get('reserve')
+        )
+    return limiter
+
+
+def rate_limit_summary() -> Dict[str, dict]:
+    """Per-lane queueing metrics keyed by '<exchange>/<lane>'."""
+    return {
+        f"{name}/{lane}": m
+        for name, limiter in _LIMITERS.items()
+        for lane, m in limiter.summary().items()
+    }
@@ -51,6 +51,10 @@ class ArbitrageBot:
         # Start Lighter WS (Background)
         asyncio.create_task(self.lighter.start_ws())
 
+        # Hedge templates for positions restored from state, so their next fill takes the fast path
+        for pos in self.state.get_active_positions():
+            await self.lighter.warm_hedge_template(pos.lighter_symbol)
+
     async def ws_fill_callback(self, msg):
         """
         Routes GRVT WS messages to PositionManager.
@@ -64,15 +68,14 @@ class ArbitrageBot:
 
     async def run(self):
         await self.initialize()
+        self.state.start()
         
         # Start GRVT WS
         logger.info("Starting GRVT WebSocket...")
         ws_task = asyncio.create_task(self.grvt.listen_fills(self.ws_fill_callback))
         
-        # Start Position Monitor (Partial Fills & Rotation & Timeouts)
-        monitor_task = asyncio.create_task(self.pm.monitor_fills())
-        timeout_task = asyncio.create_task(self._monitor_timeouts())
-        logger.info("Position & Timeout Monitors Started.")
+        # Hedge retries and order timeouts are timer/event driven; only restored pending hedges need a kick
+        self.pm.hedger.resume(self.state.get_active_positions())
         
         logger.info("Bot Started. Entering Main Loop (LIVE MODE)...")
         try:
@@ -91,6 +94,18 @@ class ArbitrageBot:
                 opps = await self.scanner.scan()
                 await self.dashboard.print_dashboard()
                 
+                # Keep the WS ticker cache warm for likely entries and open positions
+                watch = getattr(Config, 'GRVT_TICKER_WATCH_TOP', 5)
+                await self.grvt.watch_tickers([o.grvt_symbol for o in opps[:watch]] + [p.grvt_symbol for p in active_pos])
+                self.lighter.retain_hedge_templates([p.lighter_symbol for p in active_pos])
+                await self.lighter.watch_order_books([o.lighter_symbol for o in opps[:watch]] + [p.lighter_symbol for p in active_pos])
+                # Open positions (including ones restored from state) keep a hedge template; no-op once warm
+                for p in active_pos:
+                    try:
+                        await self.lighter.warm_hedge_template(p.lighter_symbol)
+                    except Exception as e:
+                        logger.warning(f"Hedge template warm-up failed for {p.lighter_symbol}: {e}")
+                
                 if len(active_pos) < limit and opps:
                         best_opp = opps[0]
                         logger.info(f"Opportunity Found: {best_opp.symbol} Spread: {best_opp.spread:.6f} Dir: {best_opp.direction}")
@@ -133,15 +148,10 @@ class ArbitrageBot:
             logger.error(f"Main Loop Error: {e}", exc_info=True)
         finally:
             self.running = False
+            await self.state.close()
             await self.grvt.close()
             await self.lighter.close()
             if not ws_task.done(): ws_task.cancel()
-            if not monitor_task.done(): monitor_task.cancel()
-
-    async def _monitor_timeouts(self):
-        while self.running:
-            await self.pm.check_order_timeouts()
-            await asyncio.sleep(10)
 
 def handle_sigint(signum, frame):
     logging.info("Stopping Bot...")
@@ -1,13 +1,17 @@
+import asyncio
 import json
 import logging
 import os
 import time
 from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
+
+from ..config import Config
 
 logger = logging.getLogger(__name__)
 
 STATE_FILE = "data/bot_state.json"
+STATE_LOG_FILE = "data/bot_state.log"
 
 @dataclass
 class DualPosition:
@@ -24,56 +28,100 @@ class DualPosition:
     funding_collected_count: int = 0
     last_update: float = 0.0
 
+_POSITION_FIELDS = {f.name for f in fields(DualPosition)}
+
+def _to_position(pdata: dict) -> DualPosition:
+    # Older files may miss newer fields (defaults apply) or carry removed ones (dropped)
+    return DualPosition(**{k: v for k, v in pdata.items() if k in _POSITION_FIELDS})
+
 class BotState:
+    """
+    Position state store: snapshot file + append-only delta log.
+
+    - add/update/remove only change memory and mark the position dirty; the fill path never touches disk.
+    - An async flusher (start()) writes the latest version of each dirty position as one JSON line
+      every STATE_FLUSH_INTERVAL_SEC, in a worker thread, with a single fsync per batch.
+    - Once the log holds STATE_COMPACT_EVERY records it is folded into the snapshot
+      (written to a temp file and swapped in with os.replace), then truncated.
+    - load() reads the snapshot and replays the log on top. Records are full put/delete operations,
+      so replaying a log that was already folded into the snapshot is harmless.
+    """
     def __init__(self):
         self.positions: Dict[str, DualPosition] = {}
-        self.file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), STATE_FILE)
+        root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        self.file_path = os.path.join(root, STATE_FILE)
+        self.log_path = os.path.join(root, STATE_LOG_FILE)
+        self.flush_interval = getattr(Config, 'STATE_FLUSH_INTERVAL_SEC', 0.5)
+        self.compact_every = getattr(Config, 'STATE_COMPACT_EVERY', 500)
+        self._dirty: Dict[str, bool] = {}   # position id -> True (put) / False (delete), insertion ordered
+        self._log_records = 0
+        self._flusher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats = {'flushes': 0, 'records': 0, 'compactions': 0, 'errors': 0, 'last_flush_ms': 0.0}
         self.load()
 
+    # ------------------------------------------------------------------
+    # Load
+    # ------------------------------------------------------------------
     def load(self):
-        """Load state from JSON file."""
-        if not os.path.exists(self.file_path):
-            logger.info("No existing state file found. Starting fresh.")
-            return
-
-        try:
-            with open(self.file_path, 'r') as f:
-                data = json.load(f)
+        """Load snapshot, then replay the delta log on top of it."""
+        if os.path.exists(self.file_path):
+            try:
+                with open(self.file_path, 'r') as f:
+                    data = json.load(f)
                 for pid, pdata in data.get('positions', {}).items():
-                    # Check for missing fields in loaded data (migration)
-                    if 'pending_hedge_qty' not in pdata:
-                        pdata['pending_hedge_qty'] = 0.0
-                    self.positions[pid] = DualPosition(**pdata)
-            logger.info(f"Loaded {len(self.positions)} active positions from state.")
-        except Exception as e:
-            logger.error(f"Failed to load bot state: {e}")
+                    self.positions[pid] = _to_position(pdata)
+            except Exception as e:
+                logger.error(f"Failed to load bot state snapshot: {e}")
 
-    def save(self):
-        """Save state to JSON file."""
-        try:
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-            data = {
-                'positions': {pid: asdict(p) for pid, p in self.positions.items()},
-                'updated_at': time.time()
-            }
-            with open(self.file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save bot state: {e}")
+        replayed = 0
+        if os.path.exists(self.log_path):
+            try:
+                with open(self.log_path, 'r') as f:
+                    for line in f:
+                        if not line.strip(): continue
+                        try:
+                            rec = json.loads(line)
+                        except ValueError:
+                            logger.warning("Skipping torn record at the end of the state log.")
+                            continue
+                        if rec.get('op') == 'put':
+                            pos = _to_position(rec['pos'])
+                            self.positions[pos.id] = pos
+                        elif rec.get('op') == 'del':
+                            self.positions.pop(rec.get('id'), None)
+                        replayed += 1
+            except Exception as e:
+                logger.error(f"Failed to replay bot state log: {e}")
+        self._log_records = replayed
+
+        if not self.positions and not replayed:
+            logger.info("No existing state file found. Starting fresh.")
+        else:
+            logger.info(f"Loaded {len(self.positions)} active positions from state ({replayed} log records replayed).")
+
+    # ------------------------------------------------------------------
+    # Mutations (memory only)
+    # ------------------------------------------------------------------
+    def _mark(self, position_id: str, put: bool):
+        self._dirty.pop(position_id, None)
+        self._dirty[position_id] = put
+        if self._wakeup is not None:
+            self._wakeup.set()
 
     def add_position(self, position: DualPosition):
         self.positions[position.id] = position
-        self.save()
+        self._mark(position.id, True)
 
     def update_position(self, position: DualPosition):
         position.last_update = time.time()
         self.positions[position.id] = position
-        self.save()
+        self._mark(position.id, True)
 
     def remove_position(self, position_id: str):
         if position_id in self.positions:
             del self.positions[position_id]
-            self.save()
+            self._mark(position_id, False)
 
     def get_active_positions(self) -> List[DualPosition]:
         return [p for p in self.positions.values() if p.status != 'CLOSED']
@@ -81,3 +129,111 @@ class BotState:
     def get_position_by_symbol(self, symbol: str) -> Optional[DualPosition]:
         # Symbol could be base symbol 'XRP'
         return next((p for p in self.positions.values() if p.symbol == symbol and p.status != 'CLOSED'), None)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _drain(self) -> List[str]:
+        """Serialize dirty positions (on the event loop, so dataclasses are not read mid-update)."""
+        dirty, self._dirty = self._dirty, {}
+        lines = []
+        for pid, put in dirty.items():
+            pos = self.positions.get(pid) if put else None
+            if pos is not None:
+                lines.append(json.dumps({'op': 'put', 'pos': asdict(pos)}, separators=(',', ':')))
+            else:
+                lines.append(json.dumps({'op': 'del', 'id': pid}, separators=(',', ':')))
+        return lines
+
+    def _snapshot_payload(self) -> str:
+        data = {
+            'positions': {pid: asdict(p) for pid, p in self.positions.items()},
+            'updated_at': time.time()
+        }
+        return json.dumps(data, separators=(',', ':'))
+
+    def _append_log(self, lines: List[str]):
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_snapshot(self, payload: str):
+        """Atomic snapshot swap, then truncate the log it supersedes."""
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        tmp = f"{self.file_path}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.file_path)
+        with open(self.log_path, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def flush(self):
+        """Write pending deltas (and compact if the log is large). Safe to call any time from the loop."""
+        lines = self._drain()
+        if not lines: return
+        t0 = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._append_log, lines)
+            self._log_records += len(lines)
+            self.stats['records'] += len(lines)
+            self.stats['flushes'] += 1
+            if self._log_records >= self.compact_every:
+                await self.compact()
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Failed to flush bot state: {e}")
+            # Re-queue so the next flush retries (newer marks win)
+            for line in lines:
+                rec = json.loads(line)
+                pid = rec['pos']['id'] if rec['op'] == 'put' else rec['id']
+                self._dirty.setdefault(pid, rec['op'] == 'put')
+            if self._wakeup is not None:
+                self._wakeup.set()
+        self.stats['last_flush_ms'] = (time.perf_counter() - t0) * 1000
+
+    async def compact(self):
+        payload = self._snapshot_payload()
+        await asyncio.to_thread(self._write_snapshot, payload)
+        self._log_records = 0
+        self.stats['compactions'] += 1
+
+    async def _run_flusher(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.sleep(self.flush_interval)  # coalesce bursts of fills into one write
+            await self.flush()
+
+    def start(self):
+        """Start the background flusher (call from the running loop)."""
+        if self._flusher is not None: return
+        self._wakeup = asyncio.Event()
+        if self._dirty: self._wakeup.set()
+        self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def close(self):
+        """Stop the flusher, write what is pending and fold everything into the snapshot."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try: await self._flusher
+            except asyncio.CancelledError: pass
+            self._flusher = None
+        await self.flush()
+        try:
+            await self.compact()
+        except Exception as e:
+            logger.error(f"Failed to compact bot state on close: {e}")
+
+    def save(self):
+        """Synchronous full snapshot (scripts / no event loop). Not for the fill path."""
+        try:
+            self._dirty.clear()
+            self._write_snapshot(self._snapshot_payload())
+            self._log_records = 0
+        except Exception as e:
+            logger.error(f"Failed to save bot state: {e}")
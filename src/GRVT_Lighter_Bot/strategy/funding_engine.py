@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Tuple
+
+from ..exchanges.grvt_api import GrvtExchange
+from ..exchanges.lighter_api import LighterExchange
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+FUNDING_CACHE_FILE = "data/funding_history.json"
+
+class FundingEngine:
+    """
+    Normalizes both venues' funding to hourly rates and estimates the carry of a
+    GRVT/Lighter hedge over the planned holding period.
+
+    - Intervals: GRVT per instrument (instrument metadata, then history records), Lighter hourly.
+    - History: settled rates per venue/symbol, synced incrementally (only records newer than the
+      last cached one) and kept on disk, so a restart does not refetch the whole window.
+    - expected_carry() scores a batch of symbols in one pass over precomputed history means:
+      blended hourly rate = w * current + (1 - w) * historical mean, carry = hold_hours * spread.
+      Symbols without history use the current rate alone.
+    """
+    def __init__(self, grvt: GrvtExchange, lighter: LighterExchange):
+        self.grvt = grvt
+        self.lighter = lighter
+        root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        self.cache_path = os.path.join(root, FUNDING_CACHE_FILE)
+        self.hold_hours = getattr(Config, 'FUNDING_HOLD_HOURS', 24)
+        self.window_sec = getattr(Config, 'FUNDING_HISTORY_HOURS', 72) * 3600
+        self.current_weight = getattr(Config, 'FUNDING_CURRENT_WEIGHT', 0.5)
+        self.lighter_interval = getattr(Config, 'LIGHTER_FUNDING_INTERVAL_HOURS', 1)
+        self.default_grvt_interval = getattr(Config, 'GRVT_DEFAULT_FUNDING_INTERVAL_HOURS', 8)
+        # venue -> symbol -> [(ts_sec, hourly_rate_pct), ...] oldest first
+        self.history: Dict[str, Dict[str, List[Tuple[float, float]]]] = {'grvt': {}, 'lighter': {}}
+        # venue -> symbol -> mean hourly rate over the window (recomputed after each sync)
+        self._means: Dict[str, Dict[str, float]] = {'grvt': {}, 'lighter': {}}
+        self.version = 0  # bumped when history changes, so callers know to re-score
+        self.stats = {'syncs': 0, 'records': 0, 'errors': 0, 'last_sync_ms': 0.0}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Intervals
+    # ------------------------------------------------------------------
+    def grvt_interval(self, instrument: str) -> int:
+        return self.grvt.funding_intervals.get(instrument) or self.default_grvt_interval
+
+    # ------------------------------------------------------------------
+    # History cache
+    # ------------------------------------------------------------------
+    def _load(self):
+        if not os.path.exists(self.cache_path): return
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+            for venue in self.history:
+                self.history[venue] = {sym: [tuple(r) for r in rows] for sym, rows in data.get(venue, {}).items()}
+            self._recompute_means()
+            logger.info(f"Loaded funding history for {sum(len(v) for v in self.history.values())} venue/symbol pairs.")
+        except Exception as e:
+            logger.error(f"Failed to load funding history cache: {e}")
+
+    def _write_cache(self, payload: str):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp = f"{self.cache_path}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(payload)
+        os.replace(tmp, self.cache_path)
+
+    def _merge(self, venue: str, symbol: str, rows: List[Tuple[float, float]], now: float):
+        cached = self.history[venue].get(symbol, [])
+        last_ts = cached[-1][0] if cached else 0.0
+        added = [r for r in rows if r[0] > last_ts]
+        cutoff = now - self.window_sec
+        self.history[venue][symbol] = [r for r in cached + added if r[0] >= cutoff]
+        return len(added)
+
+    def _recompute_means(self):
+        for venue, rows_by_sym in self.history.items():
+            self._means[venue] = {sym: sum(r for _, r in rows) / len(rows) for sym, rows in rows_by_sym.items() if rows}
+
+    async def _sync_grvt(self, symbol: str, instrument: str, now: float) -> int:
+        cached = self.history['grvt'].get(symbol)
+        since = cached[-1][0] if cached else now - self.window_sec
+        # Nothing new can have settled before the next interval boundary
+        if cached and now - since < self.grvt_interval(instrument) * 3600: return 0
+        rows = await self.grvt.get_funding_history(instrument, since_ns=int(since * 1e9) + 1)
+        hourly = [(ts, rate / (interval or self.grvt_interval(instrument))) for ts, rate, interval in rows]
+        return self._merge('grvt', symbol, hourly, now)
+
+    async def _sync_lighter(self, symbol: str, now: float) -> int:
+        cached = self.history['lighter'].get(symbol)
+        since = cached[-1][0] if cached else now - self.window_sec
+        if cached and now - since < self.lighter_interval * 3600: return 0
+        rows = await self.lighter.get_funding_history(symbol, int(since) + 1, int(now))
+        return self._merge('lighter', symbol, [(ts, rate / self.lighter_interval) for ts, rate in rows], now)
+
+    async def sync(self, symbols: Dict[str, str]):
+        """Incrementally syncs history for {base symbol: GRVT instrument}; both venues concurrently."""
+        t0 = time.perf_counter()
+        now = time.time()
+        tasks = []
+        for symbol, instrument in symbols.items():
+            tasks.append(self._sync_grvt(symbol, instrument, now))
+            tasks.append(self._sync_lighter(symbol, now))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        added = 0
+        for res in results:
+            if isinstance(res, Exception):
+                self.stats['errors'] += 1
+                logger.warning(f"Funding history sync failed: {res}")
+            else:
+                added += res
+        self.stats['syncs'] += 1
+        self.stats['records'] += added
+        self.stats['last_sync_ms'] = (time.perf_counter() - t0) * 1000
+        if added:
+            self._recompute_means()
+            self.version += 1
+            try:
+                payload = json.dumps(self.history, separators=(',', ':'))
+                await asyncio.to_thread(self._write_cache, payload)
+            except Exception as e:
+                logger.error(f"Failed to write funding history cache: {e}")
+        logger.info(f"Funding history sync: {len(symbols)} symbols, {added} new records in {self.stats['last_sync_ms']:.0f}ms")
+
+    # ------------------------------------------------------------------
+    # Carry
+    # ------------------------------------------------------------------
+    def expected_carry(self, rows: List[tuple]) -> List[tuple]:
+        """
+        rows: [(symbol, grvt_rate_pct, grvt_interval_h, lighter_rate_pct), ...] (current rates per own interval)
+        Returns, in the same order: [(carry_pct, direction, grvt_hourly, lighter_hourly), ...]
+        carry_pct is the expected funding earned over hold_hours by the better direction
+        (Long_GRVT earns lighter - grvt per hour, Short_GRVT the opposite).
+
+        Plain Python over the batch: numpy is not a dependency of this bot, and for the ~100 common
+        symbols the array round trip would cost more than the arithmetic itself.
+        """
+        w, hold = self.current_weight, self.hold_hours
+        g_means, l_means = self._means['grvt'], self._means['lighter']
+        out = []
+        for symbol, g_rate, g_interval, l_rate in rows:
+            g_h = g_rate / g_interval
+            l_h = l_rate / self.lighter_interval
+            g_mean = g_means.get(symbol)
+            l_mean = l_means.get(symbol)
+            if g_mean is not None: g_h = w * g_h + (1 - w) * g_mean
+            if l_mean is not None: l_h = w * l_h + (1 - w) * l_mean
+            edge = (l_h - g_h) * hold
+            out.append((abs(edge), 'Long_GRVT' if edge >= 0 else 'Short_GRVT', g_h, l_h))
+        return out
+
+    def summary(self) -> dict:
+        return {**self.stats, 'symbols': {v: len(h) for v, h in self.history.items()}, 'hold_hours': self.hold_hours}
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Optional
+
+from ..exchanges.lighter_api import LighterExchange
+from ..config import Config
+from ..utils import Utils
+from .bot_state import BotState, DualPosition
+from .latency_tracer import HedgeTrace, LatencyTracer
+
+logger = logging.getLogger(__name__)
+
+class HedgeAggregator:
+    """
+    Micro-batches GRVT partial fills into Lighter hedges.
+
+    Fills accumulate in DualPosition.pending_hedge_qty (persisted, so a restart still sees them).
+    A batch is flushed as one Lighter market order when either
+      - the lot-aligned pending size reaches the threshold: max(Lighter min size, threshold_usd / price), or
+      - max_delay seconds have passed since the first fill of the batch (deadline timer).
+    Only whole Lighter lots (10 ** -size_decimals) are sent; a remainder below one lot / the Lighter
+    min size stays pending as dust: its batch is closed, and the next fill opens a new one.
+    Flushes of one position are serialized, so a deadline and a threshold flush never double-hedge.
+    Each batch carries a HedgeTrace from its first fill; the Lighter fast path (place_hedge) marks
+    'signed' and successful hedges feed the LatencyTracer histograms.
+
+    Failed hedges are retried on events instead of a polling loop: a retry timer with jittered
+    exponential backoff (HEDGE_RETRY_BASE_SEC doubling up to HEDGE_RETRY_MAX_SEC), a new fill
+    crossing the threshold, or a Lighter market update for the symbol once the base backoff passed.
+    """
+    def __init__(self, lighter: LighterExchange, state: BotState, threshold_usd: float, max_delay: float):
+        self.lighter = lighter
+        self.state = state
+        self.threshold_usd = threshold_usd
+        self.max_delay = max_delay
+        self.tracer = LatencyTracer()
+        self._batches: Dict[str, HedgeTrace] = {}          # position id -> trace of the open batch (first fill)
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.retry_base = getattr(Config, 'HEDGE_RETRY_BASE_SEC', 0.25)
+        self.retry_max = getattr(Config, 'HEDGE_RETRY_MAX_SEC', 2.0)
+        self._attempts: Dict[str, int] = {}                 # position id -> consecutive failed attempts
+        self._retrying: Dict[str, Dict[str, float]] = {}    # lighter base symbol -> {position id: last failure (monotonic)}
+        lighter.add_update_listener(self._on_market_update)
+        self.stats = {
+            'fills': 0, 'hedges': 0, 'failures': 0,
+            'flush_threshold': 0, 'flush_deadline': 0, 'flush_retry': 0, 'flush_market': 0, 'flush_resume': 0,
+            'sub_lot_skips': 0, 'retries_scheduled': 0, 'max_attempts': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lot math
+    # ------------------------------------------------------------------
+    def _lot(self, symbol: str):
+        """(lot step, min size) for a Lighter market, from load_markets' size decimals / min_qty."""
+        rules = self.lighter.market_rules.get(symbol.split('-')[0], {})
+        decimals = rules.get('decimals')
+        lot = 10 ** -int(decimals) if decimals is not None and int(decimals) < 18 else 0.001
+        try:
+            min_qty = float(rules.get('min_qty') or lot)
+        except (TypeError, ValueError):
+            min_qty = lot
+        return lot, max(min_qty, lot)
+
+    def _threshold_qty(self, symbol: str, price: float, lot: float, min_qty: float) -> float:
+        if price <= 0: return min_qty
+        return max(min_qty, Utils.quantize_amount(self.threshold_usd / price, lot, mode='ceil'))
+
+    def _price(self, symbol: str, fill_price: float) -> float:
+        cached = self.lighter.bbo_cache.get(symbol.split('-')[0], {})
+        return float(cached.get('price') or cached.get('bid') or fill_price or 0.0)
+
+    # ------------------------------------------------------------------
+    # Fills / flushes
+    # ------------------------------------------------------------------
+    async def add_fill(self, pos: DualPosition, qty: float, price: float = 0.0, is_exit: bool = False,
+                       received_at: Optional[float] = None):
+        """
+        Accumulates a GRVT fill; flushes at once if the batch crossed the threshold, else arms the deadline.
+        received_at: perf_counter() when the fill message arrived (start of the hedge trace).
+        """
+        if qty <= 0: return
+        self.stats['fills'] += 1
+        pos.pending_hedge_qty += qty
+        if not is_exit: pos.status = 'OPENING' # Still opening
+        self.state.update_position(pos)
+        if pos.id not in self._batches:
+            self._batches[pos.id] = self.tracer.start(received_at)
+
+        lot, min_qty = self._lot(pos.lighter_symbol)
+        threshold = self._threshold_qty(pos.lighter_symbol, self._price(pos.lighter_symbol, price), lot, min_qty)
+        if Utils.quantize_amount(pos.pending_hedge_qty, lot) >= threshold:
+            await self.flush(pos, is_exit, reason='threshold')
+        elif pos.id not in self._timers:
+            self._arm(pos.id, is_exit)
+
+    def _arm(self, pos_id: str, is_exit: bool):
+        trace = self._batches.get(pos_id)
+        started = trace.started if trace is not None else time.perf_counter()
+        delay = max(started + self.max_delay - time.perf_counter(), 0.0)
+        loop = asyncio.get_running_loop()
+        self._timers[pos_id] = loop.call_later(delay, lambda: asyncio.ensure_future(self._on_deadline(pos_id, is_exit)))
+
+    def _schedule_retry(self, pos: DualPosition, is_exit: bool):
+        attempt = self._attempts.get(pos.id, 0) + 1
+        self._attempts[pos.id] = attempt
+        self.stats['retries_scheduled'] += 1
+        self.stats['max_attempts'] = max(self.stats['max_attempts'], attempt)
+        self._retrying.setdefault(pos.lighter_symbol.split('-')[0], {})[pos.id] = time.monotonic()
+        # Full backoff doubles per attempt up to retry_max; jitter keeps concurrent retries apart
+        delay = min(self.retry_base * 2 ** (attempt - 1), self.retry_max) * random.uniform(0.5, 1.0)
+        self._disarm(pos.id)
+        loop = asyncio.get_running_loop()
+        self._timers[pos.id] = loop.call_later(
+            delay, lambda: asyncio.ensure_future(self._on_deadline(pos.id, is_exit, reason='retry')))
+
+    def _clear_retry(self, pos: DualPosition):
+        if self._attempts.pop(pos.id, None) is None: return
+        waiting = self._retrying.get(pos.lighter_symbol.split('-')[0])
+        if waiting: waiting.pop(pos.id, None)
+
+    def _on_market_update(self, symbol: str):
+        """Lighter market update: a position waiting out its backoff retries now (once the base delay passed)."""
+        waiting = self._retrying.get(symbol)
+        if not waiting: return
+        now = time.monotonic()
+        for pos_id, failed_at in list(waiting.items()):
+            if now - failed_at < self.retry_base: continue
+            pos = self.state.positions.get(pos_id)
+            if pos is None or pos.pending_hedge_qty <= 0:
+                waiting.pop(pos_id, None)
+                continue
+            waiting[pos_id] = now  # at most one market-triggered attempt per retry_base
+            self._disarm(pos_id)
+            asyncio.ensure_future(self.flush(pos, pos.status.startswith('CLOSING'), reason='market'))
+
+    def resume(self, positions):
+        """
+        Hedges quantity restored from state (e.g. after a restart) right away: it has been unhedged
+        since before the restart, so waiting another MAX_HEDGE_DELAY only adds exposure.
+        """
+        for pos in positions:
+            if pos.pending_hedge_qty > 0 and pos.id not in self._timers:
+                if pos.id not in self._batches: self._batches[pos.id] = self.tracer.start()
+                asyncio.ensure_future(self.flush(pos, pos.status.startswith('CLOSING'), reason='resume'))
+
+    def _disarm(self, pos_id: str):
+        timer = self._timers.pop(pos_id, None)
+        if timer is not None: timer.cancel()
+
+    async def _on_deadline(self, pos_id: str, is_exit: bool, reason: str = 'deadline'):
+        self._timers.pop(pos_id, None)
+        pos = self.state.positions.get(pos_id)
+        if pos is None or pos.pending_hedge_qty <= 0: return
+        await self.flush(pos, is_exit, reason=reason)
+
+    async def flush(self, pos: DualPosition, is_exit: bool = False, reason: str = 'retry') -> bool:
+        """Hedges the lot-aligned pending quantity with one Lighter market order. Returns True if sent."""
+        lock = self._locks.setdefault(pos.id, asyncio.Lock())
+        async with lock:
+            lot, min_qty = self._lot(pos.lighter_symbol)
+            qty = Utils.quantize_amount(pos.pending_hedge_qty, lot)
+            if qty < min_qty:
+                # Nothing hedgeable yet: the remainder is dust. Close its batch so the next fill
+                # starts a fresh one (with its own deadline) instead of inheriting this one's age.
+                if reason == 'deadline': self.stats['sub_lot_skips'] += 1
+                self._batches.pop(pos.id, None)
+                self._disarm(pos.id)
+                self._clear_retry(pos)
+                return False
+
+            self._disarm(pos.id)
+            trace = self._batches.pop(pos.id, None) or self.tracer.start()
+            trace.mark('decision')
+            logger.info(f"Triggering Hedge for {pos.symbol}. Qty: {qty} (Is Exit: {is_exit}, Reason: {reason})")
+
+            # Entry = Long GRVT -> Short Lighter; Exit -> Buy back on Lighter.
+            # WARNING: This assumes Entry = Long GRVT. We need `side` on DualPosition to support Short GRVT.
+            side = 'buy' if is_exit else 'sell'
+            tx = await self.lighter.place_hedge(pos.lighter_symbol, side, qty, reduce_only=is_exit, trace=trace)
+
+            if not tx:
+                self.stats['failures'] += 1
+                # Keep the batch open from its original first fill (fresh marks) and back off
+                newer = self._batches.get(pos.id)
+                if newer is None or trace.started < newer.started:
+                    self._batches[pos.id] = HedgeTrace(trace.started)
+                self._schedule_retry(pos, is_exit)
+                logger.error(f"Hedge Failed! Retry #{self._attempts[pos.id]} scheduled.")
+                return False
+
+            trace.mark('acked')
+            self.tracer.record(trace)
+            latency_ms = (trace.marks['acked'] - trace.started) * 1000
+            self.stats['hedges'] += 1
+            self.stats[f'flush_{reason}'] = self.stats.get(f'flush_{reason}', 0) + 1
+            self._clear_retry(pos)
+
+            # Fills that arrived while the order was in flight stay pending for the next batch
+            pos.pending_hedge_qty = max(pos.pending_hedge_qty - qty, 0.0)
+            if pos.pending_hedge_qty < lot * 1e-6: pos.pending_hedge_qty = 0.0
+            if not is_exit: pos.status = 'HEDGED'
+            self.state.update_position(pos)
+            logger.info(f"Hedge Successful ({latency_ms:.0f}ms after first fill).")
+
+        # Fills that arrived in flight form the next batch, unless they are only dust
+        if Utils.quantize_amount(pos.pending_hedge_qty, lot) >= min_qty and pos.id not in self._timers:
+            if pos.id not in self._batches: self._batches[pos.id] = self.tracer.start()
+            self._arm(pos.id, is_exit)
+        return True
+
+    def unhedged(self) -> dict:
+        """
+        Pending (unhedged) exposure right now: total USD, per symbol qty, age of the oldest open batch
+        and the sub-minimum dust (pending quantity with no open batch, included in usd / qty).
+        """
+        usd, by_symbol, dust = 0.0, {}, {}
+        for pos in self.state.positions.values():
+            if pos.pending_hedge_qty <= 0: continue
+            by_symbol[pos.symbol] = by_symbol.get(pos.symbol, 0.0) + pos.pending_hedge_qty
+            if pos.id not in self._batches and pos.id not in self._attempts:
+                dust[pos.symbol] = dust.get(pos.symbol, 0.0) + pos.pending_hedge_qty
+            usd += pos.pending_hedge_qty * self._price(pos.lighter_symbol, pos.grvt_entry_price)
+        now = time.perf_counter()
+        oldest = max((now - t.started for t in self._batches.values()), default=0.0)
+        return {'usd': round(usd, 2), 'qty': by_symbol, 'oldest_sec': round(oldest, 2), 'retrying': len(self._attempts),
+                'dust': dust}
+
+    def summary(self) -> dict:
+        s = dict(self.stats)
+        hedges = s['hedges']
+        s['fills_per_hedge'] = round(s['fills'] / hedges, 2) if hedges else 0.0
+        e2e = self.tracer.summary().get('fill->acked', {})
+        s['latency_ms_avg'] = e2e.get('avg_ms', 0.0)
+        s['latency_ms_p50'] = e2e.get('p50_ms', 0.0)
+        s['latency_ms_p99'] = e2e.get('p99_ms', 0.0)
+        s['latency_ms_max'] = e2e.get('max_ms', 0.0)
+        s['fast_path'] = self.lighter.hedge_stats['fast']
+        s['fallback_path'] = self.lighter.hedge_stats['fallback']
+        s['unhedged'] = self.unhedged()
+        return s
+
+    def stage_summary(self) -> Dict[str, dict]:
+        """Per-stage latency histograms (fill->decision, decision->signed, signed->acked, fill->acked)."""
+        return self.tracer.summary()
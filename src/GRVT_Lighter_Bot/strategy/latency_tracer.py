@@ -0,0 +1,92 @@
+import bisect
+import time
+from typing import Dict, Optional, Tuple
+
+# Bucket upper bounds (ms); the last bucket is open-ended
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 200, 300, 350, 400, 500, 750, 1000, 2000, 5000)
+
+class HedgeTrace:
+    """Stage timestamps (perf_counter) of one hedge, starting at the first GRVT fill of its batch."""
+    __slots__ = ('marks',)
+
+    def __init__(self, t0: float = None):
+        self.marks: Dict[str, float] = {'fill': time.perf_counter() if t0 is None else t0}
+
+    def mark(self, stage: str):
+        self.marks[stage] = time.perf_counter()
+
+    @property
+    def started(self) -> float:
+        return self.marks['fill']
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (count / sum / max + bucket counts, percentiles as bucket upper bounds capped at max)."""
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max: self.max = ms
+
+    def percentile(self, q: float) -> float:
+        if not self.count: return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        if not self.count: return {'count': 0}
+        return {
+            'count': self.count, 'avg_ms': round(self.total / self.count, 1), 'max_ms': round(self.max, 1),
+            'p50_ms': round(self.percentile(0.5), 1), 'p90_ms': round(self.percentile(0.9), 1),
+            'p99_ms': round(self.percentile(0.99), 1),
+        }
+
+class LatencyTracer:
+    """
+    Fill-to-hedge pipeline latency: fill (GRVT fill received) -> decision (flush decided)
+    -> signed (Lighter tx signed) -> acked (Lighter accepted the tx).
+    One histogram per consecutive stage pair plus the end-to-end 'fill->acked'.
+    A stage the path did not report (e.g. 'signed' when the SDK signs and sends in one call) is skipped.
+    """
+    STAGES = ('fill', 'decision', 'signed', 'acked')
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.bounds = bounds
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def start(self, t0: Optional[float] = None) -> HedgeTrace:
+        return HedgeTrace(t0)
+
+    def _add(self, name: str, ms: float):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram(self.bounds)
+        hist.add(ms)
+
+    def record(self, trace: HedgeTrace):
+        """Adds a completed trace (must carry 'acked') to the histograms."""
+        marks = trace.marks
+        if 'acked' not in marks: return
+        prev = None
+        for stage in self.STAGES:
+            if stage not in marks: continue
+            if prev is not None:
+                self._add(f"{prev}->{stage}", (marks[stage] - marks[prev]) * 1000)
+            prev = stage
+        self._add('fill->acked', (marks['acked'] - marks['fill']) * 1000)
+
+    def summary(self) -> Dict[str, dict]:
+        return {name: h.summary() for name, h in self.histograms.items()}
@@ -1,4 +1,5 @@
 import asyncio
+import bisect
 import logging
 import time
 from typing import Dict, List, Optional
@@ -7,6 +8,7 @@ from dataclasses import dataclass
 from ..exchanges.grvt_api import GrvtExchange
 from ..exchanges.lighter_api import LighterExchange
 from ..config import Config
+from .funding_engine import FundingEngine
 
 logger = logging.getLogger(__name__)
 
@@ -27,123 +29,154 @@ class arbitrage_opportunity:
     adj_lighter_rate_1h: float = 0.0
     grvt_price: float = 0.0
     lighter_price: float = 0.0
+    expected_carry: float = 0.0  # % earned over FUNDING_HOLD_HOURS (FundingEngine), ranking key
 
 class OpportunityScanner:
+    """
+    Incremental funding-spread table keyed by base symbol.
+
+    - GRVT ticker.s and Lighter market_stats updates mark their symbol dirty (listeners
+      registered in start()); scan() recomputes only the dirty symbols from the feed caches.
+    - Dirty symbols are scored together by FundingEngine.expected_carry (real intervals, current
+      rate blended with cached history); the ranking is a list of (-expected_carry, symbol) kept
+      sorted with bisect, so a changed symbol moves in place instead of the table being re-sorted.
+    - A REST resync every SCANNER_RESYNC_SEC backfills symbols whose streams went quiet.
+    - Funding history for the top FUNDING_SYNC_TOP symbols is synced in the background every
+      FUNDING_SYNC_SEC; new history re-scores every symbol.
+    """
     def __init__(self, grvt: GrvtExchange, lighter: LighterExchange):
         self.grvt = grvt
         self.lighter = lighter
         self.opportunities: Dict[str, arbitrage_opportunity] = {}
         self.min_spread = Config.FUNDING_DIFF_THRESHOLD or 0.0001 
+        self.grvt_index: Dict[str, str] = {}   # base symbol -> GRVT instrument (common symbols only)
+        self.resync_interval = getattr(Config, 'SCANNER_RESYNC_SEC', 300)
+        self.engine = FundingEngine(grvt, lighter)
+        self.funding_sync_interval = getattr(Config, 'FUNDING_SYNC_SEC', 900)
+        self.funding_sync_top = getattr(Config, 'FUNDING_SYNC_TOP', 20)
+        self._ranked: List[tuple] = []          # sorted (-expected_carry, symbol)
+        self._dirty = set()
+        self._started = False
+        self._last_resync = 0.0
+        self._engine_version = self.engine.version
+        self._last_funding_sync = 0.0
+        self._funding_task: Optional[asyncio.Task] = None
+        self.stats = {'scans': 0, 'recomputed': 0, 'resyncs': 0, 'last_scan_ms': 0.0}
+
+    async def start(self):
+        """Builds the symbol index, hooks the feed listeners and seeds the table over REST."""
+        if not self.lighter.market_rules:
+            await self.lighter.load_markets()
+        self.grvt_index = self._build_grvt_index()
+        self.grvt.add_update_listener(self._mark_dirty)
+        self.lighter.add_update_listener(self._mark_dirty)
+        await self.grvt.watch_tickers(self.grvt_index.values())
+        self._started = True
+        await self.resync()
+
+    def _mark_dirty(self, symbol: str):
+        if symbol in self.grvt_index:
+            self._dirty.add(symbol)
+
+    async def resync(self):
+        """REST backfill of every common symbol's GRVT ticker (batch endpoint first, then per symbol)."""
+        self._last_resync = time.monotonic()
+        self.stats['resyncs'] += 1
+        grvt_tickers = await self.grvt.get_all_tickers()
+        missing = []
+        for instrument in self.grvt_index.values():
+            raw = grvt_tickers.get(instrument)
+            if raw: self.grvt.store_ticker(instrument, raw)
+            else: missing.append(instrument)
+
+        if missing:
+            # The rate limiter paces these; no manual chunking/sleeps needed
+            logger.info(f"Fetching {len(missing)} GRVT tickers individually...")
+            results = await asyncio.gather(*(self.grvt.fetch_ticker(i) for i in missing), return_exceptions=True)
+            for instrument, raw in zip(missing, results):
+                if raw and not isinstance(raw, Exception):
+                    self.grvt.store_ticker(instrument, raw)
+        self._dirty.update(self.grvt_index)
 
     async def scan(self) -> List[arbitrage_opportunity]:
         """
-        Scans both exchanges for funding rate discrepancies.
+        Re-ranks the symbols whose feeds changed since the last scan and returns all
+        opportunities ordered by expected carry (desc).
         """
-        if not self.lighter.market_rules:
-            await self.lighter.load_markets()
-            
-        common_symbols = self._get_common_symbols()
-        logger.debug(f"Scanning {len(common_symbols)} common symbols.")
-        
-        # Optimize: Fetch ALL GRVT tickers at once to avoid n * request latency
-        try:
-            grvt_tickers = await asyncio.to_thread(self.grvt.client.fetch_tickers)
-        except Exception:
-            grvt_tickers = {}
-
-        results = []
-        missing_symbols = []
-        
-        # 1. Fast Path: Process symbols found in batch
-        for symbol in common_symbols:
-            grvt_sym = f"{symbol}_USDT_Perp"
-            grvt_ticker = grvt_tickers.get(grvt_sym)
-            
-            # Fallback checks
-            if not grvt_ticker: grvt_ticker = grvt_tickers.get(f"{symbol}-USDT")
-            if not grvt_ticker:
-                 for k, v in grvt_tickers.items():
-                    if k.startswith(symbol + "_") or k.startswith(symbol + "/") or k.startswith(symbol + "-"):
-                        grvt_ticker = v
-                        break
-            
-            if grvt_ticker:
-                opp = await self._process_single_symbol(symbol, grvt_ticker)
-                if opp: results.append(opp)
-            else:
-                missing_symbols.append(symbol)
-
-        # 2. Slow Path: Parallel Fetch for missing symbols
-        if missing_symbols:
-            logger.info(f"Parallel fetching {len(missing_symbols)} missing symbols...")
-            chunk_size = 10
-            for i in range(0, len(missing_symbols), chunk_size):
-                chunk = missing_symbols[i:i+chunk_size]
-                chunk_tasks = []
-                for sym in chunk:
-                    chunk_tasks.append(self._fetch_and_process_individual_grvt(sym))
-                
-                chunk_results = await asyncio.gather(*chunk_tasks, return_exceptions=True)
-                for res in chunk_results:
-                    if isinstance(res, arbitrage_opportunity):
-                        results.append(res)
-                await asyncio.sleep(0.5) 
-
-        results.sort(key=lambda x: x.spread, reverse=True)
-        self.opportunities = {op.symbol: op for op in results}
-        return results
-
-    async def _process_single_symbol(self, symbol, grvt_ticker):
-        try:
-             grvt_price = float(
-                grvt_ticker.get('mark_price') or 
-                grvt_ticker.get('index_price') or 
-                grvt_ticker.get('last') or 
-                grvt_ticker.get('close') or 
-                0.0
-             )
-             grvt_fr = float(grvt_ticker.get('funding_rate') or 0.0)
-             
-             l_stats = await self.lighter.get_market_stats(symbol)
-             lighter_fr = float(l_stats.get('funding_rate') or 0.0)
-             lighter_price = float(l_stats.get('price') or l_stats.get('index_price') or l_stats.get('mark_price') or 0.0)
-
-             return self._create_opp_object(symbol, grvt_ticker.get('symbol', symbol), grvt_fr, grvt_price, lighter_fr, lighter_price)
-        except Exception:
-             return None
-
-    async def _fetch_and_process_individual_grvt(self, symbol):
-        try:
-            grvt_sym = f"{symbol}_USDT_Perp"
-            grvt_ticker = await asyncio.to_thread(self.grvt.client.fetch_ticker, grvt_sym)
-            if not grvt_ticker: return None
-            return await self._process_single_symbol(symbol, grvt_ticker)
-        except Exception:
-            return None
-
-    def _create_opp_object(self, symbol, grvt_sym, grvt_fr, grvt_price, lighter_fr, lighter_price):
-             # 3. Calculate Spread
-             spread_A = -grvt_fr + lighter_fr
-             spread_B = grvt_fr - lighter_fr
-             
-             best_spread = 0.0
-             direction = None 
-             
-             if spread_A > spread_B:
-                 best_spread = spread_A
-                 direction = 'Long_GRVT' 
-             else:
-                 best_spread = spread_B
-                 direction = 'Short_GRVT'
-            
-             grvt_interval = 8 
-             lighter_interval = 1
+        if not self._started:
+            await self.start()
+        elif time.monotonic() - self._last_resync >= self.resync_interval:
+            await self.resync()
+        if self.engine.version != self._engine_version:
+            self._engine_version = self.engine.version
+            self._dirty.update(self.grvt_index)
+
+        t0 = time.perf_counter()
+        dirty, self._dirty = self._dirty, set()
+        self._refresh(dirty)
+        self._schedule_funding_sync()
+        self.stats['scans'] += 1
+        self.stats['recomputed'] += len(dirty)
+        self.stats['last_scan_ms'] = (time.perf_counter() - t0) * 1000
+        logger.debug(f"Scan: {len(dirty)}/{len(self.grvt_index)} symbols recomputed in {self.stats['last_scan_ms']:.2f}ms")
+        return self.ranked()
+
+    def ranked(self) -> List[arbitrage_opportunity]:
+        return [self.opportunities[symbol] for _, symbol in self._ranked]
+
+    def _schedule_funding_sync(self):
+        if self._funding_task is not None and not self._funding_task.done(): return
+        if time.monotonic() - self._last_funding_sync < self.funding_sync_interval: return
+        top = [symbol for _, symbol in self._ranked[:self.funding_sync_top]]
+        if not top: return
+        self._last_funding_sync = time.monotonic()
+        self._funding_task = asyncio.create_task(self.engine.sync({s: self.grvt_index[s] for s in top}))
+
+    def _unrank(self, symbol: str):
+        old = self.opportunities.pop(symbol, None)
+        if old is None: return
+        i = bisect.bisect_left(self._ranked, (-old.expected_carry, symbol))
+        if i < len(self._ranked) and self._ranked[i][1] == symbol:
+            del self._ranked[i]
+
+    def _refresh(self, symbols):
+        """Re-scores `symbols` from the feed caches in one FundingEngine batch."""
+        rows, quotes = [], []
+        for symbol in symbols:
+            self._unrank(symbol)
+            instrument = self.grvt_index[symbol]
+            g = self.grvt.tickers.get(instrument)
+            l_stats = self.lighter.bbo_cache.get(symbol)
+            if not g or not l_stats:
+                continue  # one side has not reported yet
+            try:
+                lighter_fr = float(l_stats.get('funding_rate') or 0.0)
+                lighter_price = float(l_stats.get('price') or l_stats.get('index_price') or l_stats.get('mark_price') or 0.0)
+            except (TypeError, ValueError):
+                continue
+            grvt_interval = self.engine.grvt_interval(instrument)
+            rows.append((symbol, g['funding_rate'], grvt_interval, lighter_fr))
+            quotes.append((instrument, g['mark'] or g['last'], lighter_price))
+
+        for row, quote, carry in zip(rows, quotes, self.engine.expected_carry(rows)):
+            opp = self._create_opp_object(row, quote, carry)
+            self.opportunities[opp.symbol] = opp
+            bisect.insort(self._ranked, (-opp.expected_carry, opp.symbol))
+
+    def _create_opp_object(self, row, quote, carry):
+             symbol, grvt_fr, grvt_interval, lighter_fr = row
+             grvt_sym, grvt_price, lighter_price = quote
+             expected_carry, direction, grvt_hourly, lighter_hourly = carry
+             lighter_interval = self.engine.lighter_interval
              
              adj_grvt = grvt_fr / grvt_interval
              
              # User wants: "Expected larger value when converted to GRVT time".
-             # So we should show: lighter_fr * grvt_interval
-             display_lighter_rate = lighter_fr * grvt_interval 
+             # So we show Lighter's rate scaled to the GRVT interval
+             display_lighter_rate = lighter_fr / lighter_interval * grvt_interval 
+             
+             # Instantaneous spread per GRVT interval (display / threshold), from current rates only
+             spread = abs(display_lighter_rate - grvt_fr)
              
              return arbitrage_opportunity(
                     symbol=symbol,
@@ -151,8 +184,8 @@ class OpportunityScanner:
                     lighter_symbol=symbol,
                     grvt_funding_rate=grvt_fr,
                     lighter_funding_rate=lighter_fr,
-                    spread=best_spread,
-                    estimated_annual_apy=best_spread * 3 * 365,
+                    spread=spread,
+                    estimated_annual_apy=abs(lighter_hourly - grvt_hourly) * 24 * 365,
                     timestamp=time.time(),
                     direction=direction,
                     grvt_funding_interval_hours=grvt_interval,
@@ -160,22 +193,17 @@ class OpportunityScanner:
                     adj_grvt_rate_1h=adj_grvt, 
                     adj_lighter_rate_1h=display_lighter_rate, 
                     grvt_price=grvt_price,
-                    lighter_price=lighter_price
+                    lighter_price=lighter_price,
+                    expected_carry=expected_carry
                 )
 
-    def _get_common_symbols(self) -> List[str]:
-        g_syms = set()
-        for k in self.grvt.market_rules.keys():
-            base = k.split('_')[0].split('-')[0]
-            g_syms.add(base)
-            
-        l_syms = set()
-        for k in self.lighter.market_rules.keys():
-             l_syms.add(k.split('-')[0]) # Ensure base symbol mapping for Lighter too
-        
-        common = list(g_syms.intersection(l_syms))
+    def _build_grvt_index(self) -> Dict[str, str]:
+        """Base symbol -> GRVT instrument for symbols listed on both exchanges."""
+        l_syms = {k.split('-')[0] for k in self.lighter.market_rules.keys()}
+        index = {base: inst for base, inst in self.grvt.instruments.items() if base in l_syms}
+        common = list(index)
         logger.info(f"Common Symbols Found ({len(common)}): {common[:10]}...")
         if not common:
-            logger.warning(f"No common symbols found! GRVT Keys: {list(g_syms)[:5]}..., Lighter Keys: {list(l_syms)[:5]}...")
+            logger.warning(f"No common symbols found! GRVT Keys: {list(self.grvt.instruments)[:5]}..., Lighter Keys: {list(l_syms)[:5]}...")
             
-        return common
+        return index
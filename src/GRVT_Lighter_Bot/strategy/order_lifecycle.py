@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Order states
+NEW, PARTIALLY_FILLED, FILLED, CANCELLING, CANCELLED = 'NEW', 'PARTIALLY_FILLED', 'FILLED', 'CANCELLING', 'CANCELLED'
+OPEN_STATES = (NEW, PARTIALLY_FILLED)
+
+class TrackedOrder:
+    """One GRVT order intent (an entry/exit quote keeps its TrackedOrder across cancel-replaces)."""
+    __slots__ = ('order_id', 'client_id', 'pos_id', 'kind', 'instrument', 'size', 'filled',
+                 'state', 'created_at', 'deadline', 'closed_at', 'cancel_attempts')
+
+    def __init__(self, order_id: str, client_id: Optional[str], pos_id: str, kind: str, instrument: str,
+                 size: float, deadline: float):
+        self.order_id = order_id
+        self.client_id = client_id
+        self.pos_id = pos_id
+        self.kind = kind              # 'ENTRY' / 'EXIT'
+        self.instrument = instrument
+        self.size = size
+        self.filled = 0.0
+        self.state = NEW
+        self.created_at = time.time()
+        self.deadline = deadline      # monotonic expiry
+        self.closed_at = None
+        self.cancel_attempts = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state in OPEN_STATES
+
+class OrderLifecycleManager:
+    """
+    Tracks GRVT orders from placement to a terminal state and expires them on time.
+
+    - State machine: NEW -> PARTIALLY_FILLED -> FILLED, or (NEW | PARTIALLY_FILLED) -> CANCELLING
+      -> CANCELLED (back to the open state if the cancel fails).
+    - O(1) lookup by exchange order id (normalized to str here, once) or client order id.
+      Replaced ids stay mapped to the same order, so late fills still route.
+    - Expiries sit in a heap served by a single loop.call_later timer armed for the earliest
+      deadline; everything due at once is cancelled concurrently (the limiter's cancel lane paces it).
+    - A failed cancel re-arms the expiry retry_sec later, up to max_cancel_retries times; after that
+      the order is left open, logged as critical and counted in stats['cancel_gave_up'].
+    - Terminal orders are forgotten retain_sec after closing (same heap).
+    """
+    def __init__(self, cancel_fn: Callable[[TrackedOrder], Awaitable[bool]], retain_sec: float = 60.0,
+                 retry_sec: float = 5.0, max_cancel_retries: int = 5):
+        self._cancel_fn = cancel_fn
+        self.retain_sec = retain_sec
+        self.retry_sec = retry_sec
+        self.max_cancel_retries = max_cancel_retries
+        self._by_id: Dict[str, TrackedOrder] = {}
+        self._by_client: Dict[str, TrackedOrder] = {}
+        self._heap = []  # (when, seq, order_id, action) with action 'expire' | 'forget'
+        self._seq = itertools.count()
+        self._timer = None
+        self._timer_at = None
+        self.stats = {'tracked': 0, 'filled': 0, 'expired': 0, 'cancelled': 0, 'cancel_failures': 0,
+                      'cancel_gave_up': 0, 'max_expiry_lag_ms': 0.0}
+
+    @staticmethod
+    def normalize(order_id) -> Optional[str]:
+        return None if order_id in (None, '') else str(order_id)
+
+    # ------------------------------------------------------------------
+    # Registration / lookup
+    # ------------------------------------------------------------------
+    def track(self, order_id, pos_id: str, kind: str, instrument: str, size: float, timeout: float,
+              client_id=None) -> TrackedOrder:
+        oid = self.normalize(order_id)
+        order = TrackedOrder(oid, self.normalize(client_id), pos_id, kind, instrument, size, time.monotonic() + timeout)
+        self._by_id[oid] = order
+        if order.client_id: self._by_client[order.client_id] = order
+        self.stats['tracked'] += 1
+        self._push(order.deadline, oid, 'expire')
+        return order
+
+    def lookup(self, order_id=None, client_id=None) -> Optional[TrackedOrder]:
+        order = self._by_id.get(self.normalize(order_id))
+        if order is None and client_id is not None:
+            order = self._by_client.get(self.normalize(client_id))
+        return order
+
+    def rekey(self, old_id, new_id, client_id=None):
+        """The order was replaced under a new exchange id (cancel-replace); the old id stays an alias."""
+        order = self._by_id.get(self.normalize(old_id))
+        if order is None: return
+        order.order_id = self.normalize(new_id)
+        self._by_id[order.order_id] = order
+        if client_id is not None:
+            order.client_id = self.normalize(client_id)
+            self._by_client[order.client_id] = order
+
+    def open_orders(self) -> List[TrackedOrder]:
+        return [o for oid, o in self._by_id.items() if o.is_open and o.order_id == oid]
+
+    # ------------------------------------------------------------------
+    # State transitions
+    # ------------------------------------------------------------------
+    def on_fill(self, order_id, qty: float, client_id=None) -> Optional[TrackedOrder]:
+        order = self.lookup(order_id, client_id)
+        if order is None: return None
+        order.filled += qty
+        if order.is_open or order.state == CANCELLING:
+            if order.filled >= order.size * (1 - 1e-9):
+                self._close(order, FILLED)
+                self.stats['filled'] += 1
+            elif order.state == NEW:
+                order.state = PARTIALLY_FILLED
+        return order
+
+    def mark_cancelled(self, order_id):
+        """The order left the book without us expiring it (e.g. a quote that could not be replaced)."""
+        order = self.lookup(order_id)
+        if order is not None and order.state not in (FILLED, CANCELLED):
+            self._close(order, CANCELLED)
+
+    def _close(self, order: TrackedOrder, state: str):
+        order.state = state
+        order.closed_at = time.monotonic()
+        self._push(order.closed_at + self.retain_sec, order.order_id, 'forget')
+
+    async def cancel(self, orders: List[TrackedOrder]) -> int:
+        """Cancels open orders concurrently; returns how many were cancelled."""
+        orders = [o for o in orders if o.is_open]
+        if not orders: return 0
+        prior = [o.state for o in orders]  # by position: a replace can re-key order_id mid-cancel
+        for o in orders: o.state = CANCELLING
+        results = await asyncio.gather(*(self._cancel_fn(o) for o in orders), return_exceptions=True)
+        done = 0
+        for o, state, res in zip(orders, prior, results):
+            if o.state != CANCELLING: continue  # filled while the cancel was in flight
+            if res is True:
+                self._close(o, CANCELLED)
+                done += 1
+                continue
+            o.state = PARTIALLY_FILLED if o.filled > 0 else state
+            o.cancel_attempts += 1
+            self.stats['cancel_failures'] += 1
+            if o.cancel_attempts > self.max_cancel_retries:
+                self.stats['cancel_gave_up'] += 1
+                logger.critical(f"Giving up cancelling order {o.order_id} ({o.instrument}) after "
+                                f"{o.cancel_attempts} attempts: it may still be resting. Last error: {res}")
+                continue
+            o.deadline = time.monotonic() + self.retry_sec
+            self._push(o.deadline, o.order_id, 'expire')
+            logger.error(f"Failed to cancel order {o.order_id} ({o.instrument}): {res}")
+        self.stats['cancelled'] += done
+        return done
+
+    # ------------------------------------------------------------------
+    # Timer heap
+    # ------------------------------------------------------------------
+    def _push(self, when: float, order_id: str, action: str):
+        heapq.heappush(self._heap, (when, next(self._seq), order_id, action))
+        if self._timer_at is None or when < self._timer_at:
+            self._schedule()
+
+    def _schedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer, self._timer_at = None, None
+        if not self._heap: return
+        when = self._heap[0][0]
+        self._timer_at = when
+        self._timer = asyncio.get_running_loop().call_later(max(when - time.monotonic(), 0.0), self._fire)
+
+    def _fire(self):
+        self._timer, self._timer_at = None, None
+        now = time.monotonic()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, oid, action = heapq.heappop(self._heap)
+            order = self._by_id.get(oid)
+            if order is None: continue
+            if action == 'forget':
+                if not order.is_open and order.state != CANCELLING:
+                    self._forget(order)
+            elif order.is_open and order.deadline <= now and order not in due:
+                due.append(order)
+                lag_ms = (now - order.deadline) * 1000
+                self.stats['max_expiry_lag_ms'] = max(self.stats['max_expiry_lag_ms'], round(lag_ms, 1))
+        if due:
+            self.stats['expired'] += len(due)
+            logger.info(f"{len(due)} order(s) timed out. Cancelling: {[o.order_id for o in due]}")
+            asyncio.ensure_future(self.cancel(due))
+        self._schedule()
+
+    def _forget(self, order: TrackedOrder):
+        for oid in [k for k, o in self._by_id.items() if o is order]:
+            del self._by_id[oid]
+        if order.client_id and self._by_client.get(order.client_id) is order:
+            del self._by_client[order.client_id]
+
+    def summary(self) -> dict:
+        states = {}
+        for oid, o in self._by_id.items():
+            if o.order_id == oid: states[o.state] = states.get(o.state, 0) + 1
+        return {**self.stats, 'states': states, 'timers': len(self._heap)}
@@ -0,0 +1,317 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from ..exchanges.grvt_api import GrvtExchange
+from ..exchanges.rate_limiter import ORDER, CANCEL
+from ..config import Config
+from .latency_tracer import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+class Quote:
+    """One resting GRVT maker order that follows the touch (keyed by position id)."""
+    __slots__ = ('key', 'instrument', 'side', 'size', 'settled', 'current_filled', 'origin', 'price', 'order_id',
+                 'placed_at', 'last_update', 'updates', 'queue_ahead', 'busy', 'pending_since', 'timer')
+
+    def __init__(self, key: str, instrument: str, side: str, size: float, price: float, order_id: str):
+        self.key = key
+        self.instrument = instrument
+        self.side = side
+        self.size = size
+        self.settled = 0.0           # traded on replaced orders (read back from the order query)
+        self.current_filled = 0.0    # fills seen on the live order
+        self.origin = price          # first quote price; drift is measured from here
+        self.price = price
+        self.order_id = order_id
+        self.placed_at = time.monotonic()
+        self.last_update = self.placed_at
+        self.updates = 0
+        self.queue_ahead = 0.0       # size resting ahead of us at our price (estimate)
+        self.busy = False            # cancel-replace in flight
+        self.pending_since = None    # perf_counter of the first unserved touch move
+        self.timer = None            # throttle / budget retry timer
+
+    @property
+    def filled(self) -> float:
+        return self.settled + self.current_filled
+
+    @property
+    def remaining(self) -> float:
+        return max(self.size - self.filled, 0.0)
+
+class QuoteEngine:
+    """
+    Keeps GRVT post-only entry orders at the touch.
+
+    - Quoted instruments are subscribed to book.s; every book update re-evaluates their quotes.
+    - When the touch moves away from a quote it is cancel-replaced at the new best price
+      (GRVT has no amend), at most once per QUOTE_MIN_REPRICE_SEC per quote. Moves that arrive
+      while a replace is in flight or throttled are coalesced into one replace at the latest touch.
+    - Replaces only go out when the limiter has cancel and order tokens free right now; otherwise
+      they are deferred (a queued replace would price off a stale book).
+    - Before re-placing, the cancelled order's traded size is read back from the order query, so
+      fills that raced the cancel are not quoted again. A quote whose touch drifted more than
+      QUOTE_MAX_DRIFT_PCT from its first price is ended instead of replaced.
+    - Metrics: touch-move -> new order ack latency, fill rate (filled / quoted size) and
+      queue position (size ahead of us at our price, relative to our size).
+    Replace listeners fn(key, old_order_id, new_order_id) let the caller re-key its order map;
+    new_order_id is None when the quote ended without a live order.
+    """
+    def __init__(self, grvt: GrvtExchange):
+        self.grvt = grvt
+        self.min_reprice = getattr(Config, 'QUOTE_MIN_REPRICE_SEC', 0.5)
+        self.max_lifetime = getattr(Config, 'QUOTE_MAX_LIFETIME_SEC', 300)
+        self.max_drift = getattr(Config, 'QUOTE_MAX_DRIFT_PCT', 0.5) / 100
+        self.quotes: Dict[str, Quote] = {}
+        self._by_order: Dict[str, str] = {}            # order id -> quote key
+        self._by_instrument: Dict[str, set] = {}       # instrument -> quote keys
+        self._replace_listeners = []
+        self.update_latency = LatencyHistogram()
+        self._queue_sum, self._queue_n = 0.0, 0     # queue ahead at join, in multiples of our size
+        self.stats = {
+            'placed': 0, 'reprices': 0, 'budget_deferrals': 0, 'cancel_failures': 0, 'replace_failures': 0,
+            'quoted_qty': 0.0, 'filled_qty': 0.0, 'ended': 0, 'ended_with_fill': 0, 'drift_ends': 0,
+            'orphans_cancelled': 0,
+        }
+        grvt.add_book_listener(self._on_book)
+
+    def add_replace_listener(self, fn):
+        self._replace_listeners.append(fn)
+
+    def key_for_order(self, order_id) -> Optional[str]:
+        return self._by_order.get(str(order_id))
+
+    # ------------------------------------------------------------------
+    # Book helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _target(q: Quote, book: dict) -> Optional[float]:
+        levels = book['bids'] if q.side == 'buy' else book['asks']
+        return levels[0][0] if levels else None
+
+    @staticmethod
+    def _level_size(q: Quote, book: dict, price: float) -> float:
+        levels = book['bids'] if q.side == 'buy' else book['asks']
+        return next((size for p, size in levels if p == price), 0.0)
+
+    def _min_size(self, q: Quote) -> float:
+        rules = self.grvt.market_rules.get(q.instrument.split('_')[0], {})
+        return max(float(rules.get('min_size') or 0), 1e-12) * 0.999
+
+    # ------------------------------------------------------------------
+    # Quote lifecycle
+    # ------------------------------------------------------------------
+    async def place(self, key: str, instrument: str, side: str, size: float, price: float) -> Optional[dict]:
+        """Places a post-only order and keeps it at the touch until filled, cancelled or ended."""
+        await self.grvt.watch_books([instrument])
+        order = await self.grvt.place_limit_order(symbol=instrument, side=side, price=price, amount=size,
+                                                  params={'post_only': True})
+        if not order or not order.get('id'):
+            return order
+        q = Quote(key, instrument, side, size, price, str(order['id']))
+        self.quotes[key] = q
+        self._by_order[q.order_id] = key
+        self._by_instrument.setdefault(instrument, set()).add(key)
+        self.stats['placed'] += 1
+        self.stats['quoted_qty'] += size
+        book = self.grvt.books.get(instrument)
+        if book: self._joined(q, book)
+        return order
+
+    def _joined(self, q: Quote, book: dict):
+        # We join the back of the queue: everything resting at our price is ahead of us
+        q.queue_ahead = self._level_size(q, book, q.price)
+        if q.size > 0:
+            self._queue_sum += q.queue_ahead / q.size
+            self._queue_n += 1
+
+    def on_fill(self, order_id, qty: float):
+        """Counts a fill against its quote; a fully filled quote stops being managed."""
+        key = self._by_order.get(str(order_id))
+        q = self.quotes.get(key) if key else None
+        if q is None: return
+        self.stats['filled_qty'] += qty
+        if str(order_id) != q.order_id: return  # late fill of a replaced order: already in q.settled
+        q.current_filled += qty
+        if q.remaining <= self._min_size(q):
+            self._end(q, 'filled', notify=False)
+
+    async def cancel(self, key: str) -> bool:
+        """Cancels a quote's live order and stops managing it; True once the cancel is acked."""
+        q = self.quotes.get(key)
+        if q is None: return False
+        self._end(q, 'cancelled', notify=False)
+        if q.busy:
+            # The in-flight replace is already cancelling the old order and cancels any new one
+            # once it sees the quote ended (see _reprice)
+            return True
+        try:
+            acked = await self.grvt.cancel_order(q.order_id, q.instrument)
+        except Exception as e:
+            logger.error(f"Failed to cancel quote {q.order_id} ({q.instrument}): {e}")
+            return False
+        if not acked:
+            logger.error(f"Cancel of quote {q.order_id} ({q.instrument}) was not acked")
+        return bool(acked)
+
+    def _end(self, q: Quote, reason: str, notify: bool = True):
+        if self.quotes.pop(q.key, None) is None: return
+        self._by_instrument.get(q.instrument, set()).discard(q.key)
+        if q.timer is not None: q.timer.cancel()
+        for order_id in [o for o, k in self._by_order.items() if k == q.key]:
+            del self._by_order[order_id]
+        self.stats['ended'] += 1
+        if q.filled > 0: self.stats['ended_with_fill'] += 1
+        logger.info(f"Quote {q.key} on {q.instrument} ended ({reason}): filled {q.filled}/{q.size} after {q.updates} reprices")
+        if notify:
+            for fn in self._replace_listeners:
+                fn(q.key, q.order_id, None)
+
+    # ------------------------------------------------------------------
+    # Repricing
+    # ------------------------------------------------------------------
+    def _on_book(self, instrument: str, book: dict):
+        keys = self._by_instrument.get(instrument)
+        if not keys: return
+        for key in list(keys):
+            q = self.quotes.get(key)
+            if q is not None: self._evaluate(q, book)
+
+    def _kick(self, key: str):
+        q = self.quotes.get(key)
+        if q is None: return
+        q.timer = None
+        book = self.grvt.books.get(q.instrument)
+        if book: self._evaluate(q, book)
+
+    def _arm(self, q: Quote, delay: float):
+        if q.timer is None:
+            q.timer = asyncio.get_running_loop().call_later(max(delay, 0.001), self._kick, q.key)
+
+    def _evaluate(self, q: Quote, book: dict):
+        target = self._target(q, book)
+        if target is None: return
+        if target == q.price:
+            q.pending_since = None
+            # Orders ahead of us at our price fill or cancel; the level can only shrink our queue
+            q.queue_ahead = min(q.queue_ahead, max(self._level_size(q, book, q.price) - q.remaining, 0.0))
+            return
+        if q.pending_since is None: q.pending_since = time.perf_counter()
+        if q.busy: return  # re-evaluated against the latest book when the in-flight replace finishes
+
+        wait = q.last_update + self.min_reprice - time.monotonic()
+        if wait > 0:
+            self._arm(q, wait)
+            return
+        limiter = self.grvt.limiter
+        if limiter.available(CANCEL) < 1 or limiter.available(ORDER) < 2:  # order query + new order
+            self.stats['budget_deferrals'] += 1
+            self._arm(q, self.min_reprice)
+            return
+        q.busy = True
+        asyncio.create_task(self._reprice(q, target))
+
+    async def _cancel_live(self, q: Quote) -> str:
+        """
+        Cancels the quote's order and reads back its final state.
+        'done': the order is gone and its traded size is in q.settled; 'live': it may still be resting;
+        'unknown': it is gone but its traded size could not be read.
+        """
+        order_id = q.order_id
+        try:
+            acked = await self.grvt.cancel_order(order_id, q.instrument)
+        except Exception as e:
+            logger.warning(f"Quote cancel failed for {order_id} ({q.instrument}): {e}")
+            acked = False
+        state = await self.grvt.fetch_order_fill(order_id)
+        if state is None:
+            return 'unknown' if acked else 'live'
+        status, traded = state
+        if status in ('PENDING', 'OPEN'):
+            return 'live'
+        q.settled += traded
+        q.current_filled = 0.0
+        return 'done'
+
+    async def _cancel_orphan(self, order_id: str, instrument: str):
+        """Cancels an order whose quote ended while it was being placed or cancelled."""
+        self.stats['orphans_cancelled'] += 1
+        try:
+            acked = await self.grvt.cancel_order(order_id, instrument)
+        except Exception as e:
+            acked = False
+            logger.error(f"Orphan quote order {order_id} ({instrument}) cancel failed: {e}")
+        if not acked:
+            logger.critical(f"Orphan quote order {order_id} ({instrument}) may still be resting unmanaged")
+
+    async def _reprice(self, q: Quote, target: float):
+        try:
+            old_id = q.order_id
+            outcome = await self._cancel_live(q)
+            if q.key not in self.quotes:
+                # Ended (cancel() / fill) while the cancel was in flight
+                if outcome == 'live': await self._cancel_orphan(old_id, q.instrument)
+                return
+            if outcome == 'live':
+                # Still resting (or its state could not be read): keep managing it, retry after the throttle
+                self.stats['cancel_failures'] += 1
+                q.last_update = time.monotonic()
+                return
+            if outcome == 'unknown':
+                # Gone, but re-placing without its traded size could overfill
+                self._end(q, 'fill_unknown')
+                return
+            if q.remaining <= self._min_size(q):
+                self._end(q, 'filled')
+                return
+            if self.max_drift and abs(target - q.origin) > q.origin * self.max_drift:
+                # The touch ran away from the price the entry was sized on: stop chasing it
+                self.stats['drift_ends'] += 1
+                self._end(q, 'max_drift')
+                return
+
+            order = await self.grvt.place_limit_order(symbol=q.instrument, side=q.side, price=target,
+                                                      amount=q.remaining, params={'post_only': True})
+            if not order or not order.get('id'):
+                self.stats['replace_failures'] += 1
+                self._end(q, 'replace_failed')
+                return
+
+            new_id = str(order['id'])
+            if q.key not in self.quotes:
+                # cancel() ended the quote while the place was in flight: nothing manages the new order
+                await self._cancel_orphan(new_id, q.instrument)
+                return
+            self._by_order[new_id] = q.key
+            q.order_id, q.price = new_id, target
+            q.updates += 1
+            q.last_update = time.monotonic()
+            self.stats['reprices'] += 1
+            if q.pending_since is not None:
+                self.update_latency.add((time.perf_counter() - q.pending_since) * 1000)
+                q.pending_since = None
+            book = self.grvt.books.get(q.instrument)
+            if book: self._joined(q, book)
+            for fn in self._replace_listeners:
+                fn(q.key, old_id, new_id)
+        except Exception as e:
+            logger.error(f"Quote reprice error for {q.instrument}: {e}", exc_info=True)
+        finally:
+            q.busy = False
+            book = self.grvt.books.get(q.instrument)
+            if q.key in self.quotes and book:
+                self._evaluate(q, book)
+
+    def summary(self) -> dict:
+        s = dict(self.stats)
+        s['active'] = len(self.quotes)
+        s['fill_rate'] = round(s['filled_qty'] / s['quoted_qty'], 3) if s['quoted_qty'] else 0.0
+        s['quotes_filled_pct'] = round(s['ended_with_fill'] / s['ended'] * 100, 1) if s['ended'] else 0.0
+        lat = self.update_latency.summary()
+        s['update_ms_p50'] = lat.get('p50_ms', 0.0)
+        s['update_ms_p99'] = lat.get('p99_ms', 0.0)
+        s['queue_ahead_x'] = round(self._queue_sum / self._queue_n, 2) if self._queue_n else 0.0
+        s['queue_ahead_now'] = {q.instrument: round(q.queue_ahead, 6) for q in self.quotes.values()}
+        return s
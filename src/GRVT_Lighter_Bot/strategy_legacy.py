@@ -114,9 +114,7 @@ class Strategy:
             if not grvt_symbol:
                 return
 
-            response = await asyncio.to_thread(
-                self.grvt.client.fetch_my_trades, grvt_symbol, None, 10
-            )
+            response = await self.grvt.client.fetch_my_trades(grvt_symbol, None, 10)
 
             if not isinstance(response, dict) or 'result' not in response:
                 return
@@ -135,7 +133,7 @@ class Strategy:
         
         async def get_grvt_data():
             try:
-                ticker_task = asyncio.to_thread(self.grvt.client.fetch_ticker, Utils.to_grvt_symbol(symbol))
+                ticker_task = self.grvt.fetch_ticker(symbol)
                 funding_info_task = self.grvt.get_funding_info(symbol)
                 ticker, funding_info = await asyncio.gather(ticker_task, funding_info_task)
                 
@@ -58,7 +58,7 @@ async def run_test():
     try:
         # Try explicit GRVT symbol
         grvt_symbol = "ETH_USDT_Perp"
-        ticker = await asyncio.to_thread(grvt.client.fetch_ticker, grvt_symbol)
+        ticker = await grvt.fetch_ticker(grvt_symbol)
         logger.info(f"Ticker Data: {ticker}")
         # Fix: Helper to parse float safely
         def safe_float(v):
@@ -114,7 +114,7 @@ async def run_test():
          logger.info(f"\n[TEST 5] Cancelling Order {short_order.get('id')}...")
          try:
             grvt_symbol = test_symbol.replace("-", "_")
-            await asyncio.to_thread(grvt.client.cancel_order, short_order['id'], grvt_symbol)
+            await grvt.cancel_order(short_order['id'], grvt_symbol)
             logger.info("[PASS] Order Cancelled/Cleaned up.")
          except Exception as e:
             logger.warning(f"Validation Cancel: {e}")
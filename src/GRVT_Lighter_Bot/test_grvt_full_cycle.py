@@ -28,7 +28,7 @@ async def run_full_cycle():
     logger.info("Fetching Market Data...")
     try:
         grvt_symbol = "XRP_USDT_Perp"
-        ticker = await asyncio.to_thread(grvt.client.fetch_ticker, grvt_symbol)
+        ticker = await grvt.fetch_ticker(grvt_symbol)
         
         # Safe float parsing
         def safe_float(v):
@@ -65,7 +65,7 @@ async def run_full_cycle():
         try:
              # Use proper symbol for cancel if needed
              # SDK might need grvt_symbol
-             c_res = await asyncio.to_thread(grvt.client.cancel_order, order['id'], grvt_symbol)
+             c_res = await grvt.cancel_order(order['id'], grvt_symbol)
              logger.info(f"[SUCCESS] Order Cancelled. Result: {c_res}")
         except Exception as e:
             logger.error(f"[FAIL] Cancel Failed: {e}")
@@ -126,7 +126,7 @@ async def run_full_cycle():
              # SDK fetch_open_orders might not be available, try cancel blindly or skip
              # Best effort: use the Buy Order ID if it exists
              if buy_order.get('id') and buy_order.get('id') != '0x00':
-                 await asyncio.to_thread(grvt.client.cancel_order, buy_order['id'], grvt_symbol)
+                 await grvt.cancel_order(buy_order['id'], grvt_symbol)
                  logger.info("Cancelled Buy Order.")
              else:
                  logger.warning("Cannot cancel Buy Order: ID is 0x00. Please check GRVT Dashboard manually.")
@@ -51,7 +51,7 @@ async def run_mainnet_test():
         grvt_symbol = "XRP_USDT_Perp"
         target_key = grvt_symbol
         
-        ticker = await asyncio.to_thread(grvt.client.fetch_ticker, grvt_symbol)
+        ticker = await grvt.fetch_ticker(grvt_symbol)
         
         last_price = float(ticker.get('last') or ticker.get('last_price') or 0.0)
         best_ask = float(ticker.get('best_ask_price') or last_price)
@@ -128,7 +128,7 @@ async def run_mainnet_test():
                 # formatting symbol for cancel might need _
                 cancel_symbol = target_key # Use the key from ticker list (e.g. XRP_USDT_Perp)
                 logger.info(f"Cancelling Open Order {order['id']}...")
-                await asyncio.to_thread(grvt.client.cancel_order, order['id'], cancel_symbol)
+                await grvt.cancel_order(order['id'], cancel_symbol)
 
     except Exception as e:
         logger.error(f"Cleanup Failed: {e}")
@@ -1,6 +1,39 @@
 import math
-from decimal import Decimal, ROUND_FLOOR
 from datetime import datetime
+from functools import lru_cache
+
+# Absolute tolerance, in lots, for float products such as 0.29 * 100 = 28.999999999999996
+# (and 1.005 * 100 = 100.49999999999999 counting as an exact half when rounding).
+# A relative slack (|x| * eps) grows past real fractions on large values and breaks flooring
+# (318.4854739 at 6 decimals became 318.485474), so only values this close to an integer snap.
+_LOT_SNAP = 1e-6
+
+
+@lru_cache(maxsize=None)
+def _step_scale(step: float):
+    """
+    Splits a lot/tick step into exact integers: step == step_units / scale, scale = 10**decimals.
+    e.g. 0.0001 -> (10000, 1), 0.5 -> (10, 5), 25 -> (1, 25). Parsed once per distinct step.
+    """
+    text = repr(float(step)).lower()
+    exp = 0
+    if 'e' in text:
+        text, e = text.split('e')
+        exp = int(e)
+    decimals = max((len(text.split('.')[1].rstrip('0')) if '.' in text else 0) - exp, 0)
+    scale = 10 ** decimals
+    return scale, max(int(round(step * scale)), 1)
+
+
+def _to_lots(x: float, mode: str) -> int:
+    # Values within _LOT_SNAP of the next (previous, for ceil) integer are float noise
+    if mode == 'ceil':
+        n = math.ceil(x)
+        return n - 1 if n - x > 1 - _LOT_SNAP else n
+    if mode == 'round':
+        x += 0.5
+    n = math.floor(x)
+    return n + 1 if x - n > 1 - _LOT_SNAP else n
 
 class Utils:
     @staticmethod
@@ -31,19 +64,23 @@ class Utils:
         return f"{base}_USDT_Perp"
 
     @staticmethod
-    def quantize_amount(amount: float, tick_size: float) -> float:
+    def quantize_amount(amount: float, tick_size: float, mode: str = 'floor') -> float:
         """
-        Rounds down amount to the nearest tick_size.
+        Rounds amount to a multiple of tick_size (down by default; 'ceil' / 'round' half-up).
+        Uses exact scaled integers instead of Decimal(str(...)) on every call.
         """
         if tick_size <= 0: return amount
-        
-        # Avoid float precision issues by string conversion
-        d_amount = Decimal(str(amount))
-        d_tick = Decimal(str(tick_size))
-        
-        # Round down to nearest tick
-        quantized = (d_amount // d_tick) * d_tick
-        return float(quantized)
+        scale, step_units = _step_scale(tick_size)
+        lots = _to_lots(amount * scale / step_units, mode)
+        return lots * step_units / scale
+
+    @staticmethod
+    def to_scaled_int(value: float, scale: int, mode: str = 'floor') -> int:
+        """
+        Converts a float to exchange integer units (value * scale, scale = 10**decimals),
+        e.g. Lighter base_amount / price. int(value * scale) would turn 0.29 * 100 into 28.
+        """
+        return _to_lots(value * scale, mode)
 
     @staticmethod
     def calc_precision(tick_size: float) -> int:
@@ -61,6 +61,7 @@ async def main():
     logger.info("\n🟠 [GRVT] 거래소 연결 테스트 중...")
     try:
         grvt = GrvtExchange()
+        await grvt.initialize()
         
         # Ticker (fetch_tickers might not be supported in py-sdk so checking specific ticker)
         logger.info("   👉 Ticker(BTC_USDT_Perp) 조회 시도...")
@@ -76,7 +77,7 @@ async def main():
         
         # Debug Ticker Content
         try:
-             ticker = await asyncio.to_thread(grvt.client.fetch_ticker, "BTC_USDT_Perp")
+             ticker = await grvt.fetch_ticker("BTC_USDT_Perp")
              logger.info(f"   ℹ️ Raw Ticker Data: {ticker}")
         except Exception as e:
              logger.error(f"   ❌ Ticker Fetch Error: {e}")
@@ -93,7 +94,7 @@ async def main():
         balance = await grvt.get_balance()
         logger.info(f"   ✅ 잔고 조회 성공: Equity=${balance.get('equity', 0):.2f}, Available=${balance.get('available', 0):.2f}")
         
-        await grvt.client.close()
+        await grvt.close()
         
     except Exception as e:
         logger.error(f"   ❌ [GRVT] 오류 발생: {e}")
@@ -87,7 +87,7 @@ async def test_grvt_functionality(grvt: GrvtExchange):
     logger.info(f"\n--- 5. Placing GRVT Limit Sell Order ---")
     try:
         # Fetch current price to place order away from it
-        ticker = await asyncio.to_thread(grvt.client.fetch_ticker, Utils.to_grvt_symbol(TEST_SYMBOL_GRVT))
+        ticker = await grvt.fetch_ticker(Utils.to_grvt_symbol(TEST_SYMBOL_GRVT))
         last_price = ticker.get('last_price')
         if not last_price:
             raise ValueError("Could not fetch last price to place a limit order.")
@@ -103,7 +103,7 @@ async def test_grvt_functionality(grvt: GrvtExchange):
             if order_id:
                 logger.info(f"\n--- 6. Cancelling GRVT Limit Order ID: {order_id} ---")
                 # CCXT uses 'cancel_order'
-                cancellation = await asyncio.to_thread(grvt.client.cancel_order, order_id, Utils.to_grvt_symbol(TEST_SYMBOL_GRVT))
+                cancellation = await grvt.cancel_order(order_id, Utils.to_grvt_symbol(TEST_SYMBOL_GRVT))
                 logger.info(f"✅ Cancellation response: {cancellation}")
         else:
             logger.error("Failed to place GRVT limit order.")